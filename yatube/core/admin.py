@@ -0,0 +1,33 @@
+from django.contrib import admin
+from django.utils.html import format_html
+
+from .models import RequestProfile, Task
+
+
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'name', 'status', 'attempts', 'visible_at',
+                    'duration')
+    list_filter = ('status',)
+    search_fields = ('name',)
+    empty_value_display = '-пусто-'
+
+
+admin.site.register(Task, TaskAdmin)
+
+
+class RequestProfileAdmin(admin.ModelAdmin):
+    list_display = ('created', 'view_name', 'path', 'duration', 'profiler')
+    list_filter = ('view_name',)
+    fields = ('created', 'view_name', 'path', 'args', 'duration',
+              'profiler', 'report_text')
+    readonly_fields = fields
+
+    def has_add_permission(self, request):
+        return False
+
+    def report_text(self, obj):
+        return format_html('<pre>{}</pre>', obj.report)
+    report_text.short_description = 'Отчёт'
+
+
+admin.site.register(RequestProfile, RequestProfileAdmin)
@@ -0,0 +1,32 @@
+import time
+
+from django.template.backends.django import DjangoTemplates, Template
+
+from .metrics import local
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        if getattr(local, 'template_time', None) is None:
+            return super().render(context, request)
+        depth = getattr(local, 'template_depth', 0)
+        local.template_depth = depth + 1
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            local.template_depth = depth
+            if not depth:
+                local.template_time += time.perf_counter() - started
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """Шаблонизатор Django, который считает время рендера для метрик."""
+
+    def from_string(self, template_code):
+        template = super().from_string(template_code)
+        return TimedTemplate(template.template, self)
+
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return TimedTemplate(template.template, self)
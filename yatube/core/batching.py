@@ -0,0 +1,50 @@
+"""Накопление изменений до конца транзакции.
+
+``OnCommitBatch.add`` складывает элементы в пачку текущей транзакции, а
+``apply`` получает всю пачку одним вызовом после фиксации: пакетное
+удаление сотни постов даёт одну запись на затронутый ключ, а не по
+записи на каждый пост. Откат транзакции выбрасывает пачку вместе с
+ней. Вне транзакции пачка применяется сразу.
+
+Пачка — ``set`` или ``Counter``, что передано в ``factory``; элементы
+добавляются через ``update``, так что ``Counter`` складывает дельты.
+"""
+from django.db import transaction
+
+
+class Batch:
+    def __init__(self, owner, items):
+        self.owner = owner
+        self.items = items
+
+    def __call__(self):
+        self.owner.apply(self.items)
+
+
+class OnCommitBatch:
+    def __init__(self, apply, factory=set):
+        self.apply = apply
+        self.factory = factory
+
+    def pending(self):
+        """Пачка текущей точки сохранения или ``None``, если её ещё нет.
+
+        Пачки ищутся среди ``on_commit`` соединения: после отката
+        вложенного блока снова находится пачка внешнего.
+        """
+        connection = transaction.get_connection()
+        savepoints = set(connection.savepoint_ids)
+        for sids, func in connection.run_on_commit:
+            if (isinstance(func, Batch) and func.owner is self
+                    and sids == savepoints):
+                return func
+        return None
+
+    def add(self, items):
+        batch = self.pending()
+        if batch is not None:
+            batch.items.update(items)
+            return
+        batch = Batch(self, self.factory())
+        batch.items.update(items)
+        transaction.on_commit(batch)
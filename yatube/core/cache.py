@@ -0,0 +1,148 @@
+"""Кэш объектов со сквозным чтением и защитой от наплыва запросов.
+
+Значение хранится в кэше Django вместе со сроком свежести
+``settings.OBJECT_CACHE_SOFT_TTL`` и живёт там ``settings.OBJECT_CACHE_TTL``.
+Пока значения нет, его загружает один поток на ключ, остальные ждут
+того же результата. Устаревшее значение отдаётся сразу, а обновляет его
+один фоновый поток, так что база видит один запрос на обновление, а не
+по запросу на каждого читателя. Объединение запросов работает внутри
+процесса.
+
+Кэш Django может быть своим у каждого процесса, поэтому версия ключа
+хранится в базе, в строке ``CacheVersion``, а значение — вместе с
+версией, прочитанной до загрузки. Чтение стоит одного запроса версии по
+уникальному ключу. ``invalidate`` увеличивает версию: все процессы
+перестают отдавать прежнее значение, а значение, которое загрузчик
+начал читать до сброса и сохранил после, с ней уже не совпадает и
+считается промахом.
+"""
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.db.models import F
+
+from .models import CacheVersion
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """Один вызов ``func`` на ключ; параллельные вызовы ждут его итога."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}
+
+    def do(self, key, func):
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = {'done': threading.Event()}
+        if not leader:
+            call['done'].wait()
+            if 'error' in call:
+                raise call['error']
+            return call['result']
+        try:
+            call['result'] = func()
+        except Exception as error:
+            call['error'] = error
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call['done'].set()
+        return call['result']
+
+
+class ObjectCache:
+    def __init__(self, prefix, loader):
+        self.prefix = prefix
+        self.loader = loader
+        self.flight = SingleFlight()
+        self.lock = threading.Lock()
+        self.refreshing = {}
+        self.stats = {'hits': 0, 'stale': 0, 'misses': 0, 'loads': 0}
+
+    def key(self, key):
+        return f'{self.prefix}:{key}'
+
+    def version(self, key):
+        return (CacheVersion.objects.filter(key=self.key(key))
+                .values_list('version', flat=True).first() or 0)
+
+    def get(self, key):
+        """Объект по ключу; ``None`` тоже кэшируется как ответ загрузчика."""
+        version = self.version(key)
+        entry = cache.get(self.key(key))
+        if entry is None or entry[2] != version:
+            self.count('misses')
+            # Версия в ключе: после сброса чтение не ждёт прежнюю загрузку.
+            return self.flight.do((key, version),
+                                  lambda: self.load(key, version))
+        value, fresh_until, _ = entry
+        if time.time() < fresh_until:
+            self.count('hits')
+        else:
+            self.count('stale')
+            self.refresh(key, version)
+        return value
+
+    def load(self, key, version):
+        self.count('loads')
+        value = self.loader(key)
+        cache.set(self.key(key),
+                  (value, time.time() + settings.OBJECT_CACHE_SOFT_TTL,
+                   version),
+                  settings.OBJECT_CACHE_TTL)
+        return value
+
+    def refresh(self, key, version):
+        with self.lock:
+            if key in self.refreshing:
+                return
+            thread = threading.Thread(target=self.refresh_now,
+                                      args=(key, version), daemon=True)
+            self.refreshing[key] = thread
+        thread.start()
+
+    def refresh_now(self, key, version):
+        try:
+            self.flight.do((key, version), lambda: self.load(key, version))
+        except Exception:
+            logger.exception('Refreshing %s failed', self.key(key))
+        finally:
+            with self.lock:
+                del self.refreshing[key]
+            connections.close_all()
+
+    def wait(self):
+        """Дожидается фоновых обновлений (для тестов и замеров)."""
+        with self.lock:
+            threads = list(self.refreshing.values())
+        for thread in threads:
+            thread.join()
+
+    def invalidate(self, key):
+        self.invalidate_many([key])
+
+    def invalidate_many(self, keys):
+        names = [self.key(key) for key in keys]
+        if not names:
+            return
+        with transaction.atomic():
+            CacheVersion.objects.bulk_create(
+                [CacheVersion(key=name) for name in names],
+                ignore_conflicts=True)
+            CacheVersion.objects.filter(key__in=names).update(
+                version=F('version') + 1)
+        cache.delete_many(names)
+
+    def count(self, name):
+        with self.lock:
+            self.stats[name] += 1
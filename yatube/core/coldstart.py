@@ -0,0 +1,40 @@
+"""Замер холодного старта в отдельном процессе.
+
+Запускается командой ``manage.py coldstart`` как ``python -m
+core.coldstart`` и печатает JSON: время импорта ``yatube.wsgi`` (с
+прогревом, если он включён) и задержку первого и второго запроса.
+"""
+import json
+import os
+import sys
+import time
+from wsgiref.util import setup_testing_defaults
+
+
+def request(application, path):
+    environ = {'PATH_INFO': path, 'REQUEST_METHOD': 'GET'}
+    setup_testing_defaults(environ)
+    environ['HTTP_HOST'] = 'localhost'
+    started = time.perf_counter()
+    body = application(environ, lambda status, headers, exc_info=None: None)
+    for _ in body:
+        pass
+    body.close()
+    return time.perf_counter() - started
+
+
+def main(path):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
+    started = time.perf_counter()
+    from yatube.wsgi import application
+    imported = time.perf_counter() - started
+    result = {
+        'import': imported,
+        'first': request(application, path),
+        'second': request(application, path),
+    }
+    sys.stdout.write(json.dumps(result))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1] if len(sys.argv) > 1 else '/')
@@ -0,0 +1,98 @@
+"""Буфер счётчиков в памяти процесса с пакетным сбросом в базу.
+
+``add`` только увеличивает число в словаре под блокировкой. Накопленное
+уходит в ``flush_func`` одним пакетом, когда с прошлого сброса прошло
+``settings.COUNTER_FLUSH_INTERVAL`` секунд или ключей набралось
+``settings.COUNTER_MAX_PENDING``: вместо записи на каждое событие база
+получает одну транзакцию раз в несколько секунд. Сброс идёт в фоновом
+потоке, запрос, заметивший, что пора, его не ждёт. При штатной
+остановке воркера буфер сбрасывается из ``atexit`` (см.
+``yatube/wsgi.py``); при падении теряется не больше одного интервала.
+Если сброс не удался, числа возвращаются в буфер и уйдут со следующим.
+"""
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+class CounterBuffer:
+    def __init__(self, flush_func):
+        self.flush_func = flush_func
+        self.lock = threading.Lock()
+        self.flushing = threading.Lock()
+        self.pending = {}
+        self.flushed = time.monotonic()
+        self.thread = None
+
+    def add(self, key, value=1):
+        with self.lock:
+            self.pending[key] = self.pending.get(key, 0) + value
+            due = (len(self.pending) >= settings.COUNTER_MAX_PENDING
+                   or time.monotonic() - self.flushed
+                   >= settings.COUNTER_FLUSH_INTERVAL)
+        if due:
+            self.flush_later()
+
+    def get(self, key):
+        """Ещё не сброшенная часть счётчика."""
+        with self.lock:
+            return self.pending.get(key, 0)
+
+    def flush_later(self):
+        with self.lock:
+            if self.thread is not None and self.thread.is_alive():
+                return
+            self.thread = threading.Thread(target=self.flush_in_background,
+                                           daemon=True)
+            self.thread.start()
+
+    def flush_in_background(self):
+        try:
+            self.flush()
+        finally:
+            connections.close_all()
+
+    def wait(self):
+        """Дожидается фонового сброса (для тестов и замеров)."""
+        thread = self.thread
+        if thread is not None:
+            thread.join()
+
+    def drain(self):
+        with self.lock:
+            pending, self.pending = self.pending, {}
+            self.flushed = time.monotonic()
+        return pending
+
+    def flush(self, force=False):
+        """Сбрасывает буфер; возвращает число ключей или 0.
+
+        Одновременно сбрасывает один поток, остальные не ждут его и
+        продолжают копить.
+        """
+        if not self.flushing.acquire(blocking=force):
+            return 0
+        try:
+            pending = self.drain()
+            if not pending:
+                return 0
+            try:
+                self.flush_func(pending)
+            except Exception:
+                logger.warning('Counter flush failed', exc_info=True)
+                with self.lock:
+                    for key, value in pending.items():
+                        self.pending[key] = self.pending.get(key, 0) + value
+                return 0
+            return len(pending)
+        finally:
+            self.flushing.release()
+
+    def clear(self):
+        with self.lock:
+            self.pending.clear()
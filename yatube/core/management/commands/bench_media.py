@@ -0,0 +1,94 @@
+import os
+import socket
+import tempfile
+import threading
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from core import media
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает пропускную способность отдачи файла: чтение '
+            'целиком в память, поток FileResponse и sendfile')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', type=int, default=64,
+                            help='Размер файла, МиБ')
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        size = options['size'] * 1024 * 1024
+        with tempfile.TemporaryDirectory() as root:
+            with open(os.path.join(root, 'file.bin'), 'wb') as file_obj:
+                file_obj.write(os.urandom(size))
+            for name, send in (('naive', self.naive),
+                               ('stream', self.stream),
+                               ('sendfile', self.sendfile)):
+                seconds, peak = self.measure(send, root, size,
+                                             options['repeat'])
+                self.stdout.write(
+                    f'{name:<9}: {size / seconds / 2 ** 20:8.0f} МиБ/с, '
+                    f'пик памяти {peak / 2 ** 20:.1f} МиБ')
+
+    def measure(self, send, root, size, repeat):
+        best = None
+        tracemalloc.start()
+        for _ in range(repeat):
+            reader, writer = socket.socketpair()
+            drained = threading.Thread(target=self.drain,
+                                       args=(reader, size))
+            drained.start()
+            started = time.perf_counter()
+            send(root, writer)
+            writer.close()
+            drained.join()
+            elapsed = time.perf_counter() - started
+            reader.close()
+            best = elapsed if best is None else min(best, elapsed)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return best, peak
+
+    @staticmethod
+    def drain(sock, size):
+        buffer = bytearray(1024 * 1024)
+        received = 0
+        while received < size:
+            count = sock.recv_into(buffer)
+            if not count:
+                break
+            received += count
+
+    @staticmethod
+    def response(root):
+        request = RequestFactory().get('/media/file.bin')
+        return media.serve(request, 'file.bin', root)
+
+    @staticmethod
+    def naive(root, sock):
+        with open(os.path.join(root, 'file.bin'), 'rb') as file_obj:
+            response = HttpResponse(file_obj.read())
+        sock.sendall(response.content)
+
+    def stream(self, root, sock):
+        response = self.response(root)
+        for chunk in response.streaming_content:
+            sock.sendall(chunk)
+        response.close()
+
+    def sendfile(self, root, sock):
+        # Так файл отдаёт wsgi.file_wrapper gunicorn.
+        response = self.response(root)
+        file_obj = response.file_to_stream
+        offset, count = file_obj.tell(), int(response['Content-Length'])
+        while count:
+            sent = os.sendfile(sock.fileno(), file_obj.fileno(), offset,
+                               count)
+            offset += sent
+            count -= sent
+        response.close()
@@ -0,0 +1,39 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает холодный старт воркера с прогревом и без: '
+            'время импорта WSGI и задержку первого запроса')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5)
+        parser.add_argument('--path', default='/')
+
+    def handle(self, *args, **options):
+        for warmup in ('0', '1'):
+            runs = [self.run_once(warmup, options['path'])
+                    for _ in range(options['runs'])]
+            medians = {key: statistics.median(run[key] for run in runs)
+                       for key in ('import', 'first', 'second')}
+            self.stdout.write(
+                f"прогрев {'вкл' if warmup == '1' else 'выкл'}: "
+                f"импорт {medians['import'] * 1000:.1f} мс, "
+                f"первый запрос {medians['first'] * 1000:.1f} мс, "
+                f"второй {medians['second'] * 1000:.1f} мс")
+
+    @staticmethod
+    def run_once(warmup, path):
+        env = dict(os.environ, WARMUP=warmup)
+        completed = subprocess.run(
+            [sys.executable, '-m', 'core.coldstart', path],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True)
+        if completed.returncode:
+            raise CommandError(completed.stderr)
+        return json.loads(completed.stdout)
@@ -0,0 +1,47 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core import tasks
+
+
+class Command(BaseCommand):
+    help = 'Выполняет задачи из очереди фоновых задач'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true',
+                            help='Обработать готовые задачи и выйти')
+        parser.add_argument('--batch', type=int,
+                            default=settings.TASKS_BATCH)
+        parser.add_argument('--timeout', type=int,
+                            default=settings.TASKS_VISIBILITY_TIMEOUT,
+                            help='Таймаут видимости задачи, с')
+        parser.add_argument('--sleep', type=float,
+                            default=settings.TASKS_POLL_INTERVAL,
+                            help='Пауза при пустой очереди, с')
+        parser.add_argument('--stats', action='store_true',
+                            help='Показать метрики задач и выйти')
+
+    def handle(self, *args, **options):
+        tasks.autodiscover()
+        if options['stats']:
+            self.print_stats()
+            return
+        while True:
+            done = tasks.run_pending(options['batch'], options['timeout'])
+            if done:
+                self.stdout.write(f'Обработано задач: {done}')
+                continue
+            if options['once']:
+                break
+            time.sleep(options['sleep'])
+
+    def print_stats(self):
+        for row in tasks.stats():
+            avg = row['avg_duration'] or 0
+            top = row['max_duration'] or 0
+            self.stdout.write(
+                f"{row['name']} {row['status']} {row['count']} "
+                f'avg={avg * 1000:.1f}ms max={top * 1000:.1f}ms'
+            )
@@ -0,0 +1,29 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.slow_queries import report
+
+
+class Command(BaseCommand):
+    help = 'Сводка журнала медленных запросов по отпечаткам'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--log', default=settings.SLOW_QUERY_LOG)
+        parser.add_argument('--limit', type=int, default=20)
+
+    def handle(self, *args, **options):
+        try:
+            rows = report(options['log'])
+        except (OSError, TypeError):
+            raise CommandError(f"Журнал {options['log']} не найден")
+        for key, row in rows[:options['limit']]:
+            self.stdout.write(
+                f"{key} count={row['count']} total={row['total']:.3f}s "
+                f"avg={row['total'] / row['count']:.3f}s "
+                f"max={row['max']:.3f}s")
+            self.stdout.write(f"  views: {', '.join(sorted(row['views']))}")
+            self.stdout.write(
+                f"  origins: {', '.join(sorted(row['origins']))}")
+            self.stdout.write(f"  sql: {row['sql']}")
+            for line in row['plan'] or ():
+                self.stdout.write(f'  plan: {line}')
@@ -0,0 +1,120 @@
+import gc
+import resource
+import time
+import tracemalloc
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.urls import reverse
+
+from posts import archive
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+def rss():
+    """Текущий RSS процесса в байтах (пиковый, если нет /proc)."""
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * resource.getpagesize()
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class Command(BaseCommand):
+    help = ('Прогоняет ленты index, group_list и profile через весь стек '
+            'Django и падает, если память растёт от запроса к запросу')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=100000,
+                            help='Запросов на каждую ленту')
+        parser.add_argument('--warmup', type=int, default=1000)
+        parser.add_argument('--pages', type=int, default=5,
+                            help='Сколько страниц ленты перебирать')
+        parser.add_argument('--max-growth', type=int,
+                            default=settings.SOAK_MAX_GROWTH,
+                            help='Допустимый рост tracemalloc, байт')
+        parser.add_argument('--seed', type=int, default=0,
+                            help='Создать автора и группу soak с N постами')
+
+    def handle(self, *args, **options):
+        if settings.DEBUG:
+            self.stderr.write('DEBUG включён: connection.queries будет '
+                              'расти, результаты не отражают production')
+        if options['seed']:
+            self.seed(options['seed'])
+        client = Client(HTTP_HOST=self.host())
+        tracemalloc.start(10)
+        failed = []
+        try:
+            for view, url in self.feed_urls():
+                if not self.soak(client, view, url, options):
+                    failed.append(view)
+        finally:
+            tracemalloc.stop()
+        if failed:
+            raise CommandError(f"Рост памяти в: {', '.join(failed)}")
+
+    def soak(self, client, view, url, options):
+        pages = options['pages']
+        for i in range(options['warmup']):
+            client.get(url, {'page': i % pages + 1})
+        gc.collect()
+        rss_before = rss()
+        traced_before = tracemalloc.get_traced_memory()[0]
+        snapshot = tracemalloc.take_snapshot()
+        started = time.perf_counter()
+        for i in range(options['requests']):
+            response = client.get(url, {'page': i % pages + 1})
+            if response.status_code != 200:
+                raise CommandError(f'{url}: статус {response.status_code}')
+        elapsed = time.perf_counter() - started
+        gc.collect()
+        growth = tracemalloc.get_traced_memory()[0] - traced_before
+        per_request = growth / options['requests']
+        self.stdout.write(
+            f"{view}: {options['requests'] / elapsed:.0f} запросов/с, "
+            f'tracemalloc {growth:+d} Б ({per_request:+.1f} Б/запрос), '
+            f'RSS {rss() - rss_before:+d} Б')
+        if growth <= options['max_growth']:
+            return True
+        top = tracemalloc.take_snapshot().compare_to(snapshot, 'lineno')
+        for stat in top[:5]:
+            self.stdout.write(f'  {stat}')
+        return False
+
+    def feed_urls(self):
+        urls = [('posts:index', reverse('posts:index'))]
+        group = Group.objects.filter(posts__isnull=False).first()
+        if group is not None:
+            urls.append(('posts:group_list',
+                         reverse('posts:group_list', args=(group.slug,))))
+        author = User.objects.filter(posts__isnull=False).first()
+        if author is not None:
+            urls.append(('posts:profile',
+                         reverse('posts:profile', args=(author.username,))))
+        return urls
+
+    @staticmethod
+    def host():
+        for host in settings.ALLOWED_HOSTS:
+            if host and host[0] not in '.*':
+                return host
+        return 'localhost'
+
+    @staticmethod
+    def seed(count):
+        author, _ = User.objects.get_or_create(username='soak')
+        group, _ = Group.objects.get_or_create(
+            slug='soak', defaults={'title': 'Soak', 'description': 'Soak'})
+        missing = count - author.posts.count()
+        Post.objects.bulk_create([
+            Post(text=f'Soak {i}', author=author, group=group)
+            for i in range(max(missing, 0))
+        ])
+        if missing > 0:
+            # bulk_create не шлёт сигналы, счётчики архива пересчитываем.
+            archive.rebuild()
@@ -0,0 +1,146 @@
+"""Отдача загруженных файлов без копирования байтов через Python.
+
+Если ``settings.MEDIA_SENDFILE`` равен ``'x-accel-redirect'`` (nginx) или
+``'x-sendfile'`` (Apache, lighttpd), ответ пустой, а файл вместе с
+``Range`` отдаёт фронт-сервер. Иначе файл уходит через ``FileResponse``:
+WSGI-сервер с ``wsgi.file_wrapper`` (gunicorn) шлёт его системным
+вызовом ``sendfile``. Открытый до конца диапазон ``bytes=N-`` тоже идёт
+через ``sendfile`` со сдвигом; закрытый диапазон читается кусками по
+``settings.MEDIA_CHUNK_SIZE``. ``If-None-Match`` и ``If-Modified-Since``
+дают 304 без открытия файла.
+"""
+import mimetypes
+import os
+import re
+import stat
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import (FileResponse, Http404, HttpResponse,
+                         HttpResponseNotModified, StreamingHttpResponse)
+from django.utils._os import safe_join
+from django.utils.cache import patch_cache_control
+from django.utils.http import http_date, parse_etags
+from django.views.static import was_modified_since
+
+RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+ENCODED_TYPES = {'gzip': 'application/gzip', 'bzip2': 'application/x-bzip',
+                 'xz': 'application/x-xz'}
+
+
+def make_etag(file_stat):
+    return f'"{file_stat.st_size:x}-{file_stat.st_mtime_ns:x}"'
+
+
+def parse_range(header, size):
+    """``(start, end)`` включительно, ``None`` — отдать файл целиком,
+    ``False`` — диапазон за пределами файла."""
+    match = RANGE.match(header.strip())
+    if match is None:
+        # Несколько диапазонов или чужие единицы: отдаём весь файл.
+        return None
+    first, last = match.groups()
+    if not first:
+        if not last or int(last) == 0:
+            return False
+        return max(size - int(last), 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def read_range(file_obj, start, length):
+    try:
+        file_obj.seek(start)
+        while length > 0:
+            chunk = file_obj.read(min(settings.MEDIA_CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+    finally:
+        file_obj.close()
+
+
+def offload(path, relative):
+    response = HttpResponse()
+    if settings.MEDIA_SENDFILE == 'x-accel-redirect':
+        response['X-Accel-Redirect'] = (settings.MEDIA_ACCEL_PREFIX
+                                        + relative.replace(os.sep, '/'))
+    else:
+        response['X-Sendfile'] = path
+    # Тип и длину nginx и Apache выставят сами по файлу.
+    del response['Content-Type']
+    return response
+
+
+def serve(request, relative, document_root):
+    try:
+        path = safe_join(document_root, relative)
+        file_stat = os.stat(path)
+    except (OSError, ValueError, SuspiciousFileOperation):
+        raise Http404('Файл не найден')
+    if not stat.S_ISREG(file_stat.st_mode):
+        raise Http404('Файл не найден')
+
+    etag = make_etag(file_stat)
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match is not None:
+        not_modified = etag in parse_etags(if_none_match)
+    else:
+        not_modified = not was_modified_since(
+            request.META.get('HTTP_IF_MODIFIED_SINCE'),
+            file_stat.st_mtime, file_stat.st_size)
+    if not_modified:
+        response = HttpResponseNotModified()
+    elif settings.MEDIA_SENDFILE:
+        response = offload(path, relative)
+    else:
+        response = stream(request, path, file_stat, etag)
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(file_stat.st_mtime)
+    # Общий кэш не должен хранить неделю 416 или пустой 304.
+    if response.status_code in (200, 206):
+        patch_cache_control(response, public=True,
+                            max_age=settings.MEDIA_CACHE_MAX_AGE)
+    return response
+
+
+def stream(request, path, file_stat, etag):
+    size = file_stat.st_size
+    content_type, encoding = mimetypes.guess_type(path)
+    # Сжатый файл отдаётся как архив, а не как его содержимое.
+    content_type = (ENCODED_TYPES.get(encoding, content_type)
+                    or 'application/octet-stream')
+    byte_range = None
+    header = request.META.get('HTTP_RANGE')
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if header and (if_range is None or if_range == etag):
+        byte_range = parse_range(header, size)
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    file_obj = open(path, 'rb')
+    if byte_range is None:
+        response = FileResponse(file_obj, content_type=content_type)
+    else:
+        start, end = byte_range
+        if end == size - 1:
+            # file_wrapper gunicorn шлёт sendfile с текущей позиции
+            # файла и не дальше Content-Length.
+            file_obj.seek(start)
+            response = FileResponse(file_obj, content_type=content_type)
+            response['Content-Length'] = size - start
+        else:
+            response = StreamingHttpResponse(
+                read_range(file_obj, start, end - start + 1),
+                content_type=content_type)
+            response['Content-Length'] = end - start + 1
+        response.status_code = 206
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response['Accept-Ranges'] = 'bytes'
+    return response
@@ -0,0 +1,166 @@
+"""Метрики запросов в памяти процесса и их вывод в формате Prometheus.
+
+Каждый процесс копит счётчики у себя и раз в
+``settings.METRICS_FLUSH_INTERVAL`` секунд сбрасывает снимок в
+``settings.METRICS_DIR/metrics-<pid>.json``. Эндпоинт ``/metrics/``
+складывает снимки всех процессов, поэтому при нескольких воркерах
+gunicorn ответ не зависит от того, какой воркер его отдал.
+"""
+import glob
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+
+from django.conf import settings
+
+TIME_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+                10.0)
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576)
+
+METRICS = {
+    'yatube_requests_total': (
+        'counter', 'Число запросов по представлению и статусу'),
+    'yatube_request_duration_seconds': (
+        'histogram', 'Время обработки запроса'),
+    'yatube_request_db_seconds': (
+        'histogram', 'Время SQL-запросов за один запрос'),
+    'yatube_request_db_queries_total': (
+        'counter', 'Число SQL-запросов'),
+    'yatube_template_render_seconds': (
+        'histogram', 'Время рендера шаблонов за один запрос'),
+    'yatube_response_size_bytes': (
+        'histogram', 'Размер тела ответа'),
+}
+BUCKETS = {
+    'yatube_request_duration_seconds': TIME_BUCKETS,
+    'yatube_request_db_seconds': TIME_BUCKETS,
+    'yatube_template_render_seconds': TIME_BUCKETS,
+    'yatube_response_size_bytes': SIZE_BUCKETS,
+}
+
+# Время рендера шаблонов текущего запроса, см. core.backends.
+local = threading.local()
+
+
+class Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.values = {}
+        self.flushed = time.monotonic()
+
+    def inc(self, name, labels, value=1):
+        key = self.key(name, labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + value
+
+    def observe(self, name, labels, value):
+        buckets = BUCKETS[name]
+        key = self.key(name, labels)
+        with self.lock:
+            row = self.values.get(key)
+            if row is None:
+                row = self.values[key] = [0] * (len(buckets) + 3)
+            # Ячейки: по корзине на границу, +Inf, сумма, количество.
+            row[bisect_left(buckets, value)] += 1
+            row[-2] += value
+            row[-1] += 1
+
+    @staticmethod
+    def key(name, labels):
+        return json.dumps([name, sorted(labels.items())],
+                          ensure_ascii=False)
+
+    def snapshot(self):
+        with self.lock:
+            return {key: list(value) if isinstance(value, list) else value
+                    for key, value in self.values.items()}
+
+    def flush(self, force=False):
+        directory = settings.METRICS_DIR
+        if not directory:
+            return
+        now = time.monotonic()
+        if not force and now - self.flushed < settings.METRICS_FLUSH_INTERVAL:
+            return
+        self.flushed = now
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f'metrics-{os.getpid()}.json')
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w') as snapshot_file:
+            json.dump(self.snapshot(), snapshot_file)
+        os.replace(tmp_path, path)
+
+
+registry = Registry()
+
+
+def merge(snapshots):
+    total = {}
+    for snapshot in snapshots:
+        for key, value in snapshot.items():
+            if isinstance(value, list):
+                row = total.setdefault(key, [0] * len(value))
+                for i, cell in enumerate(value):
+                    row[i] += cell
+            else:
+                total[key] = total.get(key, 0) + value
+    return total
+
+
+def collect():
+    """Снимок всех процессов: свой берётся из памяти, чужие с диска."""
+    snapshots = [registry.snapshot()]
+    directory = settings.METRICS_DIR
+    if directory:
+        own = os.path.join(directory, f'metrics-{os.getpid()}.json')
+        for path in glob.glob(os.path.join(directory, 'metrics-*.json')):
+            if path == own:
+                continue
+            try:
+                with open(path) as snapshot_file:
+                    snapshots.append(json.load(snapshot_file))
+            except (OSError, ValueError):
+                continue
+    return merge(snapshots)
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    pairs = ','.join(
+        '{}="{}"'.format(name, str(value).replace('\\', r'\\')
+                         .replace('"', r'\"').replace('\n', r'\n'))
+        for name, value in labels)
+    return '{' + pairs + '}'
+
+
+def render(values):
+    """Текст в формате Prometheus exposition 0.0.4."""
+    series = {}
+    for key, value in values.items():
+        name, labels = json.loads(key)
+        series.setdefault(name, []).append(
+            ([tuple(pair) for pair in labels], value))
+    lines = []
+    for name, (kind, description) in METRICS.items():
+        if name not in series:
+            continue
+        lines.append(f'# HELP {name} {description}')
+        lines.append(f'# TYPE {name} {kind}')
+        for labels, value in sorted(series[name]):
+            if kind != 'histogram':
+                lines.append(f'{name}{format_labels(labels)} {value}')
+                continue
+            cumulative = 0
+            bounds = [str(bound) for bound in BUCKETS[name]] + ['+Inf']
+            for bound, count in zip(bounds, value):
+                cumulative += count
+                bucket_labels = labels + [('le', bound)]
+                lines.append(
+                    f'{name}_bucket{format_labels(bucket_labels)} '
+                    f'{cumulative}')
+            lines.append(f'{name}_sum{format_labels(labels)} {value[-2]}')
+            lines.append(f'{name}_count{format_labels(labels)} {value[-1]}')
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,219 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import connection
+from django.http import HttpResponse
+from django.utils.cache import patch_cache_control, patch_vary_headers
+
+from . import metrics, profiling
+from .slow_queries import SlowQueryLogger
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBuckets:
+    """Ограниченный по числу ключей набор корзин токенов."""
+
+    def __init__(self, max_keys):
+        self.max_keys = max_keys
+        self.buckets = OrderedDict()
+        self.lock = threading.Lock()
+
+    def take(self, key, rate, burst):
+        """Забирает токен; возвращает 0 или сколько секунд ждать."""
+        now = time.monotonic()
+        with self.lock:
+            tokens, updated = self.buckets.pop(key, (burst, now))
+            tokens = min(burst, tokens + (now - updated) * rate)
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0
+            else:
+                wait = (1 - tokens) / rate
+            self.buckets[key] = (tokens, now)
+            if len(self.buckets) > self.max_keys:
+                self.buckets.popitem(last=False)
+        return wait
+
+
+class AdmissionControlMiddleware:
+    """Ограничивает частоту дорогих запросов и общую параллельность.
+
+    Лимиты задаются в ``settings.RATE_LIMITS`` по имени URL
+    (``posts:post_create``, ``users:login``) и считаются отдельно для
+    пользователя или IP. Если все ``ADMISSION_MAX_CONCURRENCY`` слотов
+    заняты дольше ``ADMISSION_QUEUE_TIMEOUT``, запрос получает 503.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.slots = threading.BoundedSemaphore(
+            settings.ADMISSION_MAX_CONCURRENCY)
+        self.buckets = TokenBuckets(settings.RATE_LIMIT_MAX_KEYS)
+        self.stats = {'admitted': 0, 'shed': 0, 'throttled': 0,
+                      'queue_time': 0.0, 'max_queue_time': 0.0}
+        self.stats_lock = threading.Lock()
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        admitted = self.slots.acquire(
+            timeout=settings.ADMISSION_QUEUE_TIMEOUT)
+        request.queue_time = time.perf_counter() - started
+        self.record(admitted, request.queue_time)
+        if not admitted:
+            logger.warning('Shedding %s after %.3fs in queue',
+                           request.path, request.queue_time)
+            return self.reject(503, settings.ADMISSION_QUEUE_TIMEOUT)
+        try:
+            return self.get_response(request)
+        finally:
+            self.slots.release()
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_name = request.resolver_match.view_name
+        limit = settings.RATE_LIMITS.get(view_name)
+        if limit is None:
+            return None
+        if request.method not in limit.get('methods', ('POST',)):
+            return None
+        key = (view_name, self.client_key(request))
+        wait = self.buckets.take(key, limit['rate'], limit['burst'])
+        if wait:
+            with self.stats_lock:
+                self.stats['throttled'] += 1
+            return self.reject(429, wait)
+        return None
+
+    def record(self, admitted, queue_time):
+        with self.stats_lock:
+            self.stats['admitted' if admitted else 'shed'] += 1
+            self.stats['queue_time'] += queue_time
+            self.stats['max_queue_time'] = max(self.stats['max_queue_time'],
+                                               queue_time)
+
+    @staticmethod
+    def client_key(request):
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            return f'user:{user.pk}'
+        return f"ip:{request.META.get('REMOTE_ADDR', '')}"
+
+    @staticmethod
+    def reject(status, retry_after):
+        response = HttpResponse(
+            'Слишком много запросов, попробуйте позже',
+            status=status, content_type='text/plain; charset=utf-8')
+        response['Retry-After'] = max(1, int(retry_after + 0.5))
+        return response
+
+
+class MetricsMiddleware:
+    """Считает время, SQL, рендер шаблонов и размер ответа по
+    имени представления (``posts:index``, ``users:login``)."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        db = {'time': 0.0, 'queries': 0}
+
+        def measure_sql(execute, sql, params, many, context):
+            started = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                db['time'] += time.perf_counter() - started
+                db['queries'] += 1
+
+        metrics.local.template_time = 0.0
+        started = time.perf_counter()
+        try:
+            with connection.execute_wrapper(measure_sql):
+                response = self.get_response(request)
+        finally:
+            template_time = metrics.local.template_time
+            metrics.local.template_time = None
+        duration = time.perf_counter() - started
+
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else 'unresolved'
+        labels = {'view': view}
+        registry = metrics.registry
+        registry.inc('yatube_requests_total',
+                     {'view': view, 'method': request.method,
+                      'status': response.status_code})
+        registry.observe('yatube_request_duration_seconds', labels,
+                         duration)
+        registry.observe('yatube_request_db_seconds', labels, db['time'])
+        registry.inc('yatube_request_db_queries_total', labels,
+                     db['queries'])
+        registry.observe('yatube_template_render_seconds', labels,
+                         template_time)
+        if not response.streaming:
+            registry.observe('yatube_response_size_bytes', labels,
+                             len(response.content))
+        registry.flush()
+        return response
+
+
+class ProfilingMiddleware:
+    """Профилирует запрос по подписанному заголовку ``X-Profile`` или
+    параметру ``_profile`` от сотрудника; остальные запросы не трогает."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if self.requested(request):
+            return profiling.profile_request(self.get_response, request)
+        return self.get_response(request)
+
+    @staticmethod
+    def requested(request):
+        token = request.META.get('HTTP_X_PROFILE')
+        if token is not None:
+            return profiling.token_is_valid(token)
+        if '_profile' not in request.META.get('QUERY_STRING', ''):
+            return False
+        return '_profile' in request.GET and request.user.is_staff
+
+
+class SlowQueryMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with connection.execute_wrapper(SlowQueryLogger(request)):
+            return self.get_response(request)
+
+
+class HttpCacheMiddleware:
+    """Ставит ``Cache-Control``, ``Vary`` и суррогатные ключи по
+    ``settings.HTTP_CACHE_POLICIES``; стоит до сессий, чтобы видеть
+    выставленные ими cookie. 304 получает те же заголовки, что и 200:
+    прокси обновляет по ним сохранённую копию."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        match = getattr(request, 'resolver_match', None)
+        policy = settings.HTTP_CACHE_POLICIES.get(
+            match.view_name if match else None)
+        if policy is None or request.method not in ('GET', 'HEAD'):
+            return response
+        patch_vary_headers(response, ('Cookie',))
+        user = getattr(request, 'user', None)
+        if (response.status_code not in (200, 304) or response.cookies
+                or (user is not None and user.is_authenticated)):
+            patch_cache_control(response, private=True, no_cache=True)
+            return response
+        patch_cache_control(response, public=True, **policy)
+        keys = getattr(request, 'surrogate_keys', None)
+        if keys:
+            response[settings.SURROGATE_KEY_HEADER] = ' '.join(sorted(keys))
+        return response
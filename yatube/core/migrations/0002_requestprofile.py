@@ -0,0 +1,31 @@
+# Generated by Django 2.2.16 on 2026-10-19 19:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RequestProfile',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Создан')),
+                ('view_name', models.CharField(db_index=True, max_length=200, verbose_name='Представление')),
+                ('path', models.CharField(max_length=500, verbose_name='Адрес')),
+                ('args', models.TextField(default='{}', verbose_name='Аргументы')),
+                ('duration', models.FloatField(verbose_name='Длительность, с')),
+                ('profiler', models.CharField(max_length=20, verbose_name='Профайлер')),
+                ('report', models.TextField(verbose_name='Отчёт')),
+                ('stats', models.BinaryField(blank=True, null=True, verbose_name='Данные pstats')),
+            ],
+            options={
+                'verbose_name_plural': 'Профили запросов',
+                'ordering': ('-created',),
+            },
+        ),
+    ]
@@ -0,0 +1,73 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Task(models.Model):
+    QUEUED = 'queued'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (QUEUED, 'В очереди'),
+        (DONE, 'Выполнена'),
+        (FAILED, 'Ошибка'),
+    )
+
+    name = models.CharField(max_length=200, db_index=True,
+                            verbose_name='Задача')
+    kwargs = models.TextField(default='{}', verbose_name='Аргументы')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES,
+                              default=QUEUED, verbose_name='Статус')
+    attempts = models.PositiveIntegerField(default=0,
+                                           verbose_name='Попыток')
+    max_attempts = models.PositiveIntegerField(default=3,
+                                               verbose_name='Лимит попыток')
+    visible_at = models.DateTimeField(default=timezone.now,
+                                      verbose_name='Доступна с')
+    created = models.DateTimeField(auto_now_add=True,
+                                   verbose_name='Создана')
+    finished = models.DateTimeField(null=True, blank=True,
+                                    verbose_name='Завершена')
+    duration = models.FloatField(null=True, blank=True,
+                                 verbose_name='Длительность, с')
+    last_error = models.TextField(blank=True, verbose_name='Ошибка')
+
+    def __str__(self):
+        return f'{self.name} #{self.pk}'
+
+    class Meta:
+        ordering = ('visible_at',)
+        indexes = [models.Index(fields=('status', 'visible_at'))]
+        verbose_name_plural = 'Фоновые задачи'
+
+
+class CacheVersion(models.Model):
+    """Версия ключа ``core.cache.ObjectCache``, общая для всех процессов."""
+    key = models.CharField(max_length=200, unique=True, verbose_name='Ключ')
+    version = models.PositiveIntegerField(default=0, verbose_name='Версия')
+
+    def __str__(self):
+        return f'{self.key}: {self.version}'
+
+    class Meta:
+        verbose_name_plural = 'Версии кэша'
+
+
+class RequestProfile(models.Model):
+    created = models.DateTimeField(auto_now_add=True, db_index=True,
+                                   verbose_name='Создан')
+    view_name = models.CharField(max_length=200, db_index=True,
+                                 verbose_name='Представление')
+    path = models.CharField(max_length=500, verbose_name='Адрес')
+    args = models.TextField(default='{}', verbose_name='Аргументы')
+    duration = models.FloatField(verbose_name='Длительность, с')
+    profiler = models.CharField(max_length=20, verbose_name='Профайлер')
+    report = models.TextField(verbose_name='Отчёт')
+    stats = models.BinaryField(null=True, blank=True,
+                               verbose_name='Данные pstats')
+
+    def __str__(self):
+        return f'{self.view_name} {self.created:%Y-%m-%d %H:%M:%S}'
+
+    class Meta:
+        ordering = ('-created',)
+        verbose_name_plural = 'Профили запросов'
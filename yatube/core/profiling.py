@@ -0,0 +1,84 @@
+"""Профилирование отдельного запроса по требованию.
+
+Запрос профилируется, если у него есть заголовок ``X-Profile`` с
+токеном из ``make_token()`` или параметр ``?_profile=1`` от сотрудника.
+Если установлен pyinstrument, используется он (сэмплирующий профайлер),
+иначе cProfile.
+"""
+import cProfile
+import io
+import json
+import marshal
+import pstats
+import time
+
+from django.conf import settings
+from django.core import signing
+
+from .models import RequestProfile
+
+try:
+    import pyinstrument
+except ImportError:
+    pyinstrument = None
+
+SALT = 'core.profiling'
+
+
+def make_token():
+    return signing.TimestampSigner(salt=SALT).sign('profile')
+
+
+def token_is_valid(token):
+    try:
+        signing.TimestampSigner(salt=SALT).unsign(
+            token, max_age=settings.PROFILE_TOKEN_MAX_AGE)
+    except signing.BadSignature:
+        return False
+    return True
+
+
+def run_profiled(func, *args):
+    """Вызывает func и возвращает (результат, профайлер, отчёт, stats)."""
+    if pyinstrument is not None:
+        profiler = pyinstrument.Profiler()
+        profiler.start()
+        try:
+            result = func(*args)
+        finally:
+            profiler.stop()
+        return result, 'pyinstrument', profiler.output_text(), None
+    profiler = cProfile.Profile()
+    try:
+        result = profiler.runcall(func, *args)
+    finally:
+        profiler.create_stats()
+    report = io.StringIO()
+    stats = pstats.Stats(profiler, stream=report)
+    stats.sort_stats('cumulative').print_stats(settings.PROFILE_REPORT_LINES)
+    return result, 'cProfile', report.getvalue(), marshal.dumps(stats.stats)
+
+
+def save(request, duration, profiler, report, stats):
+    match = getattr(request, 'resolver_match', None)
+    RequestProfile.objects.create(
+        view_name=match.view_name if match else '',
+        path=request.get_full_path()[:500],
+        args=json.dumps({'args': match.args if match else [],
+                         'kwargs': match.kwargs if match else {}},
+                        ensure_ascii=False, default=str),
+        duration=duration,
+        profiler=profiler,
+        report=report,
+        stats=stats,
+    )
+    stale = (RequestProfile.objects.order_by('-created')
+             .values_list('pk', flat=True)[settings.PROFILE_KEEP:])
+    RequestProfile.objects.filter(pk__in=list(stale)).delete()
+
+
+def profile_request(get_response, request):
+    started = time.perf_counter()
+    response, profiler, report, stats = run_profiled(get_response, request)
+    save(request, time.perf_counter() - started, profiler, report, stats)
+    return response
@@ -0,0 +1,88 @@
+"""Публикация событий подписчикам внутри процесса.
+
+У каждого подписчика своя очередь на ``maxsize`` событий. Публикация
+никогда не ждёт: если очередь полна, подписчик помечается отставшим и
+больше событий не получает, а поток ответа закрывает соединение, чтобы
+клиент переподключился и дочитал пропущенное. Так медленный клиент не
+тормозит остальных и не копит память. Событие сериализуется один раз и
+раздаётся всем подписчикам одним и тем же объектом.
+"""
+import queue
+import threading
+
+
+class Subscription:
+    __slots__ = ('hub', 'topics', 'events', 'lagging')
+
+    def __init__(self, hub, topics, maxsize):
+        self.hub = hub
+        self.topics = topics
+        self.events = queue.Queue(maxsize)
+        self.lagging = False
+
+    def offer(self, event):
+        if self.lagging:
+            return
+        try:
+            self.events.put_nowait(event)
+        except queue.Full:
+            self.lagging = True
+
+    def get(self, timeout):
+        """Следующее событие или ``None``, если за ``timeout`` не было."""
+        try:
+            return self.events.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.hub.unsubscribe(self)
+
+
+class TooManySubscribers(Exception):
+    pass
+
+
+class Hub:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.topics = {}
+        self.count = 0
+
+    def subscribe(self, topics, maxsize, limit):
+        subscription = Subscription(self, tuple(topics), maxsize)
+        with self.lock:
+            if self.count >= limit:
+                raise TooManySubscribers
+            self.count += 1
+            for topic in subscription.topics:
+                self.topics.setdefault(topic, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            removed = False
+            for topic in subscription.topics:
+                subscribers = self.topics.get(topic)
+                if subscribers is None or subscription not in subscribers:
+                    continue
+                removed = True
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self.topics[topic]
+            if removed:
+                self.count -= 1
+
+    def has_subscribers(self, topics):
+        with self.lock:
+            return any(topic in self.topics for topic in topics)
+
+    def publish(self, topics, event):
+        """Раздаёт событие подписчикам любой из тем; возвращает число."""
+        with self.lock:
+            subscribers = set()
+            for topic in topics:
+                subscribers.update(self.topics.get(topic, ()))
+        for subscription in subscribers:
+            subscription.offer(event)
+        return len(subscribers)
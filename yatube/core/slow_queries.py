@@ -0,0 +1,139 @@
+"""Журнал медленных SQL-запросов.
+
+Запросы дольше ``settings.SLOW_QUERY_THRESHOLD`` секунд пишутся строкой
+JSON в ``settings.SLOW_QUERY_LOG`` вместе с представлением, местом вызова
+в коде проекта и параметрами. Для каждого отпечатка запроса (SQL без
+литералов и с ``IN (...)`` свёрнутым в одну позицию) процесс один раз
+снимает ``EXPLAIN QUERY PLAN``; он идёт мимо обёрток соединения и не
+попадает ни в журнал, ни в метрики запроса. Сводку строит
+``manage.py slow_queries``.
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+import traceback
+
+from django.conf import settings
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+explained = set()
+write_lock = threading.Lock()
+
+IN_LIST = re.compile(r'IN \((?:%s, )*%s\)')
+LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+SPACES = re.compile(r'\s+')
+
+CORE_DIR = os.path.dirname(os.path.abspath(__file__))
+WRAPPER_FILES = {os.path.join(CORE_DIR, 'slow_queries.py'),
+                 os.path.join(CORE_DIR, 'middleware.py')}
+
+
+def fingerprint(sql):
+    normalized = IN_LIST.sub('IN (...)', sql)
+    normalized = LITERALS.sub('?', normalized)
+    normalized = SPACES.sub(' ', normalized).strip()
+    return hashlib.md5(normalized.encode()).hexdigest()[:16], normalized
+
+
+def origin():
+    """Первый кадр стека из кода проекта, а не Django и не обёрток."""
+    for frame in reversed(traceback.extract_stack()[:-2]):
+        path = os.path.abspath(frame.filename)
+        if (path.startswith(settings.BASE_DIR) and path not in WRAPPER_FILES
+                and 'site-packages' not in path):
+            relative = os.path.relpath(path, settings.BASE_DIR)
+            return f'{relative}:{frame.lineno} in {frame.name}'
+    return ''
+
+
+def explain(connection, sql, params):
+    if not sql.lstrip().upper().startswith('SELECT'):
+        return None
+    prefix = ('EXPLAIN QUERY PLAN ' if connection.vendor == 'sqlite'
+              else 'EXPLAIN ')
+    wrappers, connection.execute_wrappers = connection.execute_wrappers, []
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(prefix + sql, params)
+            return [' '.join(str(cell) for cell in row)
+                    for row in cursor.fetchall()]
+    except Exception:
+        logger.debug('EXPLAIN failed', exc_info=True)
+        return None
+    finally:
+        connection.execute_wrappers = wrappers
+
+
+def write(record):
+    path = settings.SLOW_QUERY_LOG
+    if not path:
+        return
+    line = json.dumps(record, ensure_ascii=False, default=str)
+    with write_lock:
+        with open(path, 'a', encoding='utf-8') as log_file:
+            log_file.write(line + '\n')
+
+
+def record(connection, sql, params, duration, view):
+    key, normalized = fingerprint(sql)
+    entry = {
+        'time': timezone.now().isoformat(),
+        'fingerprint': key,
+        'sql': normalized,
+        'params': repr(params)[:500],
+        'duration': round(duration, 6),
+        'view': view,
+        'origin': origin(),
+    }
+    if key not in explained:
+        explained.add(key)
+        entry['plan'] = explain(connection, sql, params)
+    logger.info('Slow query %.3fs in %s at %s: %s', duration, view,
+                entry['origin'], normalized[:200])
+    write(entry)
+
+
+class SlowQueryLogger:
+    """Обёртка ``connection.execute_wrapper`` на время одного запроса."""
+
+    def __init__(self, request):
+        self.request = request
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        result = execute(sql, params, many, context)
+        duration = time.perf_counter() - started
+        if duration >= settings.SLOW_QUERY_THRESHOLD and not many:
+            match = getattr(self.request, 'resolver_match', None)
+            record(context['connection'], sql, params, duration,
+                   match.view_name if match else '')
+        return result
+
+
+def report(path):
+    """Сводка журнала по отпечаткам, самые затратные сверху."""
+    summary = {}
+    with open(path, encoding='utf-8') as log_file:
+        for line in log_file:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            row = summary.setdefault(entry['fingerprint'], {
+                'sql': entry['sql'], 'count': 0, 'total': 0.0, 'max': 0.0,
+                'views': set(), 'origins': set(), 'plan': None,
+            })
+            row['count'] += 1
+            row['total'] += entry['duration']
+            row['max'] = max(row['max'], entry['duration'])
+            row['views'].add(entry['view'])
+            row['origins'].add(entry['origin'])
+            if entry.get('plan'):
+                row['plan'] = entry['plan']
+    return sorted(summary.items(), key=lambda item: -item[1]['total'])
@@ -0,0 +1,64 @@
+"""Заголовки кэширования для прокси и сброс по суррогатным ключам.
+
+Политика кэширования задаётся в ``settings.HTTP_CACHE_POLICIES`` по
+имени URL и применяется ``HttpCacheMiddleware`` только к анонимным
+ответам 200 без cookie. Представление помечает ответ ключами через
+``tag`` (``post-5``, ``group-cats``), ключи уходят в заголовке
+``settings.SURROGATE_KEY_HEADER``. ``send_purge`` просит каждый прокси из
+``settings.SURROGATE_PURGE_URLS`` выбросить страницы с этими ключами.
+
+``purge`` копит ключи до конца транзакции и ставит одну задачу
+``purge_keys`` на транзакцию, так что пакетное удаление сотен постов
+даёт один запрос к каждому прокси.
+"""
+import logging
+
+import requests
+from django.conf import settings
+
+from .batching import OnCommitBatch
+from .tasks import enqueue, task
+
+logger = logging.getLogger(__name__)
+
+
+def tag(request, *keys):
+    """Добавляет суррогатные ключи, от которых зависит ответ."""
+    if not hasattr(request, 'surrogate_keys'):
+        request.surrogate_keys = set()
+    request.surrogate_keys.update(keys)
+
+
+def send_purge(keys):
+    """Сбрасывает ключи на всех прокси; падает, если хоть один не ответил."""
+    failed = []
+    for url in settings.SURROGATE_PURGE_URLS:
+        try:
+            response = requests.request(
+                settings.SURROGATE_PURGE_METHOD, url,
+                headers={settings.SURROGATE_KEY_HEADER: ' '.join(keys)},
+                timeout=settings.SURROGATE_PURGE_TIMEOUT)
+            response.raise_for_status()
+        except requests.RequestException as error:
+            logger.warning('Purge of %s on %s failed: %s', keys, url, error)
+            failed.append(url)
+    if failed:
+        raise RuntimeError(f"Прокси не сбросили кэш: {', '.join(failed)}")
+
+
+@task()
+def purge_keys(keys):
+    send_purge(keys)
+
+
+def enqueue_purge(keys):
+    enqueue(purge_keys, keys=sorted(keys))
+
+
+batches = OnCommitBatch(enqueue_purge)
+
+
+def purge(keys):
+    """Сбрасывает ключи на прокси после фиксации текущей транзакции."""
+    if settings.SURROGATE_PURGE_URLS and keys:
+        batches.add(keys)
@@ -0,0 +1,176 @@
+"""Очередь фоновых задач в базе данных, без внешнего брокера.
+
+Задача регистрируется декоратором ``task`` в модуле ``tasks.py``
+приложения и ставится в очередь через ``enqueue``. Воркер
+(``manage.py run_tasks``) забирает задачу, сдвигая ``visible_at`` на
+таймаут видимости: если воркер упадёт, задача снова станет доступной.
+Задача, которая исчерпала попытки, так и не завершившись (например,
+роняет воркер), при следующем ``claim`` помечается упавшей. Результат
+сохраняет только воркер, который всё ещё владеет задачей. Выполненные
+задачи старше ``settings.TASKS_RETENTION_DAYS`` дней удаляются из
+``run_pending``.
+"""
+import json
+import logging
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Avg, Count, F, Max
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+_registry = {}
+_purged = None
+
+
+def task(name=None, max_attempts=None):
+    def decorator(func):
+        task_name = name or f'{func.__module__}.{func.__name__}'
+        func.task_name = task_name
+        func.max_attempts = max_attempts or settings.TASKS_MAX_ATTEMPTS
+        _registry[task_name] = func
+        return func
+    return decorator
+
+
+def autodiscover():
+    autodiscover_modules('tasks')
+
+
+def _task_name(func_or_name):
+    return getattr(func_or_name, 'task_name', func_or_name)
+
+
+def enqueue(func_or_name, delay=0, **kwargs):
+    name = _task_name(func_or_name)
+    func = _registry.get(name)
+    max_attempts = getattr(func, 'max_attempts',
+                           settings.TASKS_MAX_ATTEMPTS)
+    return Task.objects.create(
+        name=name,
+        kwargs=json.dumps(kwargs),
+        max_attempts=max_attempts,
+        visible_at=timezone.now() + timedelta(seconds=delay),
+    )
+
+
+def enqueue_on_commit(func_or_name, delay=0, **kwargs):
+    """Ставит задачу в очередь после фиксации текущей транзакции."""
+    transaction.on_commit(lambda: enqueue(func_or_name, delay, **kwargs))
+
+
+def claim(batch=None, timeout=None):
+    """Забирает до ``batch`` готовых задач, скрывая их на ``timeout``."""
+    batch = batch or settings.TASKS_BATCH
+    timeout = timeout or settings.TASKS_VISIBILITY_TIMEOUT
+    now = timezone.now()
+    ready = Task.objects.filter(status=Task.QUEUED, visible_at__lte=now)
+    # Попытки кончились, а задача всё ещё в очереди: воркер не дожил до
+    # конца выполнения. Ещё раз её не выдаём.
+    exhausted = ready.filter(attempts__gte=F('max_attempts')).update(
+        status=Task.FAILED, finished=now)
+    if exhausted:
+        logger.error('%s tasks exhausted their attempts unfinished',
+                     exhausted)
+    candidates = (ready.filter(attempts__lt=F('max_attempts'))
+                  .values_list('pk', 'visible_at')[:batch])
+    hidden_until = now + timedelta(seconds=timeout)
+    claimed = []
+    for pk, visible_at in candidates:
+        # Условный UPDATE: из нескольких воркеров задачу получит один.
+        won = Task.objects.filter(
+            pk=pk, status=Task.QUEUED, visible_at=visible_at
+        ).update(visible_at=hidden_until, attempts=F('attempts') + 1)
+        if won:
+            claimed.append(pk)
+    return list(Task.objects.filter(pk__in=claimed))
+
+
+def execute(task_obj):
+    """Выполняет забранную задачу; возвращает её статус.
+
+    Если таймаут видимости истёк и задачу забрал другой воркер,
+    результат не сохраняется и возвращается ``None``.
+    """
+    func = _registry.get(task_obj.name)
+    claimed_until = task_obj.visible_at
+    started = time.perf_counter()
+    try:
+        if func is None:
+            raise LookupError(f'Задача {task_obj.name} не зарегистрирована')
+        func(**json.loads(task_obj.kwargs))
+    except Exception:
+        task_obj.duration = time.perf_counter() - started
+        task_obj.last_error = traceback.format_exc()
+        if task_obj.attempts >= task_obj.max_attempts:
+            task_obj.status = Task.FAILED
+            task_obj.finished = timezone.now()
+            logger.error('Task %s failed', task_obj, exc_info=True)
+        else:
+            backoff = settings.TASKS_RETRY_DELAY * 2 ** (
+                task_obj.attempts - 1)
+            task_obj.visible_at = timezone.now() + timedelta(
+                seconds=backoff)
+            logger.warning('Task %s will be retried', task_obj)
+    else:
+        task_obj.duration = time.perf_counter() - started
+        task_obj.status = Task.DONE
+        task_obj.finished = timezone.now()
+    saved = Task.objects.filter(
+        pk=task_obj.pk, visible_at=claimed_until
+    ).update(status=task_obj.status, visible_at=task_obj.visible_at,
+             finished=task_obj.finished, duration=task_obj.duration,
+             last_error=task_obj.last_error)
+    if not saved:
+        logger.warning('Task %s was reclaimed, result dropped', task_obj)
+        return None
+    return task_obj.status
+
+
+def purge(days=None):
+    """Удаляет выполненные задачи старше ``days`` дней; возвращает число."""
+    days = settings.TASKS_RETENTION_DAYS if days is None else days
+    expired = Task.objects.filter(
+        status=Task.DONE, finished__lt=timezone.now() - timedelta(days=days))
+    deleted = 0
+    while True:
+        pks = list(expired.values_list('pk', flat=True)
+                   [:settings.TASKS_PURGE_BATCH])
+        if not pks:
+            return deleted
+        deleted += Task.objects.filter(pk__in=pks).delete()[0]
+
+
+def run_pending(batch=None, timeout=None):
+    """Выполняет одну пачку задач, возвращает число обработанных.
+
+    Не чаще раза в ``settings.TASKS_PURGE_INTERVAL`` секунд заодно
+    чистит старые выполненные задачи.
+    """
+    global _purged
+    tasks = claim(batch, timeout)
+    for task_obj in tasks:
+        execute(task_obj)
+    now = time.monotonic()
+    if _purged is None or now - _purged >= settings.TASKS_PURGE_INTERVAL:
+        _purged = now
+        purge()
+    return len(tasks)
+
+
+def stats():
+    """Метрики по каждой задаче: счётчики статусов и длительность."""
+    rows = (Task.objects
+            .values('name', 'status')
+            .annotate(count=Count('pk'),
+                      avg_duration=Avg('duration'),
+                      max_duration=Max('duration'))
+            .order_by('name', 'status'))
+    return list(rows)
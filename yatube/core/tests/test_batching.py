@@ -0,0 +1,41 @@
+from collections import Counter
+
+from django.db import transaction
+from django.test import TransactionTestCase
+
+from core.batching import OnCommitBatch
+
+
+class OnCommitBatchTests(TransactionTestCase):
+    def setUp(self):
+        self.applied = []
+        self.batch = OnCommitBatch(self.applied.append, Counter)
+
+    def test_one_apply_per_transaction(self):
+        """Элементы транзакции применяются одним вызовом после фиксации"""
+        with transaction.atomic():
+            self.batch.add({'a': 1})
+            self.batch.add({'a': 2, 'b': -1})
+            self.assertEqual(self.applied, [])
+        self.assertEqual(self.applied, [Counter({'a': 3, 'b': -1})])
+
+    def test_outside_transaction_applied_at_once(self):
+        """Вне транзакции пачка применяется сразу"""
+        self.batch.add({'a': 1})
+        self.batch.add({'a': 1})
+        self.assertEqual(self.applied, [Counter({'a': 1})] * 2)
+
+    def test_rollback_discards(self):
+        """Откат транзакции или точки сохранения выбрасывает её элементы"""
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                self.batch.add({'a': 1})
+                raise RuntimeError
+        with transaction.atomic():
+            self.batch.add({'a': 1})
+            with self.assertRaises(RuntimeError):
+                with transaction.atomic():
+                    self.batch.add({'b': 1})
+                    raise RuntimeError
+            self.batch.add({'c': 1})
+        self.assertEqual(self.applied, [Counter({'a': 1, 'c': 1})])
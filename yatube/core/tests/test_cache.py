@@ -0,0 +1,106 @@
+import threading
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import connections
+from django.test import TransactionTestCase, override_settings
+
+from core.cache import ObjectCache
+
+
+class ObjectCacheTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.calls = 0
+        self.value = 'first'
+        self.objects = ObjectCache('test', self.load)
+
+    def load(self, key):
+        self.calls += 1
+        time.sleep(0.05)
+        return f'{key}:{self.value}'
+
+    def read_in_threads(self, count=20):
+        barrier = threading.Barrier(count)
+        results = []
+
+        def read():
+            barrier.wait()
+            try:
+                results.append(self.objects.get(1))
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=read) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_single_flight(self):
+        """Параллельные промахи по одному ключу загружают его один раз"""
+        results = self.read_in_threads()
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(set(results), {'1:first'})
+
+    @override_settings(OBJECT_CACHE_SOFT_TTL=0)
+    def test_stale_value_refreshed_in_background(self):
+        """Устаревшее значение отдаётся сразу и обновляется один раз"""
+        self.objects.get(1)
+        self.value = 'second'
+        results = self.read_in_threads()
+        self.objects.wait()
+        self.assertEqual(set(results), {'1:first'})
+        self.assertEqual(self.calls, 2)
+        self.assertEqual(cache.get('test:1')[0], '1:second')
+
+    def test_invalidate(self):
+        """invalidate заставляет загрузить значение заново"""
+        self.objects.get(1)
+        self.value = 'second'
+        self.objects.invalidate(1)
+        self.assertEqual(self.objects.get(1), '1:second')
+
+    def test_load_overlapping_invalidate_not_served(self):
+        """Значение, загруженное до сброса и сохранённое после, не отдаётся"""
+        def load(key):
+            value = f'{key}:{self.value}'
+            self.value = 'second'
+            self.objects.invalidate(key)
+            return value
+
+        self.objects.loader = load
+        self.assertEqual(self.objects.get(1), '1:first')
+        self.objects.loader = self.load
+        self.assertEqual(self.objects.get(1), '1:second')
+
+    def test_invalidate_many(self):
+        """invalidate_many сбрасывает несколько ключей разом"""
+        self.objects.get(1)
+        self.objects.get(2)
+        self.value = 'second'
+        self.objects.invalidate_many([1, 2])
+        self.assertEqual(self.objects.get(1), '1:second')
+        self.assertEqual(self.objects.get(2), '2:second')
+
+    def test_invalidate_reaches_other_processes(self):
+        """Сброс в одном процессе виден процессу со своим кэшем"""
+        first = LocMemCache('objects-first', {})
+        second = LocMemCache('objects-second', {})
+        with mock.patch('core.cache.cache', first):
+            self.assertEqual(self.objects.get(1), '1:first')
+        self.value = 'second'
+        with mock.patch('core.cache.cache', second):
+            self.objects.invalidate(1)
+        with mock.patch('core.cache.cache', first):
+            self.assertEqual(self.objects.get(1), '1:second')
+
+    def test_errors_reach_waiters(self):
+        """Ошибка загрузчика не кэшируется и не вешает ожидающих"""
+        objects = ObjectCache('broken', lambda key: 1 / 0)
+        with self.assertRaises(ZeroDivisionError):
+            objects.get(1)
+        self.assertIsNone(cache.get('broken:1'))
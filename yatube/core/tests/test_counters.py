@@ -0,0 +1,68 @@
+import threading
+
+from django.test import SimpleTestCase, override_settings
+
+from core.counters import CounterBuffer
+
+
+@override_settings(COUNTER_FLUSH_INTERVAL=3600, COUNTER_MAX_PENDING=100)
+class CounterBufferTests(SimpleTestCase):
+    def setUp(self):
+        self.batches = []
+        self.fail = False
+        self.counters = CounterBuffer(self.write)
+
+    def write(self, counts):
+        if self.fail:
+            raise RuntimeError('база недоступна')
+        self.batches.append(counts)
+
+    def test_increments_aggregated(self):
+        """Увеличения одного ключа уходят одной строкой пакета"""
+        for _ in range(5):
+            self.counters.add(1)
+        self.counters.add(2, 3)
+        self.assertEqual(self.batches, [])
+        self.assertEqual(self.counters.flush(), 2)
+        self.assertEqual(self.batches, [{1: 5, 2: 3}])
+        self.assertEqual(self.counters.get(1), 0)
+
+    def test_concurrent_increments_not_lost(self):
+        """Параллельные увеличения не теряются"""
+        def hit():
+            for _ in range(1000):
+                self.counters.add(1)
+
+        threads = [threading.Thread(target=hit) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.counters.flush()
+        self.assertEqual(self.batches, [{1: 8000}])
+
+    def test_failed_flush_kept(self):
+        """Неудачный сброс возвращает числа в буфер"""
+        self.counters.add(1, 2)
+        self.fail = True
+        with self.assertLogs('core.counters', 'WARNING'):
+            self.assertEqual(self.counters.flush(), 0)
+        self.counters.add(1)
+        self.fail = False
+        self.counters.flush()
+        self.assertEqual(self.batches, [{1: 3}])
+
+    @override_settings(COUNTER_MAX_PENDING=3)
+    def test_flush_when_buffer_full(self):
+        """Переполненный буфер сбрасывается в фоне"""
+        for key in range(3):
+            self.counters.add(key)
+        self.counters.wait()
+        self.assertEqual(self.batches, [{0: 1, 1: 1, 2: 1}])
+
+    @override_settings(COUNTER_FLUSH_INTERVAL=0)
+    def test_flush_after_interval(self):
+        """По истечении интервала буфер сбрасывается в фоне"""
+        self.counters.add(1)
+        self.counters.wait()
+        self.assertEqual(self.batches, [{1: 1}])
@@ -0,0 +1,113 @@
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+CONTENT = bytes(range(256)) * 40
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, MEDIA_SENDFILE='')
+class MediaServingTests(TestCase):
+    url = '/media/posts/file.bin'
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        os.makedirs(os.path.join(TEMP_MEDIA_ROOT, 'posts'), exist_ok=True)
+        with open(os.path.join(TEMP_MEDIA_ROOT, 'posts', 'file.bin'),
+                  'wb') as file_obj:
+            file_obj.write(CONTENT)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def get(self, **headers):
+        response = self.client.get(self.url, **headers)
+        self.addCleanup(response.close)
+        return response
+
+    def test_full_file(self):
+        """Файл целиком отдаётся FileResponse с ETag и Accept-Ranges"""
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), CONTENT)
+        self.assertEqual(response['Content-Length'], str(len(CONTENT)))
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertIn('ETag', response)
+
+    def test_ranges(self):
+        """Диапазоны отдаются с кодом 206 и верным Content-Range"""
+        size = len(CONTENT)
+        cases = {
+            'bytes=0-99': (0, 99),
+            'bytes=100-': (100, size - 1),
+            'bytes=-50': (size - 50, size - 1),
+            'bytes=10-100000': (10, size - 1),
+        }
+        for header, (start, end) in cases.items():
+            with self.subTest(header=header):
+                response = self.get(HTTP_RANGE=header)
+                self.assertEqual(response.status_code, 206)
+                self.assertEqual(response['Content-Range'],
+                                 f'bytes {start}-{end}/{size}')
+                self.assertEqual(response['Content-Length'],
+                                 str(end - start + 1))
+                self.assertEqual(b''.join(response.streaming_content),
+                                 CONTENT[start:end + 1])
+
+    def test_unsatisfiable_range(self):
+        """Диапазон за концом файла даёт 416"""
+        response = self.get(HTTP_RANGE=f'bytes={len(CONTENT)}-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'],
+                         f'bytes */{len(CONTENT)}')
+        self.assertNotIn('public', response.get('Cache-Control', ''))
+
+    def test_if_range_mismatch_serves_full_file(self):
+        """Устаревший If-Range отменяет диапазон"""
+        response = self.get(HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"old"')
+        self.assertEqual(response.status_code, 200)
+
+    def test_if_none_match(self):
+        """Совпавший ETag даёт 304"""
+        etag = self.get()['ETag']
+        response = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        self.assertNotIn('public', response.get('Cache-Control', ''))
+
+    def test_missing_and_traversal(self):
+        """Несуществующий файл и выход за MEDIA_ROOT дают 404"""
+        for url in ('/media/posts/none.bin',
+                    '/media/posts/%2e%2e/%2e%2e/settings.py',
+                    '/media/posts/'):
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 404)
+
+    @override_settings(MEDIA_SENDFILE='x-accel-redirect')
+    def test_x_accel_redirect(self):
+        """В режиме nginx тело пустое, файл отдаёт фронт-сервер"""
+        response = self.get()
+        self.assertEqual(response['X-Accel-Redirect'],
+                         '/protected-media/posts/file.bin')
+        self.assertEqual(response.content, b'')
+
+    @override_settings(MEDIA_SENDFILE='x-sendfile')
+    def test_x_sendfile(self):
+        """В режиме X-Sendfile передаётся абсолютный путь"""
+        response = self.get()
+        self.assertEqual(response['X-Sendfile'],
+                         os.path.join(TEMP_MEDIA_ROOT, 'posts', 'file.bin'))
+
+    def test_bench_media_command(self):
+        """bench_media печатает строку на каждый способ отдачи"""
+        out = StringIO()
+        call_command('bench_media', size=1, repeat=1, stdout=out)
+        self.assertEqual(len(out.getvalue().splitlines()), 3)
@@ -0,0 +1,64 @@
+import json
+import os
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core import metrics
+
+User = get_user_model()
+
+
+class MetricsTests(TestCase):
+    def test_views_are_measured(self):
+        """Запросы к представлениям попадают в метрики по имени"""
+        client = Client()
+        client.get(reverse('posts:index'))
+        response = client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 200)
+        text = response.content.decode()
+        self.assertIn('yatube_requests_total{method="GET",status="200",'
+                      'view="posts:index"}', text)
+        for name in ('yatube_request_duration_seconds',
+                     'yatube_request_db_seconds',
+                     'yatube_template_render_seconds',
+                     'yatube_response_size_bytes'):
+            with self.subTest(name=name):
+                self.assertIn(f'{name}_count{{view="posts:index"}}', text)
+
+    def test_metrics_forbidden_for_outsiders(self):
+        """Метрики недоступны с внешних адресов"""
+        response = Client(REMOTE_ADDR='10.0.0.1').get(reverse('metrics'))
+        self.assertEqual(response.status_code, 403)
+
+    def test_histogram_exposition(self):
+        """Гистограмма выводится накопительными корзинами"""
+        registry = metrics.Registry()
+        for value in (0.003, 0.2, 20):
+            registry.observe('yatube_request_duration_seconds',
+                             {'view': 'posts:index'}, value)
+        text = metrics.render(registry.snapshot())
+        self.assertIn('_bucket{view="posts:index",le="0.005"} 1', text)
+        self.assertIn('_bucket{view="posts:index",le="0.25"} 2', text)
+        self.assertIn('_bucket{view="posts:index",le="+Inf"} 3', text)
+        self.assertIn('_count{view="posts:index"} 3', text)
+
+    def test_snapshots_of_workers_are_summed(self):
+        """Метрики других процессов складываются с текущим"""
+        labels = {'view': 'about:tech', 'method': 'GET', 'status': 200}
+        other = metrics.Registry()
+        other.inc('yatube_requests_total', labels, 5)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'metrics-1.json')
+            with open(path, 'w') as snapshot_file:
+                json.dump(other.snapshot(), snapshot_file)
+            with override_settings(METRICS_DIR=directory):
+                before = metrics.collect().get(
+                    metrics.Registry.key('yatube_requests_total', labels), 0)
+                Client().get(reverse('about:tech'))
+                after = metrics.collect()[
+                    metrics.Registry.key('yatube_requests_total', labels)]
+        self.assertGreaterEqual(before, 5)
+        self.assertEqual(after, before + 1)
@@ -0,0 +1,41 @@
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+User = get_user_model()
+
+
+class AdmissionControlTests(TestCase):
+    @override_settings(RATE_LIMITS={'users:login': {'rate': 0.01,
+                                                    'burst': 2}})
+    def test_login_rate_limited(self):
+        """Попытки входа сверх лимита получают 429"""
+        client = Client()
+        url = reverse('users:login')
+        data = {'username': 'nobody', 'password': 'wrong'}
+        for _ in range(2):
+            self.assertEqual(client.post(url, data).status_code, 200)
+        response = client.post(url, data)
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+        self.assertEqual(client.get(url).status_code, 200)
+
+    @override_settings(RATE_LIMITS={'posts:post_create': {'rate': 0.01,
+                                                          'burst': 1}})
+    def test_limits_are_per_user(self):
+        """Лимит считается отдельно для каждого пользователя"""
+        url = reverse('posts:post_create')
+        for username in ('first', 'second'):
+            client = Client()
+            client.force_login(User.objects.create_user(username=username))
+            self.assertEqual(client.post(url, {'text': 'Пост'}).status_code,
+                             302)
+            self.assertEqual(client.post(url, {'text': 'Пост'}).status_code,
+                             429)
+
+    @override_settings(ADMISSION_MAX_CONCURRENCY=0,
+                       ADMISSION_QUEUE_TIMEOUT=0)
+    def test_overload_is_shed(self):
+        """Без свободных слотов запрос отклоняется с 503"""
+        response = Client().get(reverse('posts:index'))
+        self.assertEqual(response.status_code, 503)
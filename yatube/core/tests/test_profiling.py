@@ -0,0 +1,56 @@
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from core.models import RequestProfile
+from core.profiling import make_token
+from posts.models import Group
+
+User = get_user_model()
+
+
+class ProfilingMiddlewareTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.group = Group.objects.create(title='Группа', slug='group')
+        cls.staff = User.objects.create_user(username='staff',
+                                             is_staff=True)
+        cls.user = User.objects.create_user(username='user')
+        cls.url = reverse('posts:group_list', kwargs={'slug': 'group'})
+
+    def test_staff_query_parameter(self):
+        """Сотрудник профилирует запрос параметром _profile"""
+        client = Client()
+        client.force_login(self.staff)
+        response = client.get(self.url, {'_profile': 1})
+        self.assertEqual(response.status_code, 200)
+        profile = RequestProfile.objects.get()
+        self.assertEqual(profile.view_name, 'posts:group_list')
+        self.assertIn('"slug": "group"', profile.args)
+        self.assertTrue(profile.report)
+
+    def test_query_parameter_ignored_for_users(self):
+        """Обычный пользователь не может включить профилирование"""
+        client = Client()
+        client.force_login(self.user)
+        client.get(self.url, {'_profile': 1})
+        self.assertFalse(RequestProfile.objects.exists())
+
+    def test_signed_header(self):
+        """Подписанный заголовок X-Profile включает профилирование"""
+        Client().get(self.url, HTTP_X_PROFILE=make_token())
+        Client().get(self.url, HTTP_X_PROFILE='forged')
+        self.assertEqual(RequestProfile.objects.count(), 1)
+
+    def test_profiles_listed_in_admin(self):
+        """Профили запросов видны в админке"""
+        Client().get(self.url, HTTP_X_PROFILE=make_token())
+        admin = User.objects.create_superuser(username='admin',
+                                              email='admin@mail.ru',
+                                              password='admin-pass')
+        client = Client()
+        client.force_login(admin)
+        response = client.get(
+            reverse('admin:core_requestprofile_changelist'))
+        self.assertContains(response, 'posts:group_list')
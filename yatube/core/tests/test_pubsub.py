@@ -0,0 +1,45 @@
+from django.test import SimpleTestCase
+
+from core.pubsub import Hub, TooManySubscribers
+
+
+class HubTests(SimpleTestCase):
+    def setUp(self):
+        self.hub = Hub()
+
+    def test_publish_by_topic(self):
+        """Событие получают только подписчики его тем"""
+        index = self.hub.subscribe(('index',), 10, 100)
+        group = self.hub.subscribe(('group-1',), 10, 100)
+        self.assertEqual(self.hub.publish(('index', 'author-1'), b'x'), 1)
+        self.assertEqual(index.get(0), b'x')
+        self.assertIsNone(group.get(0))
+
+    def test_full_buffer_marks_lagging(self):
+        """Переполненная очередь не блокирует публикацию"""
+        subscription = self.hub.subscribe(('index',), 2, 100)
+        for i in range(5):
+            self.hub.publish(('index',), i)
+        self.assertTrue(subscription.lagging)
+        self.assertEqual([subscription.get(0), subscription.get(0)], [0, 1])
+        self.assertIsNone(subscription.get(0))
+
+    def test_subscriber_limit_and_close(self):
+        """Лимит подписчиков освобождается при закрытии"""
+        first = self.hub.subscribe(('index',), 1, 1)
+        with self.assertRaises(TooManySubscribers):
+            self.hub.subscribe(('index',), 1, 1)
+        first.close()
+        first.close()
+        self.assertEqual(self.hub.count, 0)
+        self.assertFalse(self.hub.has_subscribers(('index',)))
+        self.hub.subscribe(('index',), 1, 1)
+
+    def test_many_idle_subscribers(self):
+        """Тысячи подписчиков получают одно и то же событие"""
+        subscriptions = [self.hub.subscribe(('index',), 1, 10000)
+                         for _ in range(5000)]
+        event = b'event'
+        self.assertEqual(self.hub.publish(('index',), event), 5000)
+        self.assertTrue(all(subscription.get(0) is event
+                            for subscription in subscriptions))
@@ -0,0 +1,71 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core import slow_queries
+from posts.models import Post
+
+User = get_user_model()
+
+
+class SlowQueryLogTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.log = os.path.join(directory.name, 'slow.log')
+        slow_queries.explained.clear()
+        Post.objects.create(text='Пост',
+                            author=User.objects.create_user(username='user'))
+
+    def test_fingerprint_ignores_literals(self):
+        """Запросы с разными значениями дают один отпечаток"""
+        first, _ = slow_queries.fingerprint(
+            'SELECT * FROM t WHERE id IN (%s, %s) LIMIT 21')
+        second, normalized = slow_queries.fingerprint(
+            'SELECT * FROM t WHERE id IN (%s, %s, %s) LIMIT 5')
+        self.assertEqual(first, second)
+        self.assertEqual(normalized, 'SELECT * FROM t WHERE id IN (...) '
+                                     'LIMIT ?')
+
+    def test_slow_queries_logged_with_plan_once(self):
+        """Медленные запросы пишутся в журнал, план снимается один раз"""
+        with override_settings(SLOW_QUERY_THRESHOLD=0,
+                               SLOW_QUERY_LOG=self.log):
+            Client().get(reverse('posts:index'))
+            Client().get(reverse('posts:index'))
+        with open(self.log, encoding='utf-8') as log_file:
+            entries = [json.loads(line) for line in log_file]
+        index_queries = [entry for entry in entries
+                         if 'posts_post' in entry['sql']]
+        self.assertEqual(len(index_queries), 4)
+        self.assertEqual(index_queries[0]['view'], 'posts:index')
+        self.assertIn('posts/views.py', index_queries[0]['origin'])
+        plans = [entry for entry in index_queries if 'plan' in entry]
+        self.assertEqual(len(plans), 2)
+
+        out = StringIO()
+        call_command('slow_queries', log=self.log, stdout=out)
+        self.assertIn('count=2', out.getvalue())
+        self.assertIn('views: posts:index', out.getvalue())
+
+    def test_explain_bypasses_wrappers(self):
+        """EXPLAIN не проходит через обёртки соединения и метрики"""
+        seen = []
+
+        def collect(execute, sql, params, many, context):
+            seen.append(sql)
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(collect):
+            plan = slow_queries.explain(
+                connection, 'SELECT id FROM posts_post WHERE id = %s', (1,))
+        self.assertTrue(plan)
+        self.assertEqual(seen, [])
+        self.assertEqual(connection.execute_wrappers, [])
@@ -0,0 +1,22 @@
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+
+class SoakCommandTests(TestCase):
+    def test_soak_reports_each_feed(self):
+        """Прогон выводит скорость и рост памяти для каждой ленты"""
+        out = StringIO()
+        call_command('soak', requests=20, warmup=5, seed=12, stdout=out,
+                     stderr=StringIO(), max_growth=10 * 1024 * 1024)
+        for view in ('posts:index', 'posts:group_list', 'posts:profile'):
+            with self.subTest(view=view):
+                self.assertIn(f'{view}:', out.getvalue())
+
+    def test_soak_fails_on_growth(self):
+        """Рост памяти сверх порога завершает прогон ошибкой"""
+        with self.assertRaises(CommandError):
+            call_command('soak', requests=5, warmup=1, seed=1,
+                         max_growth=-10 ** 9, stdout=StringIO(),
+                         stderr=StringIO())
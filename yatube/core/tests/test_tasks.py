@@ -0,0 +1,114 @@
+from datetime import timedelta
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from core import tasks
+from core.models import Task
+
+calls = []
+
+
+@tasks.task(name='test.collect')
+def collect(value):
+    calls.append(value)
+
+
+@tasks.task(name='test.broken', max_attempts=2)
+def broken():
+    raise ValueError('boom')
+
+
+class TaskQueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_enqueue_and_run(self):
+        """Задача из очереди выполняется и помечается выполненной"""
+        task_obj = tasks.enqueue(collect, value=42)
+        self.assertEqual(tasks.run_pending(), 1)
+        task_obj.refresh_from_db()
+        self.assertEqual(calls, [42])
+        self.assertEqual(task_obj.status, Task.DONE)
+        self.assertEqual(task_obj.attempts, 1)
+        self.assertIsNotNone(task_obj.duration)
+
+    def test_delayed_task_not_visible(self):
+        """Отложенная задача не выполняется раньше срока"""
+        tasks.enqueue(collect, delay=60, value=1)
+        self.assertEqual(tasks.run_pending(), 0)
+        self.assertEqual(calls, [])
+
+    def test_claimed_task_hidden_until_timeout(self):
+        """Забранная задача скрыта от других воркеров на таймаут"""
+        task_obj = tasks.enqueue(collect, value=1)
+        self.assertEqual(len(tasks.claim(timeout=30)), 1)
+        self.assertEqual(tasks.claim(timeout=30), [])
+        Task.objects.filter(pk=task_obj.pk).update(
+            visible_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(len(tasks.claim(timeout=30)), 1)
+
+    def test_retry_then_fail(self):
+        """Упавшая задача повторяется до исчерпания попыток"""
+        task_obj = tasks.enqueue(broken)
+        tasks.run_pending()
+        task_obj.refresh_from_db()
+        self.assertEqual(task_obj.status, Task.QUEUED)
+        self.assertGreater(task_obj.visible_at, timezone.now())
+        self.assertIn('boom', task_obj.last_error)
+        Task.objects.filter(pk=task_obj.pk).update(visible_at=timezone.now())
+        tasks.run_pending()
+        task_obj.refresh_from_db()
+        self.assertEqual(task_obj.status, Task.FAILED)
+        self.assertEqual(task_obj.attempts, 2)
+
+    def test_stats_and_command(self):
+        """Команда run_tasks обрабатывает очередь и выводит метрики"""
+        tasks.enqueue(collect, value=7)
+        call_command('run_tasks', once=True)
+        self.assertEqual(calls, [7])
+        rows = tasks.stats()
+        self.assertEqual(rows[0]['name'], 'test.collect')
+        self.assertEqual(rows[0]['status'], Task.DONE)
+        self.assertEqual(rows[0]['count'], 1)
+
+    def test_exhausted_unfinished_task_fails(self):
+        """Задача, не завершившаяся за все попытки, больше не выдаётся"""
+        task_obj = tasks.enqueue(broken)
+        for _ in range(2):
+            self.assertEqual(len(tasks.claim(timeout=30)), 1)
+            Task.objects.filter(pk=task_obj.pk).update(
+                visible_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(tasks.claim(timeout=30), [])
+        task_obj.refresh_from_db()
+        self.assertEqual(task_obj.status, Task.FAILED)
+        self.assertEqual(task_obj.attempts, 2)
+
+    def test_reclaimed_task_result_dropped(self):
+        """Воркер, потерявший задачу по таймауту, не сохраняет результат"""
+        task_obj = tasks.enqueue(collect, value=1)
+        stale, = tasks.claim(timeout=30)
+        Task.objects.filter(pk=task_obj.pk).update(
+            visible_at=timezone.now() - timedelta(seconds=1))
+        fresh, = tasks.claim(timeout=30)
+        self.assertIsNone(tasks.execute(stale))
+        task_obj.refresh_from_db()
+        self.assertEqual(task_obj.status, Task.QUEUED)
+        self.assertEqual(tasks.execute(fresh), Task.DONE)
+
+    def test_purge_old_done_tasks(self):
+        """Старые выполненные задачи удаляются, упавшие остаются"""
+        old = timezone.now() - timedelta(days=30)
+        done = tasks.enqueue(collect, value=1)
+        failed = tasks.enqueue(broken)
+        recent = tasks.enqueue(collect, value=2)
+        Task.objects.filter(pk__in=(done.pk, failed.pk)).update(
+            finished=old)
+        Task.objects.filter(pk__in=(done.pk, recent.pk)).update(
+            status=Task.DONE)
+        Task.objects.filter(pk=failed.pk).update(status=Task.FAILED)
+        Task.objects.filter(pk=recent.pk).update(finished=timezone.now())
+        self.assertEqual(tasks.purge(days=7), 1)
+        self.assertEqual(set(Task.objects.values_list('pk', flat=True)),
+                         {failed.pk, recent.pk})
@@ -0,0 +1,23 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from core import warmup
+
+
+class WarmUpTests(TestCase):
+    def test_warm_up_runs_every_step(self):
+        """Прогрев выполняет все шаги и сообщает их длительность"""
+        timings = warmup.warm_up()
+        self.assertEqual(set(timings),
+                         {'urls', 'templates', 'locale', 'validators', 'db'})
+
+    def test_connections_closed_after_warm_up(self):
+        """После прогрева соединения закрыты и не переживут fork"""
+        with mock.patch.object(warmup.connections, 'close_all') as close_all:
+            warmup.warm_up()
+        close_all.assert_called_once_with()
+
+    def test_project_templates_compiled(self):
+        """Компилируются все шаблоны из каталога templates/"""
+        self.assertGreaterEqual(warmup.compile_templates(), 20)
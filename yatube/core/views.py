@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+
+from . import media, metrics
+
+
+def metrics_view(request):
+    allowed = request.META.get('REMOTE_ADDR') in settings.METRICS_ALLOWED_IPS
+    if not allowed and not request.user.is_staff:
+        return HttpResponseForbidden()
+    metrics.registry.flush(force=True)
+    return HttpResponse(metrics.render(metrics.collect()),
+                        content_type='text/plain; version=0.0.4; '
+                                     'charset=utf-8')
+
+
+def media_view(request, path):
+    return media.serve(request, path, settings.MEDIA_ROOT)
@@ -0,0 +1,84 @@
+"""Прогрев процесса до того, как он начнёт принимать запросы.
+
+Всё, что Django делает лениво на первых запросах, выполняется заранее:
+импорт представлений и заполнение URL-резолвера, компиляция шаблонов
+из ``templates/`` (при DEBUG = False их держит cached loader), загрузка
+локали, списка частых паролей ``CommonPasswordValidator`` и соединения
+с БД. Вызывается из ``yatube.wsgi`` при ``settings.WARMUP_ON_START``.
+
+Соединения после проверки закрываются: при ``gunicorn --preload`` прогрев
+идёт в мастере, и открытый сокет унаследовали бы все воркеры после
+``fork``. Каждый воркер откроет своё соединение на первом запросе.
+"""
+import logging
+import os
+import time
+
+from django.conf import settings
+from django.contrib.auth.password_validation import (
+    get_default_password_validators)
+from django.db import connections
+from django.template import engines
+from django.urls import get_resolver
+from django.utils import formats, translation
+
+logger = logging.getLogger(__name__)
+
+
+def populate_urls():
+    resolver = get_resolver()
+    # reverse_dict заполняет резолвер и импортирует все представления.
+    return len(resolver.reverse_dict)
+
+
+def compile_templates():
+    compiled = 0
+    for engine in engines.all():
+        for directory in engine.dirs:
+            for root, _, files in os.walk(directory):
+                for filename in files:
+                    if not filename.endswith(('.html', '.txt', '.xml')):
+                        continue
+                    name = os.path.relpath(os.path.join(root, filename),
+                                           directory)
+                    engine.get_template(name.replace(os.sep, '/'))
+                    compiled += 1
+    return compiled
+
+
+def load_locale():
+    translation.activate(settings.LANGUAGE_CODE)
+    formats.get_format('DATE_FORMAT')
+    return translation.gettext('Password')
+
+
+def load_validators():
+    return len(get_default_password_validators())
+
+
+def open_connections():
+    for connection in connections.all():
+        connection.ensure_connection()
+    return len(connections.all())
+
+
+STEPS = (
+    ('urls', populate_urls),
+    ('templates', compile_templates),
+    ('locale', load_locale),
+    ('validators', load_validators),
+    ('db', open_connections),
+)
+
+
+def warm_up():
+    """Выполняет шаги прогрева и возвращает их длительность в секундах."""
+    timings = {}
+    for name, step in STEPS:
+        started = time.perf_counter()
+        step()
+        timings[name] = time.perf_counter() - started
+    connections.close_all()
+    logger.info('Warm-up done: %s', ', '.join(
+        f'{name} {seconds * 1000:.1f}ms' for name, seconds in timings.items()))
+    return timings
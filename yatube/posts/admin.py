@@ -1,23 +1,128 @@
-from django.contrib import admin
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ActionForm
+from django.contrib.admin.widgets import AutocompleteSelect
 
-from .models import Post
+from . import groups
+from .models import Follow, Post
 from .models import Group
 
 
+class RowGroupSelect(AutocompleteSelect):
+    """Автокомплит группы, который берёт выбранную группу из строки.
+
+    Стандартный виджет запрашивает подпись выбранного значения
+    отдельным запросом на каждую строку списка.
+    """
+    row_group = None
+
+    def optgroups(self, name, value, attr=None):
+        group = self.row_group
+        if group is None or [str(v) for v in value] != [str(group.pk)]:
+            return super().optgroups(name, value, attr)
+        options = [
+            self.create_option(name, '', '', False, 0),
+            self.create_option(name, group.pk, str(group), True, 1),
+        ]
+        return [(None, options, 0)]
+
+
+class PostChangeListForm(forms.ModelForm):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        widget = self.fields['group'].widget
+        widget = getattr(widget, 'widget', widget)
+        if isinstance(widget, RowGroupSelect):
+            widget.row_group = self.instance.group
+
+
 class PostAdmin(admin.ModelAdmin):
     list_editable = ('group',)
     list_display = ('pk', 'text', 'pub_date',
                     'author', 'group')
+    list_select_related = ('author', 'group')
+    autocomplete_fields = ('group',)
     search_fields = ('text',)
     list_filter = ('pub_date',)
+    date_hierarchy = 'pub_date'
+    show_full_result_count = False
     empty_value_display = '-пусто-'
 
+    def get_changelist_form(self, request, **kwargs):
+        kwargs.setdefault('form', PostChangeListForm)
+        return super().get_changelist_form(request, **kwargs)
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if db_field.name == 'group':
+            kwargs['widget'] = RowGroupSelect(
+                db_field.remote_field, self.admin_site)
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+
+class GroupActionForm(ActionForm):
+    target = forms.SlugField(required=False,
+                             label='Слаг группы для объединения')
+
 
 class GroupAdmin(admin.ModelAdmin):
     list_display = ('pk', 'title', 'slug', 'description')
     search_fields = ('title',)
     empty_value_display = '-пусто-'
+    action_form = GroupActionForm
+    actions = ('merge_selected', 'delete_selected_in_chunks')
+
+    def get_actions(self, request):
+        # Стандартное удаление загружает все посты группы в память.
+        actions = super().get_actions(request)
+        actions.pop('delete_selected', None)
+        return actions
+
+    def get_deleted_objects(self, objs, request):
+        # Посты группы не удаляются, а отвязываются: не перечисляем их.
+        objs = list(objs)
+        model_count = {Group._meta.verbose_name_plural: len(objs)}
+        return [str(obj) for obj in objs], model_count, set(), []
+
+    def delete_view(self, request, object_id, extra_context=None):
+        # Стандартный delete_view держит одну транзакцию на всё удаление,
+        # а delete_group фиксирует каждую пачку постов отдельно.
+        return self._delete_view(request, object_id, extra_context)
+
+    def delete_model(self, request, obj):
+        groups.delete_group(obj)
+
+    def merge_selected(self, request, queryset):
+        slug = request.POST.get('target')
+        target = Group.objects.filter(slug=slug).first()
+        if target is None:
+            self.message_user(request, f'Группа {slug} не найдена',
+                              messages.ERROR)
+            return
+        moved = 0
+        for source in queryset.exclude(pk=target.pk):
+            moved += groups.merge_groups(source, target)
+        self.message_user(request,
+                          f'Перенесено в {target} постов: {moved}')
+    merge_selected.short_description = 'Объединить с группой'
+    merge_selected.allowed_permissions = ('delete',)
+
+    def delete_selected_in_chunks(self, request, queryset):
+        moved = 0
+        for group in queryset:
+            moved += groups.delete_group(group)
+        self.message_user(request, f'Группы удалены, '
+                                   f'отвязано постов: {moved}')
+    delete_selected_in_chunks.short_description = 'Удалить выбранные группы'
+    delete_selected_in_chunks.allowed_permissions = ('delete',)
+
+
+class FollowAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'user', 'author')
+    list_select_related = ('user', 'author')
+    raw_id_fields = ('user', 'author')
+    search_fields = ('user__username', 'author__username')
 
 
 admin.site.register(Post, PostAdmin)
 admin.site.register(Group, GroupAdmin)
+admin.site.register(Follow, FollowAdmin)
@@ -0,0 +1,126 @@
+"""Архив ленты, групп и авторов по годам и месяцам.
+
+Страница архива выбирает посты полуоткрытым диапазоном
+``start <= pub_date < end`` по границам месяца или года в часовом поясе
+сайта; диапазон идёт по индексам ``pub_date``, ``(group, -pub_date)`` и
+``(author, -pub_date)``, без функций над колонкой. Навигация и число
+страниц берутся из ``MonthCount``: сигналы поддерживают его при
+создании, смене группы и удалении поста, поэтому агрегировать посты по
+месяцам при показе не нужно. Изменения копятся до конца транзакции
+и применяются одним ``UPDATE`` на ленту и месяц, так что удаление сотни
+постов за раз не обновляет одни и те же строки сотни раз.
+``manage.py rebuild_archive`` пересчитывает таблицу целиком; его нужно
+запускать после ``bulk_create`` постов, который сигналы не вызывает.
+"""
+from collections import Counter
+from datetime import datetime
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from core.batching import OnCommitBatch
+
+from . import surrogate
+from .models import MonthCount, Post
+
+
+def month_of(pub_date):
+    local = timezone.localtime(pub_date)
+    return local.year, local.month
+
+
+def date_range(year, month=None):
+    """Границы ``[start, end)`` года или месяца в часовом поясе сайта."""
+    if month is None:
+        start, end = datetime(year, 1, 1), datetime(year + 1, 1, 1)
+    elif month == 12:
+        start, end = datetime(year, 12, 1), datetime(year + 1, 1, 1)
+    else:
+        start, end = datetime(year, month, 1), datetime(year, month + 1, 1)
+    return timezone.make_aware(start), timezone.make_aware(end)
+
+
+def in_range(queryset, year, month=None):
+    start, end = date_range(year, month)
+    return queryset.filter(pub_date__gte=start, pub_date__lt=end)
+
+
+def scopes(author_id, group_id):
+    keys = [surrogate.INDEX_KEY, surrogate.author_key(author_id)]
+    if group_id is not None:
+        keys.append(surrogate.group_key(group_id))
+    return keys
+
+
+def bump(scope, year, month, delta):
+    rows = MonthCount.objects.filter(scope=scope, year=year, month=month)
+    if rows.update(count=F('count') + delta) or delta < 0:
+        return
+    try:
+        with transaction.atomic():
+            MonthCount.objects.create(scope=scope, year=year, month=month,
+                                      count=delta)
+    except IntegrityError:
+        # Строку только что создал параллельный запрос.
+        rows.update(count=F('count') + delta)
+
+
+def apply_deltas(deltas):
+    """Прибавляет ``{(лента, год, месяц): дельта}`` одной транзакцией."""
+    with transaction.atomic():
+        for (scope, year, month), delta in sorted(deltas.items()):
+            if delta:
+                bump(scope, year, month, delta)
+
+
+counts = OnCommitBatch(apply_deltas, Counter)
+
+
+def add(pub_date, keys, delta=1):
+    year, month = month_of(pub_date)
+    counts.add({(scope, year, month): delta for scope in keys})
+
+
+def move(post_ids, source, target):
+    """Переносит счётчики постов из ленты ``source`` в ``target``."""
+    months = Counter(month_of(pub_date) for pub_date in
+                     Post.objects.filter(pk__in=post_ids)
+                     .values_list('pub_date', flat=True).iterator())
+    deltas = Counter()
+    for (year, month), moved in months.items():
+        if source is not None:
+            deltas[source, year, month] -= moved
+        if target is not None:
+            deltas[target, year, month] += moved
+    counts.add(deltas)
+
+
+def months(scope):
+    """``(год, месяц, постов)`` ленты, новые месяцы сверху."""
+    return list(MonthCount.objects.filter(scope=scope, count__gt=0)
+                .order_by('-year', '-month')
+                .values_list('year', 'month', 'count'))
+
+
+def count(scope, year, month=None):
+    rows = MonthCount.objects.filter(scope=scope, year=year)
+    if month is not None:
+        rows = rows.filter(month=month)
+    return rows.aggregate(total=Sum('count'))['total'] or 0
+
+
+def rebuild():
+    """Пересчитывает ``MonthCount`` по всем постам; возвращает число строк."""
+    counts = Counter()
+    posts = Post.objects.values_list('pub_date', 'author_id', 'group_id')
+    for pub_date, author_id, group_id in posts.iterator():
+        year, month = month_of(pub_date)
+        for scope in scopes(author_id, group_id):
+            counts[scope, year, month] += 1
+    with transaction.atomic():
+        MonthCount.objects.all().delete()
+        MonthCount.objects.bulk_create(
+            MonthCount(scope=scope, year=year, month=month, count=value)
+            for (scope, year, month), value in counts.items())
+    return len(counts)
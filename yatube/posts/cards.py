@@ -0,0 +1,122 @@
+"""Лёгкие объекты строк ленты для ``includes/post_card.html``.
+
+Карточке нужны только текст, дата, id, имя и username автора, slug
+группы и число просмотров (LEFT JOIN к ``PostViews``), поэтому лента
+выбирает эти колонки через ``values_list`` и раскладывает их в объекты
+со ``__slots__`` вместо полных экземпляров ``Post``, ``User`` и
+``Group``. Интерфейс для шаблона тот же.
+
+Фрагменты бесконечной ленты листаются курсором ``<мкс>-<id>`` по ключу
+``(pub_date, id)`` без OFFSET.
+"""
+from datetime import datetime, timedelta
+
+from django.utils import timezone
+
+from .models import Post
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+CARD_FIELDS = ('id', 'text', 'pub_date', 'author_id', 'author__username',
+               'author__first_name', 'author__last_name', 'group_id',
+               'group__slug', 'image', 'thumbnails_ready', 'views__count')
+
+
+class AuthorCard:
+    __slots__ = ('username', 'first_name', 'last_name')
+
+    def __init__(self, username, first_name, last_name):
+        self.username = username
+        self.first_name = first_name
+        self.last_name = last_name
+
+    def get_full_name(self):
+        return f'{self.first_name} {self.last_name}'.strip()
+
+    def __str__(self):
+        return self.username
+
+
+class GroupCard:
+    __slots__ = ('slug',)
+
+    def __init__(self, slug):
+        self.slug = slug
+
+    def __str__(self):
+        return self.slug
+
+
+class PostCard:
+    __slots__ = ('id', 'text', 'pub_date', 'author_id', 'author',
+                 'group_id', 'group', 'image', 'thumbnails_ready',
+                 'view_count')
+
+    def __init__(self, id, text, pub_date, author_id, author, group_id,
+                 group, image, thumbnails_ready, view_count):
+        self.id = id
+        self.text = text
+        self.pub_date = pub_date
+        self.author_id = author_id
+        self.author = author
+        self.group_id = group_id
+        self.group = group
+        self.image = image
+        self.thumbnails_ready = thumbnails_ready
+        self.view_count = view_count
+
+    @classmethod
+    def from_row(cls, row):
+        (post_id, text, pub_date, author_id, username, first_name,
+         last_name, group_id, group_slug, image, thumbnails_ready,
+         view_count) = row
+        return cls(post_id, text, pub_date, author_id,
+                   AuthorCard(username, first_name, last_name), group_id,
+                   GroupCard(group_slug) if group_id else None, image,
+                   thumbnails_ready, view_count or 0)
+
+    @property
+    def pk(self):
+        return self.id
+
+    def __eq__(self, other):
+        if not isinstance(other, (PostCard, Post)):
+            return NotImplemented
+        return self.id == other.pk
+
+    def __hash__(self):
+        return hash(self.id)
+
+    def __str__(self):
+        return self.text
+
+
+def to_cards(queryset):
+    return queryset.values_list(*CARD_FIELDS)
+
+
+def make_cursor(pub_date, post_id):
+    micros = (pub_date - EPOCH) // timedelta(microseconds=1)
+    return f'{micros}-{post_id}'
+
+
+def card_cursor(card):
+    return make_cursor(card.pub_date, card.id)
+
+
+def after_cursor(queryset, cursor, key='id'):
+    """Строки строго после курсора в порядке ``-pub_date, -<key>``;
+    ``key`` — поле с id поста. Негодный курсор даёт начало ленты."""
+    queryset = queryset.order_by('-pub_date', f'-{key}')
+    try:
+        micros, post_id = (int(part) for part in cursor.split('-'))
+        pub_date = EPOCH + timedelta(microseconds=micros)
+    except (ValueError, OverflowError):
+        return queryset
+    # Больше id SQLite не примет как целое.
+    if not 0 <= post_id < 2 ** 63:
+        return queryset
+    # Не через OR: так SQLite берёт диапазон по составному индексу
+    # выборки, а не по одной pub_date.
+    return queryset.filter(pub_date__lte=pub_date).exclude(
+        pub_date=pub_date, **{f'{key}__gte': post_id})
@@ -0,0 +1,46 @@
+"""Счётчик просмотров ``post_detail``.
+
+Просмотр увеличивает число в буфере процесса (``core.counters``), а в
+``PostViews`` накопленное уходит одним ``INSERT ... ON CONFLICT DO
+UPDATE`` на пакет: прибавка, а не запись значения, поэтому воркеры
+gunicorn не затирают счётчики друг друга. Строка появляется только
+для существующего поста, удалённый за время буферизации пропускается.
+В той же транзакции пачка просмотров обновляет популярное
+(``posts.trending``).
+
+Ответ ``post_detail`` анонимам кэширует прокси, поэтому просмотр
+считает не он, а маяк ``posts:post_view``: страница после загрузки шлёт
+на него POST через ``navigator.sendBeacon``, мимо кэша. Клиенты без
+JavaScript (в том числе большинство роботов) не считаются.
+"""
+from django.conf import settings
+from django.db import connection, transaction
+
+from core.counters import CounterBuffer
+
+from . import trending
+from .models import Post, PostViews
+
+
+def upsert_views(counts):
+    quote = connection.ops.quote_name
+    table = quote(PostViews._meta.db_table)
+    count = quote('count')
+    # WHERE у SELECT обязателен: без него SQLite путает ON CONFLICT с JOIN.
+    sql = (f'INSERT INTO {table} ({quote("post_id")}, {count}) '
+           f'SELECT {quote("id")}, %s FROM {quote(Post._meta.db_table)} '
+           f'WHERE {quote("id")} = %s '
+           f'ON CONFLICT ({quote("post_id")}) '
+           f'DO UPDATE SET {count} = {table}.{count} + excluded.{count}')
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.executemany(sql, [(value, post_id)
+                                 for post_id, value in sorted(counts.items())])
+
+
+def flush_views(counts):
+    with transaction.atomic():
+        upsert_views(counts)
+        trending.record(counts, settings.TRENDING_VIEW_WEIGHT)
+
+
+views = CounterBuffer(flush_views)
@@ -0,0 +1,186 @@
+"""RSS и Atom ленты, групп и авторов.
+
+Записи берутся теми же выборками, что и HTML-страницы, через карточки
+``posts.cards``. У каждой ленты есть строка ``FeedVersion`` (ключи те же,
+что суррогатные) со счётчиком изменений и временем последнего из них.
+Сигналы после фиксации транзакции увеличивают счётчик при записи поста
+или группы, один раз на ленту за транзакцию. ``ETag`` строится из
+счётчика, ``Last-Modified`` — из времени: на условный запрос опроса без
+изменений приходит 304 после одного запроса к версии, а готовое тело
+ленты лежит в кэше под ключом с версией и после записи просто
+перестаёт читаться. Версия общая для всех процессов, кэш тела — нет.
+``Last-Modified`` точен до секунды, поэтому клиент, который шлёт только
+``If-Modified-Since``, может пропустить запись в ту же секунду, что и
+его прошлый опрос; ``If-None-Match`` такой записи не пропускает.
+"""
+from django.conf import settings
+from django.contrib.syndication.views import Feed
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.http import Http404, HttpResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.http import http_date
+from django.utils import timezone
+from django.utils.text import Truncator
+
+from core.batching import OnCommitBatch
+from core.surrogate import tag
+
+from .cards import PostCard, to_cards
+from .lookups import get_author_or_404, get_group_or_404
+from .models import FeedVersion, Post
+
+
+def version(scope):
+    """``(счётчик, время изменения)`` ленты."""
+    row = (FeedVersion.objects.filter(scope=scope)
+           .values_list('version', 'changed').first())
+    if row is None:
+        feed_version, _ = FeedVersion.objects.get_or_create(scope=scope)
+        row = feed_version.version, feed_version.changed
+    return row
+
+
+def bump(scopes):
+    now = timezone.now()
+    with transaction.atomic():
+        for scope in sorted(scopes):
+            rows = FeedVersion.objects.filter(scope=scope)
+            if rows.update(version=F('version') + 1, changed=now):
+                continue
+            try:
+                with transaction.atomic():
+                    FeedVersion.objects.create(scope=scope, version=1,
+                                               changed=now)
+            except IntegrityError:
+                # Строку только что создал параллельный запрос.
+                rows.update(version=F('version') + 1, changed=now)
+
+
+touches = OnCommitBatch(bump)
+
+
+def touch(scopes):
+    """Отмечает изменение лент после фиксации текущей транзакции."""
+    if scopes:
+        touches.add(scopes)
+
+
+class PostsFeed(Feed):
+    title = 'Yatube: последние записи'
+    description = 'Новые записи всех авторов'
+
+    def link(self, obj):
+        return reverse('posts:index')
+
+    def posts(self, obj):
+        return Post.objects.all()
+
+    def items(self, obj):
+        rows = to_cards(self.posts(obj))[:settings.FEED_ITEMS]
+        return [PostCard.from_row(row) for row in rows]
+
+    def item_title(self, item):
+        return Truncator(item.text).chars(settings.POST_MOD)
+
+    def item_description(self, item):
+        return item.text
+
+    def item_link(self, item):
+        return reverse('posts:post_detail', args=(item.id,))
+
+    def item_pubdate(self, item):
+        return item.pub_date
+
+    def item_author_name(self, item):
+        return item.author.get_full_name() or item.author.username
+
+
+class GroupPostsFeed(PostsFeed):
+    def get_object(self, request, slug):
+        return get_group_or_404(slug)
+
+    def title(self, obj):
+        return f'Yatube: записи сообщества {obj.title}'
+
+    def description(self, obj):
+        return obj.description
+
+    def link(self, obj):
+        return reverse('posts:group_list', args=(obj.slug,))
+
+    def posts(self, obj):
+        return obj.posts.all()
+
+
+class AuthorPostsFeed(PostsFeed):
+    def get_object(self, request, username):
+        return get_author_or_404(username)
+
+    def title(self, obj):
+        return f'Yatube: записи {obj.get_full_name() or obj.username}'
+
+    def description(self, obj):
+        return f'Новые записи пользователя {obj.username}'
+
+    def link(self, obj):
+        return reverse('posts:profile', args=(obj.username,))
+
+    def posts(self, obj):
+        return obj.posts.all()
+
+
+class AtomMixin:
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return self._get_dynamic_attr('description', obj)
+
+
+class PostsAtomFeed(AtomMixin, PostsFeed):
+    pass
+
+
+class GroupPostsAtomFeed(AtomMixin, GroupPostsFeed):
+    pass
+
+
+class AuthorPostsAtomFeed(AtomMixin, AuthorPostsFeed):
+    pass
+
+
+FEEDS = {
+    ('index', 'rss'): PostsFeed(),
+    ('index', 'atom'): PostsAtomFeed(),
+    ('group', 'rss'): GroupPostsFeed(),
+    ('group', 'atom'): GroupPostsAtomFeed(),
+    ('author', 'rss'): AuthorPostsFeed(),
+    ('author', 'atom'): AuthorPostsAtomFeed(),
+}
+
+
+def serve(request, kind, fmt, scope, *args):
+    """Отдаёт ленту ``kind`` в формате ``fmt`` с условными заголовками."""
+    feed = FEEDS.get((kind, fmt))
+    if feed is None:
+        raise Http404('Нет такого формата ленты')
+    number, changed = version(scope)
+    etag = f'"{scope}-{fmt}-{number}"'
+    last_modified = int(changed.timestamp())
+    response = get_conditional_response(request, etag=etag,
+                                        last_modified=last_modified)
+    if response is None:
+        key = f'feed:{fmt}:{scope}:{number}'
+        cached = cache.get(key)
+        if cached is None:
+            rendered = feed(request, *args)
+            cached = (rendered.content, rendered['Content-Type'])
+            cache.set(key, cached, settings.FEED_CACHE_TTL)
+        response = HttpResponse(cached[0], content_type=cached[1])
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    tag(request, scope)
+    return response
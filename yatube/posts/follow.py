@@ -0,0 +1,104 @@
+"""Лента подписок с гибридной рассылкой.
+
+Пост обычного автора фоновая задача ``post_saved`` раскладывает по
+входящим (``InboxEntry``) всех его подписчиков и помечает ``fanned_out``.
+Посты авторов, у которых больше ``settings.FOLLOW_FANOUT_LIMIT``
+подписчиков, не рассылаются: при чтении они подмешиваются из частичного
+индекса ``(author, -pub_date, -id)`` по неразосланным постам. Так же
+подмешиваются свежие посты, до которых задача ещё не дошла. Страница
+ленты — две узкие выборки ``(post_id, pub_date)`` вместо ``author__in``
+по всем подпискам. Ленту листают курсором по ``(pub_date, id)`` без
+``COUNT`` и ``OFFSET``. Входящие читаются не дальше страницы после
+курсора. Вторая выборка читает только неразосланные посты подписок после
+курсора и сортирует их: разосланные посты, сколько бы их ни было, она не
+трогает, а стоит столько, сколько постов после курсора у популярных
+авторов из подписок.
+"""
+from django.conf import settings
+from django.db import transaction
+
+from .cards import after_cursor
+from .models import Follow, InboxEntry, Post
+
+
+def is_celebrity(author_id):
+    """Больше ли у автора подписчиков, чем лимит рассылки.
+
+    Считает не дальше лимита, поэтому запрос ограничен независимо от
+    того, сколько подписчиков на самом деле.
+    """
+    limit = settings.FOLLOW_FANOUT_LIMIT
+    return Follow.objects.filter(author_id=author_id)[limit:limit + 1].exists()
+
+
+def fan_out(post_id):
+    """Раскладывает пост по входящим подписчиков; возвращает число строк."""
+    post = (Post.objects.filter(pk=post_id, fanned_out=False)
+            .values('author_id', 'pub_date').first())
+    if post is None or is_celebrity(post['author_id']):
+        return 0
+    followers = (Follow.objects.filter(author_id=post['author_id'])
+                 .values_list('user_id', flat=True).iterator())
+    created = 0
+    chunk = []
+    for user_id in followers:
+        chunk.append(InboxEntry(user_id=user_id, post_id=post_id,
+                                author_id=post['author_id'],
+                                pub_date=post['pub_date']))
+        if len(chunk) >= settings.FOLLOW_FANOUT_CHUNK:
+            created += deliver(chunk)
+            chunk = []
+    created += deliver(chunk)
+    Post.objects.filter(pk=post_id).update(fanned_out=True)
+    return created
+
+
+def deliver(entries):
+    if entries:
+        InboxEntry.objects.bulk_create(entries, ignore_conflicts=True)
+    return len(entries)
+
+
+def follow(user, author):
+    """Подписывает и переносит во входящие последние разосланные посты."""
+    if user == author:
+        return False
+    with transaction.atomic():
+        _, created = Follow.objects.get_or_create(user=user, author=author)
+        if created:
+            recent = (Post.objects.filter(author=author, fanned_out=True)
+                      .values_list('pk', 'pub_date')
+                      [:settings.FOLLOW_BACKFILL])
+            deliver([InboxEntry(user=user, post_id=post_id, author=author,
+                                pub_date=pub_date)
+                     for post_id, pub_date in recent])
+    return created
+
+
+def unfollow(user, author):
+    with transaction.atomic():
+        Follow.objects.filter(user=user, author=author).delete()
+        InboxEntry.objects.filter(user=user, author=author).delete()
+
+
+def unfanned(user):
+    """Неразосланные посты авторов, на которых подписан ``user``."""
+    authors = Follow.objects.filter(user=user).values('author_id')
+    return Post.objects.filter(fanned_out=False, author_id__in=authors)
+
+
+def feed(user, cursor='', limit=None):
+    """До ``limit`` пар ``(post_id, pub_date)`` после курсора, новые сверху.
+
+    Ветки сливаются в Python: SQLite не допускает ``LIMIT`` у частей
+    ``UNION``. Пост может оказаться в обеих, пока задача его рассылает.
+    """
+    limit = limit or settings.CNT_POST
+    inbox = after_cursor(InboxEntry.objects.filter(user=user), cursor,
+                         'post_id').values_list('post_id', 'pub_date')
+    merged = after_cursor(unfanned(user), cursor).values_list('id',
+                                                              'pub_date')
+    rows = dict(inbox[:limit])
+    rows.update(merged[:limit])
+    return sorted(rows.items(), key=lambda row: (row[1], row[0]),
+                  reverse=True)[:limit]
@@ -1,11 +1,24 @@
 from django import forms
+from django.conf import settings
+from django.template.defaultfilters import filesizeformat
 
 from .models import Post
+from .widgets import GroupLookupSelect
 
 
 class PostForm(forms.ModelForm):
     class Meta:
         model = Post
-        fields = ('text', 'group')
+        fields = ('text', 'group', 'image')
         help_texts = {'text': 'Текст нового поста',
                       'group': 'Группа, к которой относится пост'}
+        widgets = {'group': GroupLookupSelect(
+            attrs={'class': 'form-control'})}
+
+    def clean_image(self):
+        image = self.cleaned_data.get('image')
+        limit = settings.POST_IMAGE_MAX_SIZE
+        if image and getattr(image, 'size', 0) > limit:
+            raise forms.ValidationError(
+                f'Картинка больше {filesizeformat(limit)}')
+        return image
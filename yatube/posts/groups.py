@@ -0,0 +1,45 @@
+"""Массовые операции с группами без загрузки постов в память.
+
+Посты переносятся пачками по ``settings.GROUP_CHUNK_SIZE`` через
+``UPDATE ... WHERE id IN (...)``, каждая пачка в своей транзакции, так
+что блокировка SQLite держится недолго. Сборщик удаления Django при
+этом не обходит посты: к моменту ``group.delete()`` их уже нет.
+"""
+from django.conf import settings
+from django.db import transaction
+
+from .models import Post
+from .signals import posts_reassigned
+
+
+def reassign_posts(source, target, chunk_size=None, progress=None):
+    chunk_size = chunk_size or settings.GROUP_CHUNK_SIZE
+    moved = 0
+    while True:
+        with transaction.atomic():
+            ids = list(Post.objects.filter(group=source)
+                       .order_by('pk').values_list('pk', flat=True)
+                       [:chunk_size])
+            if not ids:
+                break
+            Post.objects.filter(pk__in=ids).update(group=target)
+        moved += len(ids)
+        posts_reassigned.send(sender=Post, source=source, target=target,
+                              post_ids=ids)
+        if progress is not None:
+            progress(moved)
+    return moved
+
+
+def merge_groups(source, target, chunk_size=None, progress=None):
+    if source.pk == target.pk:
+        raise ValueError('Нельзя объединить группу саму с собой')
+    moved = reassign_posts(source, target, chunk_size, progress)
+    source.delete()
+    return moved
+
+
+def delete_group(group, chunk_size=None, progress=None):
+    moved = reassign_posts(group, None, chunk_size, progress)
+    group.delete()
+    return moved
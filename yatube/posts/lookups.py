@@ -0,0 +1,123 @@
+"""Кэш в памяти процесса для поиска группы по slug и автора по username.
+
+``group_posts`` и ``profile`` ищут объект на каждом запросе ещё до
+выборки постов. Кэш ограничен ``settings.LOOKUP_CACHE_SIZE`` записями
+(вытесняются давно не читанные) и временем жизни
+``settings.LOOKUP_CACHE_TTL``. Несуществующие ключи тоже кэшируются, на
+``settings.LOOKUP_CACHE_NEGATIVE_TTL``, чтобы обход ``/profile/<мусор>/``
+не доходил до базы; у них своя очередь вытеснения на
+``settings.LOOKUP_CACHE_NEGATIVE_SIZE`` записей, и такой обход не
+вытесняет настоящие группы и авторов. Записи сбрасываются по
+``post_save``/``post_delete`` (см. ``posts.signals``); чтение, начатое
+до сброса, свой результат в кэш уже не кладёт. Другие процессы узнают
+об изменении не позже чем через TTL.
+
+Посты для ``post_detail`` кэшируются целиком через ``core.cache``.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.http import Http404
+
+from core.cache import ObjectCache
+
+from .models import Group, Post, User
+
+
+class LookupCache:
+    def __init__(self, model, field):
+        self.model = model
+        self.field = field
+        self.entries = OrderedDict()
+        self.missing = OrderedDict()
+        self.lock = threading.Lock()
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Объект по значению поля или ``None``, если его нет в базе."""
+        now = time.monotonic()
+        with self.lock:
+            for entries in (self.entries, self.missing):
+                entry = entries.get(key)
+                if entry is not None and entry[1] > now:
+                    entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[0]
+            self.misses += 1
+            generation = self.generation
+        obj = self.model.objects.filter(**{self.field: key}).first()
+        self.put(key, obj, now, generation)
+        return obj
+
+    def put(self, key, obj, now, generation):
+        """Кладёт прочитанное, если с начала чтения не было сброса."""
+        if obj is None:
+            entries = self.missing
+            size = settings.LOOKUP_CACHE_NEGATIVE_SIZE
+            entry = (None, now + settings.LOOKUP_CACHE_NEGATIVE_TTL)
+        else:
+            entries = self.entries
+            size = settings.LOOKUP_CACHE_SIZE
+            entry = (obj, now + settings.LOOKUP_CACHE_TTL)
+        if size <= 0:
+            return
+        with self.lock:
+            if generation != self.generation:
+                return
+            entries[key] = entry
+            entries.move_to_end(key)
+            while len(entries) > size:
+                entries.popitem(last=False)
+
+    def invalidate(self, instance):
+        """Сбрасывает текущий ключ объекта и прежний, если поле менялось."""
+        key = getattr(instance, self.field)
+        with self.lock:
+            self.generation += 1
+            self.entries.pop(key, None)
+            self.missing.pop(key, None)
+            stale = [cached_key for cached_key, (obj, _) in
+                     self.entries.items() if obj.pk == instance.pk]
+            for cached_key in stale:
+                del self.entries[cached_key]
+
+    def clear(self):
+        with self.lock:
+            self.generation += 1
+            self.entries.clear()
+            self.missing.clear()
+
+
+def load_post(post_id):
+    return (Post.objects.select_related('author', 'group')
+            .filter(pk=post_id).first())
+
+
+groups = LookupCache(Group, 'slug')
+authors = LookupCache(User, 'username')
+posts = ObjectCache('post', load_post)
+
+
+def get_group_or_404(slug):
+    group = groups.get(slug)
+    if group is None:
+        raise Http404('Группа не найдена')
+    return group
+
+
+def get_author_or_404(username):
+    author = authors.get(username)
+    if author is None:
+        raise Http404('Пользователь не найден')
+    return author
+
+
+def get_post_or_404(post_id):
+    post = posts.get(post_id)
+    if post is None:
+        raise Http404('Пост не найден')
+    return post
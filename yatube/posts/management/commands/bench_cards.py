@@ -0,0 +1,78 @@
+import time
+import tracemalloc
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.template import engines
+
+from posts import archive
+from posts.cards import PostCard, to_cards
+from posts.models import Group, Post
+
+User = get_user_model()
+
+FEED_TEMPLATE = (
+    "{% for post in posts %}"
+    "{% include 'includes/post_card.html' with show_posts=True %}"
+    "{% endfor %}"
+)
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает ленту из экземпляров моделей и из карточек: '
+            'время выборки и рендера и выделенную память')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+',
+                            default=[10, 50, 100])
+        parser.add_argument('--repeat', type=int, default=50)
+
+    def handle(self, *args, **options):
+        self.seed(max(options['sizes']))
+        template = engines.all()[0].from_string(FEED_TEMPLATE)
+        for size in options['sizes']:
+            for name, load in (('models', self.load_models),
+                               ('cards', self.load_cards)):
+                seconds, peak = self.measure(template, load, size,
+                                             options['repeat'])
+                self.stdout.write(
+                    f'{size:>4} постов, {name:<6}: '
+                    f'{seconds * 1000:.2f} мс/страница, '
+                    f'пик памяти {peak / 1024:.1f} КиБ')
+
+    @staticmethod
+    def load_models(size):
+        return list(Post.objects.select_related('author', 'group')[:size])
+
+    @staticmethod
+    def load_cards(size):
+        return [PostCard.from_row(row)
+                for row in to_cards(Post.objects.all())[:size]]
+
+    @staticmethod
+    def measure(template, load, size, repeat):
+        template.render({'posts': load(size)})
+        started = time.perf_counter()
+        for _ in range(repeat):
+            template.render({'posts': load(size)})
+        seconds = (time.perf_counter() - started) / repeat
+        tracemalloc.start()
+        template.render({'posts': load(size)})
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return seconds, peak
+
+    @staticmethod
+    def seed(count):
+        author, _ = User.objects.get_or_create(
+            username='bench', defaults={'first_name': 'Bench'})
+        group, _ = Group.objects.get_or_create(
+            slug='bench', defaults={'title': 'Bench', 'description': ''})
+        missing = count - Post.objects.count()
+        Post.objects.bulk_create([
+            Post(text=f'Bench {i} ' * 20, author=author, group=group)
+            for i in range(max(missing, 0))
+        ])
+        if missing > 0:
+            # bulk_create не шлёт сигналы, счётчики архива пересчитываем.
+            archive.rebuild()
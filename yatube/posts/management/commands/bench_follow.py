@@ -0,0 +1,129 @@
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+from django.test import override_settings
+
+from posts import archive, follow
+from posts.cards import to_cards
+from posts.models import Follow, InboxEntry, Post
+
+User = get_user_model()
+PREFIX = 'benchfollow_'
+
+
+class Command(BaseCommand):
+    help = ('Строит граф подписок со степенным распределением и сравнивает '
+            'ленту через author__in с гибридной рассылкой')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=1000)
+        parser.add_argument('--authors', type=int, default=200)
+        parser.add_argument('--follows', type=int, default=30,
+                            help='Подписок на читателя')
+        parser.add_argument('--posts', type=int, default=10,
+                            help='Постов на автора')
+        parser.add_argument('--skew', type=float, default=1.1,
+                            help='Показатель Ципфа популярности авторов')
+        parser.add_argument('--fanout-limit', type=int, default=500)
+        parser.add_argument('--samples', type=int, default=100)
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--keep', action='store_true',
+                            help='Не удалять созданные данные')
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        self.cleanup()
+        try:
+            with override_settings(FOLLOW_FANOUT_LIMIT=options[
+                    'fanout_limit']):
+                readers, authors = self.seed(rng, options)
+                self.report_graph(authors, options['fanout_limit'])
+                self.write(authors)
+                self.read(rng.sample(readers, min(options['samples'],
+                                                  len(readers))))
+        finally:
+            if not options['keep']:
+                self.cleanup()
+
+    @staticmethod
+    def cleanup():
+        User.objects.filter(username__startswith=PREFIX).delete()
+
+    @staticmethod
+    def create_users(kind, count):
+        User.objects.bulk_create([User(username=f'{PREFIX}{kind}{i}')
+                                  for i in range(count)])
+        return list(User.objects.filter(
+            username__startswith=f'{PREFIX}{kind}')
+            .order_by('pk').values_list('pk', flat=True))
+
+    def seed(self, rng, options):
+        readers = self.create_users('reader', options['readers'])
+        authors = self.create_users('author', options['authors'])
+        weights = [1 / rank ** options['skew']
+                   for rank in range(1, len(authors) + 1)]
+        follows = []
+        for reader in readers:
+            followed = set()
+            while len(followed) < min(options['follows'], len(authors)):
+                followed.update(rng.choices(authors, weights, k=4))
+            follows.extend(Follow(user_id=reader, author_id=author)
+                           for author in list(followed)[:options['follows']])
+        Follow.objects.bulk_create(follows)
+        Post.objects.bulk_create([
+            Post(text=f'Bench {i}', author_id=author)
+            for author in authors for i in range(options['posts'])
+        ])
+        # bulk_create не шлёт сигналы, счётчики архива пересчитываем.
+        archive.rebuild()
+        return readers, authors
+
+    def report_graph(self, authors, limit):
+        counts = sorted(Follow.objects.filter(author_id__in=authors)
+                        .values('author').annotate(count=Count('pk'))
+                        .values_list('count', flat=True), reverse=True)
+        popular = sum(1 for count in counts if count > limit)
+        self.stdout.write(
+            f'Подписчиков у авторов: максимум {counts[0]}, медиана '
+            f'{counts[len(counts) // 2]}; популярных (> {limit}) {popular}')
+
+    def write(self, authors):
+        posts = list(Post.objects.filter(author_id__in=authors,
+                                         fanned_out=False)
+                     .values_list('pk', flat=True))
+        started = time.perf_counter()
+        rows = sum(follow.fan_out(post_id) for post_id in posts)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f'Рассылка {len(posts)} постов: {rows} строк входящих за '
+            f'{elapsed:.2f} с; без лимита было бы '
+            f'{self.full_fanout_rows(authors)} строк')
+
+    @staticmethod
+    def full_fanout_rows(authors):
+        return sum(
+            Follow.objects.filter(author_id=author).count()
+            * Post.objects.filter(author_id=author).count()
+            for author in authors)
+
+    def read(self, readers):
+        def naive(reader):
+            return list(to_cards(Post.objects.filter(
+                author__following__user_id=reader))[:10])
+
+        def hybrid(reader):
+            ids = [post_id for post_id, _ in
+                   follow.feed(User(pk=reader), limit=10)]
+            return list(to_cards(Post.objects.filter(pk__in=ids)))
+
+        for name, load in (('author__in', naive), ('гибрид', hybrid)):
+            started = time.perf_counter()
+            for reader in readers:
+                load(reader)
+            elapsed = (time.perf_counter() - started) / len(readers)
+            self.stdout.write(f'Первая страница, {name}: '
+                              f'{elapsed * 1000:.2f} мс')
+        self.stdout.write(f'Строк во входящих: {InboxEntry.objects.count()}')
@@ -0,0 +1,91 @@
+import threading
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+from django.db.backends.signals import connection_created
+from django.test import override_settings
+
+from posts import lookups
+from posts.models import Post
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = ('Читает один пост из многих потоков через кэш post_detail '
+            'и считает запросы к базе: холодный старт и обновления')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=50)
+        parser.add_argument('--requests', type=int, default=200,
+                            help='Чтений на поток')
+        parser.add_argument('--soft-ttl', type=float, default=0.2)
+
+    def handle(self, *args, **options):
+        post = self.seed()
+        queries = {'count': 0}
+        lock = threading.Lock()
+
+        def count_query(execute, sql, params, many, context):
+            with lock:
+                queries['count'] += 1
+            return execute(sql, params, many, context)
+
+        def install(sender, connection, **kwargs):
+            connection.execute_wrappers.append(count_query)
+
+        connection.ensure_connection()
+        connection.execute_wrappers.append(count_query)
+        connection_created.connect(install)
+        try:
+            with override_settings(OBJECT_CACHE_SOFT_TTL=options['soft_ttl']):
+                self.run(post.pk, options, queries)
+        finally:
+            connection_created.disconnect(install)
+            connection.execute_wrappers.remove(count_query)
+
+    def run(self, post_id, options, queries):
+        cache.delete(lookups.posts.key(post_id))
+        stats = lookups.posts.stats
+        for key in stats:
+            stats[key] = 0
+        barrier = threading.Barrier(options['threads'])
+        pause = options['soft_ttl'] / 10
+
+        def worker():
+            barrier.wait()
+            try:
+                for _ in range(options['requests']):
+                    lookups.get_post_or_404(post_id)
+                    time.sleep(pause)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=worker)
+                   for _ in range(options['threads'])]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        lookups.posts.wait()
+        elapsed = time.perf_counter() - started
+        reads = options['threads'] * options['requests']
+        refreshes = stats['loads'] - 1
+        self.stdout.write(
+            f'{reads} чтений за {elapsed:.2f} с из {options["threads"]} '
+            f'потоков: загрузок {stats["loads"]} (1 холодная + '
+            f'{refreshes} обновлений), запросов к базе {queries["count"]}, '
+            f'устаревших ответов {stats["stale"]}, '
+            f'без кэша было бы {reads} запросов')
+
+    @staticmethod
+    def seed():
+        author, _ = User.objects.get_or_create(username='bench')
+        post = Post.objects.filter(author=author).first()
+        if post is None:
+            post = Post.objects.create(text='Bench', author=author)
+        return post
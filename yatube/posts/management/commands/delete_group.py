@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.groups import delete_group
+from posts.models import Group
+
+
+class Command(BaseCommand):
+    help = 'Удаляет группу, отвязывая её посты пачками'
+
+    def add_arguments(self, parser):
+        parser.add_argument('slug')
+        parser.add_argument('--chunk-size', type=int)
+
+    def handle(self, *args, **options):
+        try:
+            group = Group.objects.get(slug=options['slug'])
+        except Group.DoesNotExist:
+            raise CommandError(f"Группа {options['slug']} не найдена")
+        moved = delete_group(group, options['chunk_size'],
+                             progress=self.progress)
+        self.stdout.write(
+            f"{options['slug']} удалена: отвязано постов {moved}")
+
+    def progress(self, moved):
+        self.stdout.write(f'Отвязано постов: {moved}')
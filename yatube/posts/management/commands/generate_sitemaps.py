@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from posts import sitemaps
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает изменившиеся файлы карты сайта и её индекс'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true',
+                            help='Пересобрать все файлы')
+
+    def handle(self, *args, **options):
+        rebuilt = sitemaps.generate(full=options['all'])
+        for shard in rebuilt:
+            name = sitemaps.shard_name(shard.section, shard.number)
+            self.stdout.write(f'{name}: адресов {shard.urls}')
+        self.stdout.write(f'Пересобрано файлов: {len(rebuilt)}')
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.groups import merge_groups
+from posts.models import Group
+
+
+class Command(BaseCommand):
+    help = 'Переносит посты групп в целевую группу и удаляет исходные'
+
+    def add_arguments(self, parser):
+        parser.add_argument('sources', nargs='+', metavar='slug')
+        parser.add_argument('--into', required=True, metavar='slug',
+                            help='Слаг целевой группы')
+        parser.add_argument('--chunk-size', type=int)
+
+    def handle(self, *args, **options):
+        try:
+            target = Group.objects.get(slug=options['into'])
+        except Group.DoesNotExist:
+            raise CommandError(f"Группа {options['into']} не найдена")
+        for slug in options['sources']:
+            try:
+                source = Group.objects.get(slug=slug)
+            except Group.DoesNotExist:
+                raise CommandError(f'Группа {slug} не найдена')
+            if source.pk == target.pk:
+                raise CommandError('Нельзя объединить группу саму с собой')
+            moved = merge_groups(source, target, options['chunk_size'],
+                                 progress=self.progress)
+            self.stdout.write(
+                f'{slug} -> {target.slug}: перенесено постов {moved}')
+
+    def progress(self, moved):
+        self.stdout.write(f'Перенесено постов: {moved}')
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from posts import archive
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает число постов по месяцам для навигации архива'
+
+    def handle(self, *args, **options):
+        rows = archive.rebuild()
+        self.stdout.write(f'Строк архива: {rows}')
@@ -0,0 +1,34 @@
+# Generated by Django 2.2.16 on 2026-10-19 19:53
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0013_postviews'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrendingEntry',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(max_length=50, verbose_name='Лента')),
+                ('score', models.FloatField(verbose_name='Логарифм веса')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='posts.Post', verbose_name='Пост')),
+            ],
+            options={
+                'verbose_name_plural': 'Популярное',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='trendingentry',
+            index=models.Index(fields=['scope', '-score'], name='posts_trend_scope_b322d7_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='trendingentry',
+            constraint=models.UniqueConstraint(fields=('scope', 'post'), name='unique_trending_entry'),
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 2.2.16 on 2026-10-19 19:54
+
+from collections import Counter
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def count_existing_posts(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    MonthCount = apps.get_model('posts', 'MonthCount')
+    counts = Counter()
+    posts = Post.objects.values_list('pub_date', 'author_id', 'group_id')
+    for pub_date, author_id, group_id in posts.iterator():
+        local = timezone.localtime(pub_date)
+        scopes = ['index', f'author-{author_id}']
+        if group_id is not None:
+            scopes.append(f'group-{group_id}')
+        for scope in scopes:
+            counts[scope, local.year, local.month] += 1
+    MonthCount.objects.bulk_create(
+        MonthCount(scope=scope, year=year, month=month, count=value)
+        for (scope, year, month), value in counts.items())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0014_trendingentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthCount',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(max_length=50, verbose_name='Лента')),
+                ('year', models.PositiveSmallIntegerField(verbose_name='Год')),
+                ('month', models.PositiveSmallIntegerField(verbose_name='Месяц')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Постов')),
+            ],
+            options={
+                'verbose_name_plural': 'Архив по месяцам',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['group', '-pub_date'], name='posts_post_group_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['author', '-pub_date'], name='posts_post_author_date_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='monthcount',
+            constraint=models.UniqueConstraint(fields=('scope', 'year', 'month'), name='unique_month_count'),
+        ),
+        migrations.RunPython(count_existing_posts,
+                             migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 2.2.16 on 2026-10-19 19:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0015_monthcount'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SitemapShard',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('section', models.CharField(max_length=20, verbose_name='Раздел')),
+                ('number', models.PositiveIntegerField(verbose_name='Номер')),
+                ('dirty', models.BooleanField(default=True, verbose_name='Требует пересборки')),
+                ('urls', models.PositiveIntegerField(default=0, verbose_name='Адресов')),
+                ('generated', models.DateTimeField(blank=True, null=True, verbose_name='Собран')),
+            ],
+            options={
+                'verbose_name_plural': 'Карта сайта',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='sitemapshard',
+            constraint=models.UniqueConstraint(fields=('section', 'number'), name='unique_sitemap_shard'),
+        ),
+    ]
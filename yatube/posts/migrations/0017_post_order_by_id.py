@@ -0,0 +1,33 @@
+# Generated by Django 2.2.16 on 2026-10-19 20:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0016_sitemapshard'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='post',
+            options={'ordering': ('-pub_date', '-id'), 'verbose_name_plural': 'Записи блогов'},
+        ),
+        migrations.RemoveIndex(
+            model_name='post',
+            name='posts_post_group_date_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='post',
+            name='posts_post_author_date_idx',
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['group', '-pub_date', '-id'], name='posts_post_group_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['author', '-pub_date', '-id'], name='posts_post_author_date_idx'),
+        ),
+    ]
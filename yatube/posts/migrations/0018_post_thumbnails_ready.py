@@ -0,0 +1,36 @@
+# Generated by Django 2.2.16 on 2026-10-19 20:16
+
+import os
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import migrations, models
+
+
+def mark_existing_thumbnails(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    ready = []
+    posts = Post.objects.exclude(image='').values_list('pk', 'image')
+    for pk, image in posts.iterator():
+        stem = os.path.splitext(image)[0]
+        if all(default_storage.exists(f'thumbs/{size}/{stem}.jpg')
+               for size in settings.POST_THUMBNAIL_SIZES):
+            ready.append(pk)
+    Post.objects.filter(pk__in=ready).update(thumbnails_ready=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0017_post_order_by_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='thumbnails_ready',
+            field=models.BooleanField(default=False, verbose_name='Миниатюры готовы'),
+        ),
+        migrations.RunPython(mark_existing_thumbnails,
+                             migrations.RunPython.noop),
+    ]
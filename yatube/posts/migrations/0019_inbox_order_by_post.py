@@ -0,0 +1,21 @@
+# Generated by Django 2.2.16 on 2026-10-19 20:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0018_post_thumbnails_ready'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='inboxentry',
+            name='posts_inbox_user_id_d5f6a7_idx',
+        ),
+        migrations.AddIndex(
+            model_name='inboxentry',
+            index=models.Index(fields=['user', '-pub_date', '-post'], name='posts_inbox_user_date_idx'),
+        ),
+    ]
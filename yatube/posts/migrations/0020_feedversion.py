@@ -0,0 +1,26 @@
+# Generated by Django 2.2.16 on 2026-10-19 20:27
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0019_inbox_order_by_post'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedVersion',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(max_length=50, unique=True, verbose_name='Лента')),
+                ('version', models.PositiveIntegerField(default=0, verbose_name='Версия')),
+                ('changed', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Изменена')),
+            ],
+            options={
+                'verbose_name_plural': 'Версии лент',
+            },
+        ),
+    ]
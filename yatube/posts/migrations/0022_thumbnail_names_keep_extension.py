@@ -0,0 +1,50 @@
+import os
+from collections import Counter
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import migrations
+
+
+def rename_thumbnails(apps, schema_editor):
+    """Переносит миниатюры с ``<имя без расширения>.jpg`` на
+    ``<имя с расширением>.jpg``.
+
+    Миниатюры картинок, у которых совпадало имя без расширения, были
+    общими: их удаляем, и такие посты показывают оригинал, пока задача
+    ``post_saved`` не построит миниатюры заново.
+    """
+    Post = apps.get_model('posts', 'Post')
+    posts = list(Post.objects.filter(thumbnails_ready=True)
+                 .exclude(image='').values_list('pk', 'image'))
+    stems = Counter(os.path.splitext(image)[0] for _, image in posts)
+    shared = []
+    for pk, image in posts:
+        stem = os.path.splitext(image)[0]
+        if stems[stem] > 1:
+            shared.append(pk)
+            continue
+        for size in settings.POST_THUMBNAIL_SIZES:
+            old = f'thumbs/{size}/{stem}.jpg'
+            new = f'thumbs/{size}/{image}.jpg'
+            if not default_storage.exists(old):
+                continue
+            if not default_storage.exists(new):
+                with default_storage.open(old) as thumb:
+                    default_storage.save(new, thumb)
+            default_storage.delete(old)
+    for stem in {stem for stem, count in stems.items() if count > 1}:
+        for size in settings.POST_THUMBNAIL_SIZES:
+            default_storage.delete(f'thumbs/{size}/{stem}.jpg')
+    Post.objects.filter(pk__in=shared).update(thumbnails_ready=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0021_post_not_fanned_by_author'),
+    ]
+
+    operations = [
+        migrations.RunPython(rename_thumbnails, migrations.RunPython.noop),
+    ]
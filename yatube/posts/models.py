@@ -1,11 +1,13 @@
 from django.db import models
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 
 User = get_user_model()
 
 
 class Group(models.Model):
-    title = models.CharField(max_length=200, verbose_name='Название группы')
+    title = models.CharField(max_length=200, db_index=True,
+                             verbose_name='Название группы')
     slug = models.SlugField(unique=True, verbose_name='Идентификатор группы')
     description = models.TextField(verbose_name='Описание группы')
 
@@ -20,7 +22,7 @@ class Group(models.Model):
 class Post(models.Model):
     text = models.TextField(blank=False, help_text='Текст нового поста',
                             verbose_name='Текст поста')
-    pub_date = models.DateTimeField(auto_now_add=True,
+    pub_date = models.DateTimeField(auto_now_add=True, db_index=True,
                                     verbose_name='Дата публикации')
     author = models.ForeignKey(
         User,
@@ -32,6 +34,13 @@ class Post(models.Model):
     def __str__(self):
         return self.text
 
+    @property
+    def view_count(self):
+        try:
+            return self.views.count
+        except PostViews.DoesNotExist:
+            return 0
+
     group = models.ForeignKey(
         Group,
         blank=True,
@@ -42,7 +51,160 @@ class Post(models.Model):
                   'к которой относится пост',
         verbose_name='Группа'
     )
+    image = models.ImageField(
+        'Картинка',
+        upload_to='posts/',
+        blank=True,
+        help_text='Картинка к посту'
+    )
+    thumbnails_ready = models.BooleanField(
+        default=False,
+        verbose_name='Миниатюры готовы'
+    )
+    fanned_out = models.BooleanField(
+        default=False,
+        verbose_name='Разослан в ленты подписок'
+    )
 
     class Meta:
-        ordering = ('-pub_date',)
+        # id разводит посты с одинаковой датой, как курсор ленты.
+        ordering = ('-pub_date', '-id')
+        # Неразосланных постов мало: посты популярных авторов и свежие.
+        indexes = [models.Index(fields=('author', '-pub_date', '-id'),
+                                name='posts_post_not_fanned_idx',
+                                condition=models.Q(fanned_out=False)),
+                   models.Index(fields=('group', '-pub_date', '-id'),
+                                name='posts_post_group_date_idx'),
+                   models.Index(fields=('author', '-pub_date', '-id'),
+                                name='posts_post_author_date_idx')]
         verbose_name_plural = 'Записи блогов'
+
+
+class PostViews(models.Model):
+    """Сброшенные из буферов процессов просмотры поста, см. posts.counters."""
+    post = models.OneToOneField(Post, on_delete=models.CASCADE,
+                                primary_key=True, related_name='views',
+                                verbose_name='Пост')
+    count = models.PositiveIntegerField(default=0, verbose_name='Просмотры')
+
+    def __str__(self):
+        return f'{self.post_id}: {self.count}'
+
+    class Meta:
+        verbose_name_plural = 'Просмотры постов'
+
+
+class TrendingEntry(models.Model):
+    """Пост в топе популярного ленты или группы, см. posts.trending."""
+    scope = models.CharField(max_length=50, verbose_name='Лента')
+    post = models.ForeignKey(Post, on_delete=models.CASCADE,
+                             related_name='+', verbose_name='Пост')
+    score = models.FloatField(verbose_name='Логарифм веса')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=('scope', 'post'),
+                                    name='unique_trending_entry'),
+        ]
+        indexes = [models.Index(fields=('scope', '-score'))]
+        verbose_name_plural = 'Популярное'
+
+
+class MonthCount(models.Model):
+    """Число постов ленты за месяц для навигации архива, см. posts.archive."""
+    scope = models.CharField(max_length=50, verbose_name='Лента')
+    year = models.PositiveSmallIntegerField(verbose_name='Год')
+    month = models.PositiveSmallIntegerField(verbose_name='Месяц')
+    count = models.PositiveIntegerField(default=0, verbose_name='Постов')
+
+    def __str__(self):
+        return f'{self.scope} {self.year}-{self.month:02}: {self.count}'
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=('scope', 'year', 'month'),
+                                    name='unique_month_count'),
+        ]
+        verbose_name_plural = 'Архив по месяцам'
+
+
+class SitemapShard(models.Model):
+    """Файл карты сайта на ``SITEMAP_SHARD_SIZE`` ключей, см. sitemaps."""
+    section = models.CharField(max_length=20, verbose_name='Раздел')
+    number = models.PositiveIntegerField(verbose_name='Номер')
+    dirty = models.BooleanField(default=True,
+                                verbose_name='Требует пересборки')
+    urls = models.PositiveIntegerField(default=0, verbose_name='Адресов')
+    generated = models.DateTimeField(null=True, blank=True,
+                                     verbose_name='Собран')
+
+    def __str__(self):
+        return f'{self.section}-{self.number}'
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=('section', 'number'),
+                                    name='unique_sitemap_shard'),
+        ]
+        verbose_name_plural = 'Карта сайта'
+
+
+class FeedVersion(models.Model):
+    """Счётчик изменений ленты для ETag и Last-Modified, см. posts.feeds."""
+    scope = models.CharField(max_length=50, unique=True,
+                             verbose_name='Лента')
+    version = models.PositiveIntegerField(default=0, verbose_name='Версия')
+    changed = models.DateTimeField(default=timezone.now,
+                                   verbose_name='Изменена')
+
+    def __str__(self):
+        return f'{self.scope}: {self.version}'
+
+    class Meta:
+        verbose_name_plural = 'Версии лент'
+
+
+class Follow(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='follower',
+        verbose_name='Подписчик'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='following',
+        verbose_name='Автор'
+    )
+
+    def __str__(self):
+        return f'{self.user} → {self.author}'
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=('user', 'author'),
+                                    name='unique_follow'),
+        ]
+        verbose_name_plural = 'Подписки'
+
+
+class InboxEntry(models.Model):
+    """Пост автора, разнесённый в ленту подписок подписчика при записи."""
+    user = models.ForeignKey(User, on_delete=models.CASCADE,
+                             related_name='inbox', verbose_name='Подписчик')
+    post = models.ForeignKey(Post, on_delete=models.CASCADE,
+                             related_name='inbox_entries',
+                             verbose_name='Пост')
+    author = models.ForeignKey(User, on_delete=models.CASCADE,
+                               related_name='+', verbose_name='Автор')
+    pub_date = models.DateTimeField(verbose_name='Дата публикации')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=('user', 'post'),
+                                    name='unique_inbox_entry'),
+        ]
+        indexes = [models.Index(fields=('user', '-pub_date', '-post'),
+                                name='posts_inbox_user_date_idx')]
+        verbose_name_plural = 'Ленты подписок'
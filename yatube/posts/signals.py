@@ -0,0 +1,246 @@
+from django.db.models.signals import (post_delete, post_init, post_save,
+                                      pre_delete, pre_save)
+from django.db import transaction
+from django.dispatch import Signal, receiver
+
+from core.surrogate import purge
+from core.tasks import enqueue_on_commit
+
+from . import (archive, feeds, lookups, sitemaps, stream, surrogate, tasks,
+               thumbnails, trending)
+from .models import Group, MonthCount, Post, User
+
+# Посты перенесены пакетным UPDATE, post_save для них не отправлялся.
+posts_reassigned = Signal(providing_args=['source', 'target', 'post_ids'])
+
+# Поля автора на страницах; вход меняет только last_login.
+AUTHOR_CARD_FIELDS = {'username', 'first_name', 'last_name'}
+# Поля группы на странице поста.
+GROUP_CARD_FIELDS = {'title', 'slug'}
+
+
+@receiver(post_save, sender=Post)
+def enqueue_post_saved(sender, instance, created, **kwargs):
+    enqueue_on_commit(tasks.post_saved, post_id=instance.pk,
+                      created=created)
+
+
+@receiver(post_save, sender=Post)
+def publish_new_post(sender, instance, created, **kwargs):
+    if created:
+        post_id, topics = instance.pk, stream.post_topics(instance)
+        transaction.on_commit(lambda: stream.publish_post(post_id, topics))
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def invalidate_group_lookup(sender, instance, **kwargs):
+    lookups.groups.invalidate(instance)
+    purge({surrogate.group_key(instance.pk)})
+
+
+def invalidate_cached_posts(posts):
+    post_ids = list(posts.values_list('pk', flat=True))
+    transaction.on_commit(lambda: lookups.posts.invalidate_many(post_ids))
+
+
+@receiver(post_save, sender=Group)
+def invalidate_group_posts(sender, instance, created, update_fields=None,
+                           **kwargs):
+    if created:
+        return
+    if update_fields is None or GROUP_CARD_FIELDS & set(update_fields):
+        # Кэшированные посты несут группу целиком, вместе с названием.
+        invalidate_cached_posts(Post.objects.filter(group_id=instance.pk))
+
+
+# До удаления: SET_NULL снимает группу с постов без их post_save.
+@receiver(pre_delete, sender=Group)
+def invalidate_orphaned_posts(sender, instance, **kwargs):
+    invalidate_cached_posts(Post.objects.filter(group_id=instance.pk))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_author_lookup(sender, instance, update_fields=None,
+                             **kwargs):
+    lookups.authors.invalidate(instance)
+    if update_fields is None or AUTHOR_CARD_FIELDS & set(update_fields):
+        # Кэшированные посты несут автора целиком, вместе с именем.
+        invalidate_cached_posts(Post.objects.filter(author_id=instance.pk))
+        purge({surrogate.author_key(instance.pk)})
+        feeds.touch({surrogate.author_key(instance.pk)})
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post(sender, instance, **kwargs):
+    lookups.posts.invalidate(instance.pk)
+    purge(surrogate.post_keys(instance) | {surrogate.INDEX_KEY})
+
+
+# Стоит до count_archive_post: тот обновляет запомненную группу.
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def touch_post_feeds(sender, instance, **kwargs):
+    scopes = {surrogate.INDEX_KEY, surrogate.author_key(instance.author_id)}
+    for group_id in (instance.group_id,
+                     getattr(instance, '_archive_group_id', None)):
+        if group_id is not None:
+            scopes.add(surrogate.group_key(group_id))
+    feeds.touch(scopes)
+
+
+@receiver(post_save, sender=Group)
+def touch_group_feed(sender, instance, **kwargs):
+    feeds.touch({surrogate.group_key(instance.pk)})
+
+
+@receiver(posts_reassigned)
+def invalidate_reassigned_posts(sender, source, target, post_ids,
+                                **kwargs):
+    for post_id in post_ids:
+        lookups.posts.invalidate(post_id)
+    keys = {surrogate.post_key(post_id) for post_id in post_ids}
+    groups = {surrogate.group_key(group.pk)
+              for group in (source, target) if group is not None}
+    keys.update(groups)
+    purge(keys)
+    feeds.touch(groups)
+
+
+def delete_image_on_commit(name, storage):
+    def delete():
+        storage.delete(name)
+        thumbnails.delete(name, storage)
+
+    transaction.on_commit(delete)
+
+
+@receiver(post_delete, sender=Post)
+def delete_post_image(sender, instance, **kwargs):
+    if instance.image:
+        delete_image_on_commit(instance.image.name, instance.image.storage)
+
+
+def image_name(instance):
+    # None, если поле отложено и не загружалось.
+    image = instance.__dict__.get('image')
+    return getattr(image, 'name', image)
+
+
+@receiver(post_init, sender=Post)
+def remember_image(sender, instance, **kwargs):
+    instance._saved_image = image_name(instance)
+
+
+@receiver(pre_save, sender=Post)
+def reset_thumbnails(sender, instance, **kwargs):
+    name = image_name(instance)
+    if name is not None and name != instance._saved_image:
+        instance.thumbnails_ready = False
+
+
+@receiver(post_save, sender=Post)
+def delete_replaced_image(sender, instance, created, **kwargs):
+    old, new = instance._saved_image, image_name(instance)
+    if not created and old and new is not None and old != new:
+        delete_image_on_commit(old, instance.image.storage)
+    instance._saved_image = new
+
+
+@receiver(post_init, sender=Post)
+def remember_group(sender, instance, **kwargs):
+    # Через __dict__, чтобы отложенное поле не подгружалось запросом.
+    instance._archive_group_id = instance.__dict__.get('group_id')
+
+
+# Тоже до count_archive_post.
+@receiver(post_save, sender=Post)
+def move_trending_post(sender, instance, created, **kwargs):
+    old, new = instance._archive_group_id, instance.group_id
+    if not created and old != new:
+        trending.move([instance.pk],
+                      surrogate.group_key(old) if old else None,
+                      surrogate.group_key(new) if new else None)
+
+
+@receiver(posts_reassigned)
+def move_trending_posts(sender, source, target, post_ids, **kwargs):
+    trending.move(post_ids,
+                  surrogate.group_key(source.pk) if source else None,
+                  surrogate.group_key(target.pk) if target else None)
+
+
+@receiver(post_save, sender=Post)
+def count_archive_post(sender, instance, created, **kwargs):
+    if created:
+        archive.add(instance.pub_date,
+                    archive.scopes(instance.author_id, instance.group_id))
+    elif instance._archive_group_id != instance.group_id:
+        old, new = instance._archive_group_id, instance.group_id
+        for group_id, delta in ((old, -1), (new, 1)):
+            if group_id is not None:
+                archive.add(instance.pub_date,
+                            [surrogate.group_key(group_id)], delta)
+    instance._archive_group_id = instance.group_id
+
+
+@receiver(post_delete, sender=Post)
+def uncount_archive_post(sender, instance, **kwargs):
+    archive.add(instance.pub_date,
+                archive.scopes(instance.author_id, instance.group_id), -1)
+
+
+@receiver(posts_reassigned)
+def move_archive_counts(sender, source, target, post_ids, **kwargs):
+    source_key = surrogate.group_key(source.pk) if source else None
+    target_key = surrogate.group_key(target.pk) if target else None
+    archive.move(post_ids, source_key, target_key)
+
+
+@receiver(post_delete, sender=Group)
+def drop_group_archive(sender, instance, **kwargs):
+    MonthCount.objects.filter(scope=surrogate.group_key(instance.pk)).delete()
+
+
+@receiver(post_delete, sender=User)
+def drop_author_archive(sender, instance, **kwargs):
+    MonthCount.objects.filter(
+        scope=surrogate.author_key(instance.pk)).delete()
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def mark_post_sitemaps(sender, instance, **kwargs):
+    sitemaps.mark('posts', instance.pk)
+    sitemaps.mark('profiles', instance.author_id)
+    if instance.group_id is not None:
+        sitemaps.mark('groups', instance.group_id)
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def mark_group_sitemap(sender, instance, **kwargs):
+    sitemaps.mark('groups', instance.pk)
+
+
+@receiver(post_save, sender=User)
+def mark_profile_sitemap(sender, instance, created, update_fields=None,
+                         **kwargs):
+    # Новый пользователь без постов в карту не попадает.
+    if not created and (update_fields is None
+                        or 'username' in update_fields):
+        sitemaps.mark('profiles', instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def unmark_profile_sitemap(sender, instance, **kwargs):
+    sitemaps.mark('profiles', instance.pk)
+
+
+@receiver(posts_reassigned)
+def mark_reassigned_sitemaps(sender, source, target, **kwargs):
+    for group in (source, target):
+        if group is not None:
+            sitemaps.mark('groups', group.pk)
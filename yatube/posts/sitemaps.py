@@ -0,0 +1,201 @@
+"""Карта сайта: посты, группы и профили авторов.
+
+Каждый раздел нарезан на файлы по ``settings.SITEMAP_SHARD_SIZE``
+ключей: в ``sitemap-posts-3.xml.gz`` попадают посты с id от
+``3 * SITEMAP_SHARD_SIZE`` до следующей границы. Файл собирается
+потоком: строки идут из базы по первичному ключу пачками через
+``iterator`` и сразу пишутся в gzip на диск, так что память не зависит
+от размера раздела. Файл пишется во временный рядом с готовым, у каждого
+запуска свой, и подменяет старый через ``os.replace``.
+
+Сигналы помечают грязными только файлы, которых коснулось изменение;
+пометки копятся до конца транзакции, и каждый файл помечается одним
+запросом. ``manage.py generate_sitemaps`` пересобирает лишь их и индекс
+``sitemap.xml``. Файлы лежат в ``MEDIA_ROOT/SITEMAP_DIR`` и отдаются как
+медиа: фронт-сервером или ``core.media`` с ``ETag`` и ``Range``.
+"""
+import gzip
+import os
+import tempfile
+from contextlib import contextmanager
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models import Max
+from django.urls import reverse
+from django.utils import timezone
+
+from core.batching import OnCommitBatch
+
+from .models import Group, Post, SitemapShard
+
+User = get_user_model()
+
+INDEX_NAME = 'sitemap.xml'
+URLSET = (b'<?xml version="1.0" encoding="UTF-8"?>\n'
+          b'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
+
+
+def post_urls(start, end):
+    rows = (Post.objects.filter(pk__gte=start, pk__lt=end).order_by('pk')
+            .values_list('pk', 'pub_date'))
+    for pk, pub_date in rows.iterator(settings.SITEMAP_CHUNK_SIZE):
+        yield reverse('posts:post_detail', args=(pk,)), pub_date
+
+
+def group_urls(start, end):
+    rows = (Group.objects.filter(pk__gte=start, pk__lt=end).order_by('pk')
+            .annotate(lastmod=Max('posts__pub_date'))
+            .values_list('slug', 'lastmod'))
+    for slug, lastmod in rows.iterator(settings.SITEMAP_CHUNK_SIZE):
+        yield reverse('posts:group_list', args=(slug,)), lastmod
+
+
+def profile_urls(start, end):
+    # В карту попадают только авторы: профиль без постов пуст.
+    rows = (User.objects.filter(pk__gte=start, pk__lt=end).order_by('pk')
+            .annotate(lastmod=Max('posts__pub_date'))
+            .filter(lastmod__isnull=False)
+            .values_list('username', 'lastmod'))
+    for username, lastmod in rows.iterator(settings.SITEMAP_CHUNK_SIZE):
+        yield reverse('posts:profile', args=(username,)), lastmod
+
+
+SECTIONS = {
+    'posts': (Post, post_urls),
+    'groups': (Group, group_urls),
+    'profiles': (User, profile_urls),
+}
+
+
+def shard_name(section, number):
+    return f'sitemap-{section}-{number}.xml.gz'
+
+
+def file_path(name):
+    return os.path.join(settings.MEDIA_ROOT, settings.SITEMAP_DIR, name)
+
+
+def absolute(location):
+    return escape(settings.SITE_URL.rstrip('/') + location)
+
+
+def mark_shards(shards):
+    """Помечает файлы ``{(раздел, номер)}`` для пересборки."""
+    for section, number in sorted(shards):
+        rows = SitemapShard.objects.filter(section=section, number=number)
+        if not rows.update(dirty=True):
+            SitemapShard.objects.get_or_create(section=section, number=number)
+
+
+marks = OnCommitBatch(mark_shards)
+
+
+def mark(section, key):
+    """Помечает файл раздела с ключом ``key`` после фиксации транзакции."""
+    marks.add({(section, key // settings.SITEMAP_SHARD_SIZE)})
+
+
+def mark_all():
+    shards = set()
+    for section, (model, _) in SECTIONS.items():
+        top = model.objects.aggregate(top=Max('pk'))['top']
+        if top is None:
+            continue
+        shards.update((section, number) for number in
+                      range(top // settings.SITEMAP_SHARD_SIZE + 1))
+    mark_shards(shards)
+
+
+@contextmanager
+def temporary_file(path, mode='wb', **kwargs):
+    """Временный файл рядом с ``path``; удаляется, если запись упала."""
+    directory, name = os.path.split(path)
+    out = tempfile.NamedTemporaryFile(mode, dir=directory,
+                                      prefix=f'.{name}.', suffix='.tmp',
+                                      delete=False, **kwargs)
+    try:
+        with out:
+            # NamedTemporaryFile создаёт файл только для владельца, а
+            # фронт-сервер отдаёт его как медиа.
+            os.chmod(out.name, settings.FILE_UPLOAD_PERMISSIONS or 0o644)
+            yield out
+    except BaseException:
+        os.remove(out.name)
+        raise
+
+
+def write_shard(shard):
+    """Собирает файл потоком; возвращает число адресов.
+
+    Пустой файл удаляется, чтобы индекс на него не ссылался.
+    """
+    _, urls = SECTIONS[shard.section]
+    start = shard.number * settings.SITEMAP_SHARD_SIZE
+    path = file_path(shard_name(shard.section, shard.number))
+    count = 0
+    # mtime=0: одинаковое содержимое даёт одинаковые байты.
+    with temporary_file(path) as raw, gzip.GzipFile(
+            fileobj=raw, mode='wb', mtime=0) as out:
+        out.write(URLSET)
+        for location, lastmod in urls(start,
+                                      start + settings.SITEMAP_SHARD_SIZE):
+            lastmod = (f'<lastmod>{lastmod.isoformat(timespec="seconds")}'
+                       f'</lastmod>' if lastmod else '')
+            out.write(f'<url><loc>{absolute(location)}</loc>{lastmod}'
+                      f'</url>\n'.encode())
+            count += 1
+        out.write(b'</urlset>\n')
+    if count:
+        os.replace(raw.name, path)
+    else:
+        os.remove(raw.name)
+        if os.path.exists(path):
+            os.remove(path)
+    return count
+
+
+def write_index():
+    path = file_path(INDEX_NAME)
+    shards = (SitemapShard.objects.filter(urls__gt=0)
+              .order_by('section', 'number'))
+    with temporary_file(path, 'w', encoding='utf-8') as out:
+        out.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+                  '<sitemapindex '
+                  'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
+        for shard in shards.iterator():
+            name = shard_name(shard.section, shard.number)
+            location = absolute(reverse('posts:sitemap', args=(name,)))
+            generated = shard.generated.isoformat(timespec='seconds')
+            out.write(f'<sitemap><loc>{location}</loc>'
+                      f'<lastmod>{generated}</lastmod></sitemap>\n')
+        out.write('</sitemapindex>\n')
+    os.replace(out.name, path)
+
+
+def generate(full=False):
+    """Пересобирает грязные файлы и индекс; возвращает пересобранные.
+
+    Флаг снимается до чтения данных: изменение во время сборки снова
+    пометит файл, и его подхватит следующий запуск. Если сборка упала,
+    флаг возвращается.
+    """
+    if full or not SitemapShard.objects.exists():
+        mark_all()
+    os.makedirs(file_path(''), exist_ok=True)
+    rebuilt = []
+    for shard in SitemapShard.objects.filter(dirty=True).order_by(
+            'section', 'number'):
+        SitemapShard.objects.filter(pk=shard.pk).update(dirty=False)
+        try:
+            shard.urls = write_shard(shard)
+        except Exception:
+            SitemapShard.objects.filter(pk=shard.pk).update(dirty=True)
+            raise
+        shard.generated = timezone.now()
+        shard.save(update_fields=('urls', 'generated'))
+        rebuilt.append(shard)
+    if rebuilt or not os.path.exists(file_path(INDEX_NAME)):
+        write_index()
+    return rebuilt
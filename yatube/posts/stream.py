@@ -0,0 +1,119 @@
+"""Server-Sent Events с новыми постами ленты, группы или автора.
+
+Новый пост после фиксации транзакции один раз рендерится в карточку и
+публикуется в ``hub`` по темам ``index``, ``group-<id>`` и
+``author-<id>`` (те же, что суррогатные ключи). Соединение ждёт события
+в своей ограниченной очереди и раз в ``settings.SSE_HEARTBEAT`` секунд
+шлёт комментарий, чтобы прокси не закрыли его по простою. По
+``Last-Event-ID`` переподключившийся клиент дочитывает пропущенное из
+базы.
+
+Django 2.2 не умеет асинхронных представлений, поэтому поток ответа —
+``StreamingHttpResponse``, и каждое соединение занимает поток воркера.
+Тысячи простаивающих подписчиков держит gunicorn с воркером ``gevent``
+(``--worker-class gevent``): очереди и блокировки тогда кооперативные.
+Соединение с базой поток закрывает, как только начинает отдавать тело:
+события приходят готовыми, и простаивающий подписчик базу не держит.
+
+Хаб живёт внутри процесса: подписчик получает только посты, записанные
+тем же процессом. При нескольких воркерах gunicorn пост, принятый
+соседним воркером, в открытый поток не попадёт и дойдёт до клиента
+лишь после переподключения, из базы по ``Last-Event-ID``. Поэтому
+и запись постов, и потоки нужно обслуживать одним процессом (например,
+отдельным воркером ``gevent``, куда прокси направляет ``/stream/`` и
+формы постов).
+"""
+from django.conf import settings
+from django.db import connections
+from django.template.loader import render_to_string
+
+from core.pubsub import Hub
+
+from . import surrogate
+from .cards import PostCard, to_cards
+from .models import Post
+
+hub = Hub()
+
+
+def encode(post_id, html):
+    lines = [f'id: {post_id}', 'event: post']
+    lines.extend(f'data: {line}' for line in html.splitlines())
+    return ('\n'.join(lines) + '\n\n').encode()
+
+
+def render_cards(cards):
+    return [encode(card.id, render_to_string(
+        'posts/includes/post_list.html',
+        {'posts': [card], 'show_posts': True})) for card in cards]
+
+
+def post_topics(post):
+    return (surrogate.post_keys(post) - {surrogate.post_key(post.pk)}
+            | {surrogate.INDEX_KEY})
+
+
+def publish_post(post_id, topics):
+    """Рендерит и рассылает пост, если на его темы кто-то подписан."""
+    if not hub.has_subscribers(topics):
+        return 0
+    row = to_cards(Post.objects.filter(pk=post_id)).first()
+    if row is None:
+        return 0
+    return hub.publish(topics, render_cards([PostCard.from_row(row)])[0])
+
+
+class EventStream:
+    """Итератор тела ответа; ``close`` снимает подписку, даже если
+    итерация так и не началась."""
+
+    def __init__(self, subscription, backlog):
+        self.subscription = subscription
+        self.backlog = list(backlog)
+        self.started = False
+        self.closed = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.closed:
+            raise StopIteration
+        if not self.started:
+            self.started = True
+            release_connections()
+            return f'retry: {settings.SSE_RETRY_MS}\n\n'.encode()
+        if self.backlog:
+            return self.backlog.pop(0)
+        if not self.subscription.lagging:
+            event = self.subscription.get(settings.SSE_HEARTBEAT)
+            return b': ping\n\n' if event is None else event
+        event = self.subscription.get(0)
+        if event is not None:
+            return event
+        # Очередь переполнялась: клиент переподключится с Last-Event-ID
+        # и дочитает пропущенное из базы.
+        self.close()
+        return b'event: reset\ndata: \n\n'
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.subscription.close()
+
+
+def release_connections():
+    """Закрывает соединения потока; внутри транзакции их не трогает."""
+    for connection in connections.all():
+        if not connection.in_atomic_block:
+            connection.close()
+
+
+def backlog(queryset, last_event_id):
+    """Посты новее ``Last-Event-ID``, от старых к новым."""
+    if not last_event_id.isdigit():
+        return []
+    rows = to_cards(queryset.filter(pk__gt=int(last_event_id))
+                    .order_by('-pk'))[:settings.SSE_BACKLOG]
+    cards = [PostCard.from_row(row) for row in rows]
+    return render_cards(reversed(cards))
@@ -0,0 +1,35 @@
+"""Суррогатные ключи страниц постов.
+
+Ключи строятся по id, а не по slug и username: переименование группы или
+автора не оставляет в прокси страниц под старым ключом, а удаление
+пачки постов не подгружает автора и группу каждого. Лента помечается
+ключом ``index``, страница группы и профиль — ключом группы и автора, а
+каждая карточка добавляет ключи своего поста, автора и группы.
+"""
+INDEX_KEY = 'index'
+
+
+def post_key(post_id):
+    return f'post-{post_id}'
+
+
+def group_key(group_id):
+    return f'group-{group_id}'
+
+
+def author_key(author_id):
+    return f'author-{author_id}'
+
+
+def post_keys(post):
+    keys = {post_key(post.pk), author_key(post.author_id)}
+    if post.group_id is not None:
+        keys.add(group_key(post.group_id))
+    return keys
+
+
+def page_keys(page_obj):
+    keys = set()
+    for post in page_obj:
+        keys.update(post_keys(post))
+    return keys
@@ -0,0 +1,22 @@
+from django.conf import settings
+
+from core.tasks import task
+
+from . import follow, lookups, thumbnails, trending
+from .models import Post
+
+
+@task()
+def post_saved(post_id, created):
+    """Побочные эффекты сохранения поста, вынесенные из запроса."""
+    image = (Post.objects.filter(pk=post_id)
+             .values_list('image', flat=True).first())
+    if image:
+        thumbnails.generate(image)
+        # Картинку могли заменить, пока строились миниатюры.
+        if (Post.objects.filter(pk=post_id, image=image)
+                .update(thumbnails_ready=True)):
+            lookups.posts.invalidate(post_id)
+    if created:
+        follow.fan_out(post_id)
+        trending.record({post_id: 1}, settings.TRENDING_POST_WEIGHT)
@@ -0,0 +1,12 @@
+from django import template
+
+from posts import thumbnails
+
+register = template.Library()
+
+
+@register.filter
+def thumbnail_url(post, size):
+    """``{{ post|thumbnail_url:'card' }}`` без ресайза и без хранилища."""
+    return thumbnails.url(getattr(post.image, 'name', post.image), size,
+                          post.thumbnails_ready)
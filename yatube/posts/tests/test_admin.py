@@ -0,0 +1,56 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Post, Group
+
+User = get_user_model()
+
+
+class PostAdminChangeListTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = User.objects.create_superuser(username='admin',
+                                                  email='admin@mail.ru',
+                                                  password='admin-pass')
+        cls.groups = [
+            Group.objects.create(title=f'Группа {i}', slug=f'group-{i}')
+            for i in range(20)
+        ]
+
+    def setUp(self):
+        self.admin_client = Client()
+        self.admin_client.force_login(self.admin)
+        self.url = reverse('admin:posts_post_changelist')
+
+    def create_posts(self, count):
+        Post.objects.bulk_create([
+            Post(text=f'Пост {i}', author=self.admin,
+                 group=self.groups[i % len(self.groups)])
+            for i in range(count)
+        ])
+
+    def count_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.admin_client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries), response
+
+    def test_changelist_queries_do_not_grow_with_rows(self):
+        """Число запросов к списку постов не зависит от числа строк"""
+        self.create_posts(3)
+        few, _ = self.count_queries()
+        self.create_posts(40)
+        many, _ = self.count_queries()
+        self.assertEqual(few, many)
+
+    def test_changelist_renders_only_selected_group(self):
+        """В строке списка выводится только выбранная группа"""
+        self.create_posts(1)
+        _, response = self.count_queries()
+        html = response.content.decode()
+        self.assertIn(f'value="{self.groups[0].pk}" selected', html)
+        self.assertNotIn(f'>{self.groups[1].title}</option>', html)
@@ -0,0 +1,141 @@
+from datetime import datetime, timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from posts import archive
+from posts.groups import reassign_posts
+from posts.models import Group, MonthCount, Post
+
+User = get_user_model()
+
+
+def at(*args):
+    return timezone.make_aware(datetime(*args))
+
+
+class ArchiveTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='auth')
+        self.group = Group.objects.create(title='Группа', slug='group',
+                                          description='Описание')
+        self.other = Group.objects.create(title='Другая', slug='other',
+                                          description='Описание')
+        self.march = self.create(at(2022, 3, 31, 23, 59, 59, 999999),
+                                 group=self.group)
+        self.april = self.create(at(2022, 4, 1), group=self.group)
+        self.old = self.create(at(2021, 12, 15))
+
+    def create(self, pub_date, **kwargs):
+        with mock.patch('django.utils.timezone.now', return_value=pub_date):
+            return Post.objects.create(text='Пост', author=self.author,
+                                       **kwargs)
+
+    def counts(self, scope):
+        return archive.months(scope)
+
+    def test_counts_maintained(self):
+        """Счётчики месяцев следуют за созданием, переносом и удалением"""
+        group = f'group-{self.group.pk}'
+        self.assertEqual(self.counts('index'),
+                         [(2022, 4, 1), (2022, 3, 1), (2021, 12, 1)])
+        self.assertEqual(self.counts(group), [(2022, 4, 1), (2022, 3, 1)])
+        self.assertEqual(self.counts(f'author-{self.author.pk}'),
+                         self.counts('index'))
+        self.march.group = self.other
+        self.march.save()
+        self.assertEqual(self.counts(group), [(2022, 4, 1)])
+        self.assertEqual(self.counts(f'group-{self.other.pk}'),
+                         [(2022, 3, 1)])
+        self.april.delete()
+        self.assertEqual(self.counts(group), [])
+        self.assertEqual(self.counts('index'), [(2022, 3, 1), (2021, 12, 1)])
+
+    def test_deletes_batched(self):
+        """Удаление постов в транзакции обновляет каждый счётчик один раз"""
+        posts = [self.create(at(2022, 4, 2), group=self.group)
+                 for _ in range(5)]
+        with CaptureQueriesContext(connection) as queries:
+            with transaction.atomic():
+                for post in posts:
+                    post.delete()
+        updates = [query for query in queries.captured_queries
+                   if query['sql'].startswith('UPDATE "posts_monthcount"')]
+        self.assertEqual(len(updates), 3)
+        self.assertEqual(self.counts(f'group-{self.group.pk}'),
+                         [(2022, 4, 1), (2022, 3, 1)])
+
+    def test_rollback_discards_counts(self):
+        """Откаченная транзакция не меняет счётчики"""
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                self.create(at(2022, 4, 2))
+                raise RuntimeError
+        self.assertEqual(self.counts('index'),
+                         [(2022, 4, 1), (2022, 3, 1), (2021, 12, 1)])
+
+    def test_reassign_moves_counts(self):
+        """Пакетный перенос постов переносит и счётчики"""
+        reassign_posts(self.group, self.other)
+        self.assertEqual(self.counts(f'group-{self.group.pk}'), [])
+        self.assertEqual(self.counts(f'group-{self.other.pk}'),
+                         [(2022, 4, 1), (2022, 3, 1)])
+
+    def test_rebuild_matches(self):
+        """Пересчёт с нуля даёт те же счётчики"""
+        maintained = set(MonthCount.objects.values_list(
+            'scope', 'year', 'month', 'count'))
+        MonthCount.objects.all().delete()
+        archive.rebuild()
+        self.assertEqual(set(MonthCount.objects.values_list(
+            'scope', 'year', 'month', 'count')), maintained)
+
+    def test_month_bounds(self):
+        """Месяц — полуоткрытый диапазон дат"""
+        response = self.client.get(reverse('posts:archive',
+                                           args=(2022, 3)))
+        self.assertEqual(list(response.context['page_obj']), [self.march])
+        response = self.client.get(reverse('posts:archive', args=(2022,)))
+        self.assertEqual(list(response.context['page_obj']),
+                         [self.april, self.march])
+
+    def test_no_aggregation(self):
+        """Страница месяца не считает посты: навигация, сумма и страница"""
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('posts:archive',
+                                               args=(2021, 12)))
+        self.assertEqual(response.context['page_obj'].paginator.count, 1)
+        self.assertEqual([entry['year'] for entry in
+                          response.context['archive']], [2022, 2021])
+
+    def test_group_and_profile(self):
+        """Архивы группы и автора показывают только свои посты"""
+        response = self.client.get(reverse('posts:group_archive',
+                                           args=(self.group.slug, 2021)))
+        self.assertEqual(list(response.context['page_obj']), [])
+        response = self.client.get(reverse(
+            'posts:profile_archive', args=(self.author.username, 2021, 12)))
+        self.assertEqual(list(response.context['page_obj']), [self.old])
+        response = self.client.get(reverse('posts:group_archive',
+                                           args=(self.group.slug,)))
+        self.assertIsNone(response.context['page_obj'])
+
+    def test_bad_month(self):
+        """Несуществующий месяц отдаёт 404"""
+        response = self.client.get(reverse('posts:archive', args=(2022, 13)))
+        self.assertEqual(response.status_code, 404)
+
+    def test_local_month(self):
+        """Месяц считается в часовом поясе сайта"""
+        with timezone.override('Europe/Moscow'):
+            self.assertEqual(archive.month_of(self.march.pub_date), (2022, 4))
+            start, end = archive.date_range(2022, 4)
+        self.assertEqual(end - start, timedelta(days=30))
+        self.assertEqual(start, at(2022, 3, 31, 21))
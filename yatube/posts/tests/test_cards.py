@@ -0,0 +1,58 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.template.loader import render_to_string
+from django.test import TestCase
+from django.urls import reverse
+
+from posts.cards import PostCard, to_cards
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class PostCardTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='auth',
+                                              first_name='Лев',
+                                              last_name='Толстой')
+        cls.group = Group.objects.create(title='Тестовая группа',
+                                         slug='test-slug',
+                                         description='Описание')
+        cls.post = Post.objects.create(text='Тестовый пост',
+                                       author=cls.author, group=cls.group)
+
+    def test_card_renders_like_model(self):
+        """Карточка и экземпляр Post дают одинаковый HTML карточки"""
+        row = to_cards(Post.objects.filter(pk=self.post.pk)).get()
+        card = PostCard.from_row(row)
+        template = 'includes/post_card.html'
+        self.assertEqual(
+            render_to_string(template, {'post': card, 'show_posts': True}),
+            render_to_string(template, {'post': self.post,
+                                        'show_posts': True}))
+        self.assertEqual(card, self.post)
+
+    def test_feeds_use_cards(self):
+        """Ленты отдают карточки одним запросом на страницу постов"""
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', args=(self.group.slug,)),
+            reverse('posts:profile', args=(self.author.username,)),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                card = response.context['page_obj'][0]
+                self.assertIsInstance(card, PostCard)
+                self.assertEqual(card.author.get_full_name(), 'Лев Толстой')
+                self.assertEqual(card.group.slug, self.group.slug)
+
+    def test_bench_cards_command(self):
+        """bench_cards печатает строку на каждый размер и вариант"""
+        out = StringIO()
+        call_command('bench_cards', sizes=[2], repeat=1, stdout=out)
+        self.assertEqual(len(out.getvalue().splitlines()), 2)
@@ -0,0 +1,74 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from posts import counters
+from posts.models import Post, PostViews
+
+User = get_user_model()
+
+
+@override_settings(COUNTER_FLUSH_INTERVAL=3600)
+class PostViewsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        counters.views.clear()
+        self.author = User.objects.create_user(username='auth')
+        self.post = Post.objects.create(text='Тестовый пост',
+                                        author=self.author)
+        self.url = reverse('posts:post_detail', args=(self.post.pk,))
+        self.beacon = reverse('posts:post_view', args=(self.post.pk,))
+
+    def test_views_buffered(self):
+        """Просмотр копится в буфере, а не пишется в базу"""
+        for _ in range(2):
+            self.assertEqual(self.client.post(self.beacon).status_code, 204)
+        response = self.client.get(self.url)
+        self.assertFalse(PostViews.objects.exists())
+        self.assertEqual(response.context['view_count'], 2)
+
+    def test_detail_page_not_counted(self):
+        """Кэшируемая страница поста сама просмотр не считает"""
+        self.client.get(self.url)
+        self.assertEqual(counters.views.get(self.post.pk), 0)
+        self.assertEqual(self.client.get(self.beacon).status_code, 405)
+        missing = reverse('posts:post_view', args=(self.post.pk + 1,))
+        self.assertEqual(self.client.post(missing).status_code, 404)
+
+    def test_count_fresh_after_flush(self):
+        """После сброса страница показывает сохранённое и новое"""
+        self.client.get(self.url)
+        for _ in range(3):
+            self.client.post(self.beacon)
+        counters.views.flush()
+        self.client.post(self.beacon)
+        response = self.client.get(self.url)
+        self.assertEqual(response.context['view_count'], 4)
+
+    def test_flush_upserts(self):
+        """Сброс создаёт строку, а следующий прибавляет к ней"""
+        counters.views.add(self.post.pk, 2)
+        counters.views.flush()
+        counters.views.add(self.post.pk, 3)
+        counters.views.flush()
+        self.assertEqual(PostViews.objects.get(post=self.post).count, 5)
+
+    def test_deleted_post_skipped(self):
+        """Просмотры удалённого поста не ломают пакет"""
+        other = Post.objects.create(text='Другой пост', author=self.author)
+        counters.views.add(self.post.pk)
+        counters.views.add(other.pk)
+        other.delete()
+        self.assertEqual(counters.views.flush(), 2)
+        self.assertEqual(list(PostViews.objects.values_list('post', 'count')),
+                         [(self.post.pk, 1)])
+
+    def test_count_on_cards(self):
+        """Число просмотров приходит в карточки ленты тем же запросом"""
+        PostViews.objects.create(post=self.post, count=7)
+        Post.objects.create(text='Без просмотров', author=self.author)
+        with self.assertNumQueries(2):
+            cards = self.client.get(reverse('posts:index')).context[
+                'page_obj']
+        self.assertEqual([card.view_count for card in cards], [0, 7])
@@ -0,0 +1,135 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.test import TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.models import FeedVersion, Group, Post
+
+User = get_user_model()
+
+
+class FeedTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='auth')
+        self.group = Group.objects.create(title='Группа', slug='group',
+                                          description='Описание')
+        self.post = Post.objects.create(text='Пост в группе',
+                                        author=self.author, group=self.group)
+        self.other = Post.objects.create(text='Пост без группы',
+                                         author=self.author)
+
+    def test_formats(self):
+        """RSS и Atom ленты, группы и автора"""
+        urls = {
+            reverse('posts:index_feed', args=('rss',)): 'application/rss',
+            reverse('posts:index_feed', args=('atom',)): 'application/atom',
+            reverse('posts:group_feed', args=('group', 'rss')):
+                'application/rss',
+            reverse('posts:profile_feed', args=('auth', 'atom')):
+                'application/atom',
+        }
+        for url, content_type in urls.items():
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertTrue(response['Content-Type'].startswith(
+                    content_type))
+                self.assertIn('ETag', response)
+                self.assertIn('Last-Modified', response)
+
+    def test_group_feed_items(self):
+        """Лента группы содержит только посты группы"""
+        content = self.client.get(reverse(
+            'posts:group_feed', args=('group', 'rss'))).content.decode()
+        self.assertIn(reverse('posts:post_detail', args=(self.post.pk,)),
+                      content)
+        self.assertNotIn(reverse('posts:post_detail', args=(self.other.pk,)),
+                         content)
+
+    def test_not_modified(self):
+        """Повторный опрос без изменений получает 304 по одной версии"""
+        url = reverse('posts:index_feed', args=('rss',))
+        response = self.client.get(url)
+        with self.assertNumQueries(1):
+            cached = self.client.get(
+                url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached['ETag'], response['ETag'])
+        modified_since = self.client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(modified_since.status_code, 304)
+
+    def test_body_cached(self):
+        """Тело ленты берётся из кэша до следующей записи"""
+        url = reverse('posts:group_feed', args=('group', 'atom'))
+        self.client.get(url)
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_write_invalidates(self):
+        """Новый пост меняет ETag и попадает в ленту"""
+        url = reverse('posts:profile_feed', args=('auth', 'rss'))
+        # Last-Modified точен до секунды: прошлая запись — раньше.
+        FeedVersion.objects.update(changed=timezone.now() - timedelta(
+            seconds=2))
+        first = self.client.get(url)
+        etag = first['ETag']
+        post = Post.objects.create(text='Свежий пост', author=self.author)
+        modified_since = self.client.get(
+            url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+        self.assertEqual(modified_since.status_code, 200)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertIn(reverse('posts:post_detail', args=(post.pk,)),
+                      response.content.decode())
+
+    def test_version_shared_between_processes(self):
+        """Запись в одном процессе меняет ETag в другом"""
+        url = reverse('posts:index_feed', args=('rss',))
+        reader = LocMemCache('feeds-reader', {})
+        writer = LocMemCache('feeds-writer', {})
+        with mock.patch('posts.feeds.cache', reader):
+            etag = self.client.get(url)['ETag']
+        with mock.patch('posts.feeds.cache', writer):
+            Post.objects.create(text='Свежий пост', author=self.author)
+        with mock.patch('posts.feeds.cache', reader):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Свежий пост', response.content.decode())
+
+    def test_rollback_keeps_version(self):
+        """Откаченная запись не меняет ETag"""
+        url = reverse('posts:index_feed', args=('rss',))
+        etag = self.client.get(url)['ETag']
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                Post.objects.create(text='Откаченный', author=self.author)
+                raise RuntimeError
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_group_change_invalidates_old_group(self):
+        """Перенос поста в другую группу обновляет ленту старой"""
+        url = reverse('posts:group_feed', args=('group', 'rss'))
+        etag = self.client.get(url)['ETag']
+        post = Post.objects.get(pk=self.post.pk)
+        post.group = None
+        post.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(reverse('posts:post_detail', args=(post.pk,)),
+                         response.content.decode())
+
+    def test_unknown_format(self):
+        """Неизвестный формат отдаёт 404"""
+        response = self.client.get(reverse('posts:index_feed',
+                                           args=('json',)))
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,144 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from posts import follow, tasks
+from posts.cards import after_cursor, make_cursor
+from posts.models import Follow, InboxEntry, Post
+
+User = get_user_model()
+
+
+class FollowFeedTests(TestCase):
+    def setUp(self):
+        self.reader = User.objects.create_user(username='reader')
+        self.author = User.objects.create_user(username='author')
+        self.star = User.objects.create_user(username='star')
+        self.stranger = User.objects.create_user(username='stranger')
+        self.client.force_login(self.reader)
+
+    def publish(self, author, text):
+        post = Post.objects.create(text=text, author=author)
+        tasks.post_saved(post_id=post.pk, created=True)
+        return post
+
+    def feed_texts(self):
+        response = self.client.get(reverse('posts:follow_index'))
+        return [post.text for post in response.context['posts']]
+
+    def test_follow_and_unfollow_views(self):
+        """Подписка и отписка через профиль автора"""
+        url = reverse('posts:profile_follow', args=(self.author.username,))
+        self.assertRedirects(self.client.post(url), reverse(
+            'posts:profile', args=(self.author.username,)))
+        self.assertTrue(Follow.objects.filter(user=self.reader,
+                                              author=self.author).exists())
+        self.client.post(url)
+        self.assertEqual(Follow.objects.count(), 1)
+        self.client.post(reverse('posts:profile_unfollow',
+                                 args=(self.author.username,)))
+        self.assertFalse(Follow.objects.exists())
+
+    def test_follow_requires_post(self):
+        """GET не меняет подписку: ссылка с чужой страницы не сработает"""
+        for name in ('posts:profile_follow', 'posts:profile_unfollow'):
+            with self.subTest(name=name):
+                response = self.client.get(
+                    reverse(name, args=(self.author.username,)))
+                self.assertEqual(response.status_code, 405)
+        self.assertFalse(Follow.objects.exists())
+
+    def test_cannot_follow_self(self):
+        """На себя подписаться нельзя"""
+        self.client.post(reverse('posts:profile_follow',
+                                 args=(self.reader.username,)))
+        self.assertFalse(Follow.objects.exists())
+
+    @override_settings(FOLLOW_FANOUT_LIMIT=1)
+    def test_hybrid_feed(self):
+        """Лента объединяет входящие и посты популярных авторов"""
+        fan = User.objects.create_user(username='fan')
+        follow.follow(fan, self.star)
+        follow.follow(self.reader, self.star)
+        follow.follow(self.reader, self.author)
+        self.publish(self.author, 'Обычный автор')
+        self.publish(self.star, 'Популярный автор')
+        self.publish(self.stranger, 'Чужой пост')
+        self.assertEqual(
+            list(InboxEntry.objects.values_list('post__text', flat=True)),
+            ['Обычный автор'])
+        self.assertEqual(self.feed_texts(),
+                         ['Популярный автор', 'Обычный автор'])
+
+    def test_fresh_post_visible_before_fan_out(self):
+        """Пост виден в ленте до того, как задача его разошлёт"""
+        follow.follow(self.reader, self.author)
+        post = Post.objects.create(text='Свежий', author=self.author)
+        self.assertEqual(self.feed_texts(), ['Свежий'])
+        tasks.post_saved(post_id=post.pk, created=True)
+        self.assertEqual(self.feed_texts(), ['Свежий'])
+
+    def test_follow_backfills_and_unfollow_clears(self):
+        """Подписка переносит прошлые посты, отписка их убирает"""
+        self.publish(self.author, 'Старый пост')
+        follow.follow(self.reader, self.author)
+        self.assertEqual(self.feed_texts(), ['Старый пост'])
+        follow.unfollow(self.reader, self.author)
+        self.assertEqual(self.feed_texts(), [])
+        self.assertFalse(InboxEntry.objects.exists())
+
+    @override_settings(FOLLOW_FANOUT_LIMIT=0, CNT_POST=2)
+    def test_cursor_pages_cover_both_branches(self):
+        """Курсор проходит входящие и неразосланные посты по одному разу"""
+        follow.follow(self.reader, self.author)
+        follow.follow(self.reader, self.star)
+        posts = [self.publish(author, f'Пост {i}') for i, author in
+                 enumerate([self.author, self.star] * 3)]
+        InboxEntry.objects.bulk_create(
+            InboxEntry(user=self.reader, post=post, author=post.author,
+                       pub_date=post.pub_date)
+            for post in posts if post.author == self.author)
+        Post.objects.update(pub_date=posts[0].pub_date)
+        InboxEntry.objects.update(pub_date=posts[0].pub_date)
+        texts, url = [], reverse('posts:follow_index')
+        while url:
+            response = self.client.get(url)
+            texts.extend(post.text for post in response.context['posts'])
+            next_page = response.context['next_page']
+            url = next_page and reverse('posts:follow_index') + next_page
+        self.assertEqual(texts, [f'Пост {i}' for i in range(5, -1, -1)])
+
+    def test_unfanned_branch_skips_fanned_posts(self):
+        """Ветка неразосланных постов идёт по частичному индексу"""
+        follow.follow(self.reader, self.author)
+        for i in range(30):
+            self.publish(self.author, f'Пост {i}')
+        cursor = make_cursor(timezone.now(), 1)
+        for queryset in (follow.unfanned(self.reader),
+                         after_cursor(follow.unfanned(self.reader), cursor)):
+            with self.subTest(query=str(queryset.query)):
+                plan = queryset.values_list('id', 'pub_date')[:10].explain()
+                self.assertIn('posts_post_not_fanned_idx', plan)
+                self.assertNotIn('posts_post_author_date_idx', plan)
+        with self.assertNumQueries(2):
+            self.assertEqual(len(follow.feed(self.reader, limit=10)), 10)
+
+    def test_out_of_range_cursor_starts_feed(self):
+        """Курсор с числами вне диапазона отдаёт начало ленты, а не 500"""
+        follow.follow(self.reader, self.author)
+        self.publish(self.author, 'Пост')
+        for cursor in ('999999999999999999-1', '1-99999999999999999999999'):
+            with self.subTest(cursor=cursor):
+                response = self.client.get(reverse('posts:follow_index'),
+                                           {'cursor': cursor})
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(
+                    [post.text for post in response.context['posts']],
+                    ['Пост'])
+
+    def test_feed_requires_login(self):
+        """Лента подписок только для вошедших"""
+        self.client.logout()
+        response = self.client.get(reverse('posts:follow_index'))
+        self.assertEqual(response.status_code, 302)
@@ -0,0 +1,94 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class FeedFragmentTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(title='Тестовая группа',
+                                         slug='test-slug',
+                                         description='Описание')
+        for i in range(settings.CNT_POST * 2 + 3):
+            Post.objects.create(text=f'Пост номер {i}', author=cls.author,
+                                group=cls.group)
+
+    def setUp(self):
+        cache.clear()
+
+    def walk(self, url):
+        """Проходит фрагменты по заголовкам Link, возвращает тексты."""
+        texts = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            texts.extend(post.text for post in response.context['posts'])
+            link = response.get('Link')
+            url = link[1:link.index('>')] if link else None
+        return texts
+
+    def test_fragments_cover_feed_once(self):
+        """Фрагменты по Link отдают все посты ленты по одному разу"""
+        expected = list(Post.objects.order_by('-pub_date', '-id')
+                        .values_list('text', flat=True))
+        urls = (
+            reverse('posts:index_fragment'),
+            reverse('posts:group_fragment', args=(self.group.slug,)),
+            reverse('posts:profile_fragment', args=(self.author.username,)),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(self.walk(url), expected)
+
+    def test_fragment_has_no_layout(self):
+        """Фрагмент содержит только карточки, без base.html"""
+        response = self.client.get(reverse('posts:index_fragment'))
+        self.assertTemplateUsed(response, 'posts/includes/post_list.html')
+        self.assertTemplateNotUsed(response, 'base.html')
+        self.assertEqual(response.content.count(b'<article>'),
+                         settings.CNT_POST)
+
+    def test_page_links_to_following_fragment(self):
+        """Страница ленты указывает фрагмент, продолжающий её"""
+        response = self.client.get(reverse('posts:index'), {'page': 2})
+        page_texts = [post.text for post in response.context['page_obj']]
+        following = self.walk(response.context['next_fragment'])
+        expected = list(Post.objects.order_by('-pub_date', '-id')
+                        .values_list('text', flat=True))
+        self.assertEqual(page_texts + following,
+                         expected[settings.CNT_POST:])
+
+    def test_equal_dates_not_repeated_or_skipped(self):
+        """Посты с одной датой не повторяются и не теряются на стыке"""
+        Post.objects.update(pub_date=Post.objects.first().pub_date)
+        expected = list(Post.objects.order_by('-pub_date', '-id')
+                        .values_list('text', flat=True))
+        response = self.client.get(reverse('posts:index'))
+        page_texts = [post.text for post in response.context['page_obj']]
+        following = self.walk(response.context['next_fragment'])
+        self.assertEqual(page_texts + following, expected)
+
+    def test_out_of_range_cursor_starts_feed(self):
+        """Курсор с числами вне диапазона отдаёт начало ленты, а не 500"""
+        first = self.client.get(reverse('posts:index_fragment'))
+        for cursor in ('999999999999999999-1', '1-99999999999999999999999'):
+            with self.subTest(cursor=cursor):
+                response = self.client.get(reverse('posts:index_fragment'),
+                                           {'cursor': cursor})
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(list(response.context['posts']),
+                                 list(first.context['posts']))
+
+    def test_unknown_group_not_found(self):
+        """Фрагмент несуществующей группы отдаёт 404"""
+        response = self.client.get(
+            reverse('posts:group_fragment', args=('missing',)))
+        self.assertEqual(response.status_code, 404)
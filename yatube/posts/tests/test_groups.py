@@ -0,0 +1,94 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import (Client, TestCase, TransactionTestCase,
+                         override_settings)
+from django.urls import reverse
+
+from posts.models import Post, Group
+from posts.signals import posts_reassigned
+
+User = get_user_model()
+
+
+class GroupOperationsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_superuser(username='admin',
+                                                   email='admin@mail.ru',
+                                                   password='admin-pass')
+
+    def setUp(self):
+        self.source = Group.objects.create(title='Источник', slug='source')
+        self.target = Group.objects.create(title='Цель', slug='target')
+        Post.objects.bulk_create([
+            Post(text=f'Пост {i}', author=self.author, group=self.source)
+            for i in range(5)
+        ])
+        self.chunks = []
+        posts_reassigned.connect(self.on_reassigned)
+
+    def tearDown(self):
+        posts_reassigned.disconnect(self.on_reassigned)
+
+    def on_reassigned(self, sender, post_ids, **kwargs):
+        self.chunks.append(len(post_ids))
+
+    def test_merge_groups_command(self):
+        """merge_groups переносит посты пачками и удаляет исходную группу"""
+        out = StringIO()
+        call_command('merge_groups', 'source', into='target', chunk_size=2,
+                     stdout=out)
+        self.assertEqual(self.target.posts.count(), 5)
+        self.assertFalse(Group.objects.filter(slug='source').exists())
+        self.assertEqual(self.chunks, [2, 2, 1])
+        self.assertIn('Перенесено постов: 5', out.getvalue())
+
+    def test_delete_group_command(self):
+        """delete_group отвязывает посты и удаляет группу"""
+        call_command('delete_group', 'source', chunk_size=3,
+                     stdout=StringIO())
+        self.assertEqual(Post.objects.filter(group=None).count(), 5)
+        self.assertFalse(Group.objects.filter(slug='source').exists())
+        self.assertEqual(self.chunks, [3, 2])
+
+    def test_admin_merge_action(self):
+        """Действие админки объединяет выбранные группы с целевой"""
+        client = Client()
+        client.force_login(self.author)
+        client.post(reverse('admin:posts_group_changelist'), {
+            'action': 'merge_selected',
+            'target': 'target',
+            '_selected_action': [self.source.pk],
+        })
+        self.assertEqual(self.target.posts.count(), 5)
+        self.assertFalse(Group.objects.filter(slug='source').exists())
+
+
+class AdminDeleteTests(TransactionTestCase):
+    @override_settings(GROUP_CHUNK_SIZE=2)
+    def test_admin_delete_commits_each_chunk(self):
+        """Удаление группы в админке фиксирует каждую пачку постов"""
+        admin = User.objects.create_superuser(username='admin',
+                                              email='admin@mail.ru',
+                                              password='admin-pass')
+        group = Group.objects.create(title='Группа', slug='group')
+        for i in range(5):
+            Post.objects.create(text=f'Пост {i}', author=admin, group=group)
+        in_transaction = []
+
+        def on_reassigned(sender, **kwargs):
+            in_transaction.append(connection.in_atomic_block)
+
+        posts_reassigned.connect(on_reassigned)
+        self.addCleanup(posts_reassigned.disconnect, on_reassigned)
+        client = Client()
+        client.force_login(admin)
+        client.post(reverse('admin:posts_group_delete', args=(group.pk,)),
+                    {'post': 'yes'})
+        self.assertFalse(Group.objects.filter(pk=group.pk).exists())
+        self.assertEqual(Post.objects.filter(group=None).count(), 5)
+        self.assertEqual(in_transaction, [False, False, False])
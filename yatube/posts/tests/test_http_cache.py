@@ -0,0 +1,148 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from core.tasks import run_pending
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class StandInProxy:
+    """Локальный HTTP-сервер на месте прокси, записывает сбросы ключей."""
+
+    def __init__(self):
+        purged = self.purged = []
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_PURGE(self):
+                purged.append(set(self.headers['Surrogate-Key'].split()))
+                self.send_response(200)
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_port}/'
+        self.thread = threading.Thread(target=self.server.serve_forever,
+                                       daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class CacheHeadersTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(title='Тестовая группа',
+                                         slug='test-slug',
+                                         description='Описание')
+        cls.post = Post.objects.create(text='Тестовый пост',
+                                       author=cls.author, group=cls.group)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_anonymous_pages_public_with_keys(self):
+        """Анонимные страницы кэшируемы и перечисляют свои ключи"""
+        post_keys = {f'post-{self.post.pk}', f'author-{self.author.pk}',
+                     f'group-{self.group.pk}'}
+        urls = (
+            (reverse('posts:index'), {'index'}),
+            (reverse('posts:group_list', args=(self.group.slug,)), set()),
+            (reverse('posts:profile', args=(self.author.username,)), set()),
+            (reverse('posts:post_detail', args=(self.post.pk,)), set()),
+        )
+        for url, extra in urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertIn('public', response['Cache-Control'])
+                self.assertIn('s-maxage', response['Cache-Control'])
+                self.assertIn('Cookie', response['Vary'])
+                self.assertEqual(set(response['Surrogate-Key'].split()),
+                                 post_keys | extra)
+
+    def test_not_modified_keeps_policy(self):
+        """304 на условный запрос несёт ту же политику и ключи, что 200"""
+        url = reverse('posts:index_feed', args=('rss',))
+        response = self.client.get(url)
+        cached = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(cached.status_code, 304)
+        self.assertIn('public', response['Cache-Control'])
+        self.assertEqual(cached['Cache-Control'], response['Cache-Control'])
+        self.assertEqual(cached['Surrogate-Key'], response['Surrogate-Key'])
+
+    def test_authenticated_pages_private(self):
+        """Страницы для вошедшего пользователя не кэшируются прокси"""
+        self.client.force_login(self.author)
+        response = self.client.get(reverse('posts:index'))
+        self.assertIn('private', response['Cache-Control'])
+        self.assertNotIn('Surrogate-Key', response)
+
+    def test_other_views_untouched(self):
+        """Представления без политики не становятся публичными"""
+        response = self.client.get(reverse('users:login'))
+        self.assertNotIn('public', response.get('Cache-Control', ''))
+        self.assertNotIn('Surrogate-Key', response)
+
+
+class PurgeTests(TransactionTestCase):
+    def setUp(self):
+        self.proxy = StandInProxy()
+        self.author = User.objects.create_user(username='auth')
+        self.group = Group.objects.create(title='Тестовая группа',
+                                          slug='test-slug')
+
+    def tearDown(self):
+        self.proxy.stop()
+
+    def purge_with(self, action):
+        with override_settings(SURROGATE_PURGE_URLS=[self.proxy.url]):
+            action()
+            while run_pending():
+                pass
+        return self.proxy.purged
+
+    def test_post_write_purges_its_pages(self):
+        """Создание поста сбрасывает пост, автора, группу и ленту"""
+        post = None
+
+        def create():
+            nonlocal post
+            post = Post.objects.create(text='Пост', author=self.author,
+                                       group=self.group)
+
+        purged = self.purge_with(create)
+        self.assertEqual(purged, [{f'post-{post.pk}',
+                                   f'author-{self.author.pk}',
+                                   f'group-{self.group.pk}', 'index'}])
+
+    def test_batch_delete_sends_one_purge(self):
+        """Удаление пачки постов даёт один сброс на транзакцию"""
+        for i in range(5):
+            Post.objects.create(text=f'Пост {i}', author=self.author)
+        purged = self.purge_with(
+            lambda: Post.objects.filter(author=self.author).delete())
+        self.assertEqual(len(purged), 1)
+        self.assertEqual(len(purged[0]), 7)
+
+    def test_group_write_purges_group(self):
+        """Изменение группы сбрасывает её ключ"""
+        self.group.title = 'Новое название'
+        purged = self.purge_with(self.group.save)
+        self.assertEqual(purged, [{f'group-{self.group.pk}'}])
+
+    def test_login_does_not_purge(self):
+        """Вход пользователя не сбрасывает страницы автора"""
+        purged = self.purge_with(
+            lambda: self.author.save(update_fields=('last_login',)))
+        self.assertEqual(purged, [])
@@ -0,0 +1,155 @@
+import shutil
+import tempfile
+from io import BytesIO
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from posts import tasks, thumbnails
+from posts.models import Post
+
+User = get_user_model()
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+def make_image(name='photo.jpg', size=(1600, 1200)):
+    content = BytesIO()
+    Image.new('RGB', size, 'navy').save(content, 'JPEG')
+    return SimpleUploadedFile(name, content.getvalue(),
+                              content_type='image/jpeg')
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class PostImageTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='auth')
+        self.client.force_login(self.author)
+
+    def create_post(self):
+        self.client.post(reverse('posts:post_create'),
+                         {'text': 'С картинкой', 'image': make_image()})
+        return Post.objects.get(text='С картинкой')
+
+    def test_upload_saves_image(self):
+        """Картинка из формы сохраняется в посте"""
+        post = self.create_post()
+        self.assertTrue(post.image.name.startswith('posts/photo'))
+        self.assertTrue(default_storage.exists(post.image.name))
+
+    def test_thumbnails_generated_by_task(self):
+        """Задача post_saved строит миниатюры нужных размеров"""
+        post = self.create_post()
+        tasks.post_saved(post_id=post.pk, created=True)
+        for size, (width, height) in settings.POST_THUMBNAIL_SIZES.items():
+            with self.subTest(size=size):
+                name = thumbnails.thumbnail_name(post.image.name, size)
+                with default_storage.open(name) as thumb_file:
+                    thumb = Image.open(thumb_file)
+                    self.assertEqual(thumb.width, width)
+                    if height:
+                        self.assertEqual(thumb.height, height)
+        self.assertEqual(thumbnails.generate(post.image.name), [])
+
+    def test_feed_never_resizes(self):
+        """Лента отдаёт оригинал до готовности миниатюры и не ресайзит"""
+        post = self.create_post()
+        content = self.client.get(reverse('posts:index')).content.decode()
+        self.assertIn(post.image.url, content)
+        self.assertIn('loading="lazy"', content)
+        self.assertFalse(default_storage.exists(
+            thumbnails.thumbnail_name(post.image.name, 'card')))
+        tasks.post_saved(post_id=post.pk, created=True)
+        content = self.client.get(reverse('posts:index')).content.decode()
+        self.assertIn(default_storage.url(
+            thumbnails.thumbnail_name(post.image.name, 'card')), content)
+
+    def test_feed_does_not_touch_storage(self):
+        """Лента берёт готовность миниатюр из поста, а не из хранилища"""
+        post = self.create_post()
+        tasks.post_saved(post_id=post.pk, created=True)
+        with mock.patch.object(default_storage, 'exists') as exists:
+            self.client.get(reverse('posts:index'))
+        exists.assert_not_called()
+
+    def test_new_image_resets_thumbnails(self):
+        """Новая картинка снова отдаётся оригиналом до новых миниатюр"""
+        post = self.create_post()
+        tasks.post_saved(post_id=post.pk, created=True)
+        post.refresh_from_db()
+        self.assertTrue(post.thumbnails_ready)
+        self.client.post(reverse('posts:post_edit', args=(post.pk,)),
+                         {'text': 'С картинкой',
+                          'image': make_image('other.jpg')})
+        post.refresh_from_db()
+        self.assertTrue(post.image.name.startswith('posts/other'))
+        self.assertFalse(post.thumbnails_ready)
+
+    def test_same_stem_thumbnails_distinct(self):
+        """У cat.png и cat.jpg свои миниатюры, удаляются они порознь"""
+        names = []
+        for name in ('cat.png', 'cat.jpg'):
+            post = Post.objects.create(text=name, author=self.author,
+                                       image=make_image(name))
+            self.assertEqual(len(thumbnails.generate(post.image.name)),
+                             len(settings.POST_THUMBNAIL_SIZES))
+            names.append(post.image.name)
+        thumbnails.delete(names[0])
+        for size in settings.POST_THUMBNAIL_SIZES:
+            with self.subTest(size=size):
+                self.assertFalse(default_storage.exists(
+                    thumbnails.thumbnail_name(names[0], size)))
+                self.assertTrue(default_storage.exists(
+                    thumbnails.thumbnail_name(names[1], size)))
+
+    @override_settings(POST_IMAGE_MAX_SIZE=100)
+    def test_large_image_rejected(self):
+        """Картинка больше лимита не проходит валидацию формы"""
+        response = self.client.post(reverse('posts:post_create'),
+                                    {'text': 'Большая', 'image': make_image()})
+        self.assertTrue(response.context['form'].errors['image'])
+        self.assertFalse(Post.objects.filter(text='Большая').exists())
+
+    def test_not_an_image_rejected(self):
+        """Файл, который не является картинкой, отклоняется"""
+        response = self.client.post(reverse('posts:post_create'), {
+            'text': 'Не картинка',
+            'image': SimpleUploadedFile('file.jpg', b'not an image',
+                                        content_type='image/jpeg'),
+        })
+        self.assertTrue(response.context['form'].errors['image'])
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ReplacedImageTests(TransactionTestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def test_replaced_image_files_deleted(self):
+        """Прежний оригинал и его миниатюры удаляются после замены"""
+        author = User.objects.create_user(username='auth')
+        post = Post.objects.create(text='С картинкой', author=author,
+                                   image=make_image())
+        tasks.post_saved(post_id=post.pk, created=True)
+        old = post.image.name
+        post.image = make_image('other.jpg')
+        post.save()
+        self.assertFalse(default_storage.exists(old))
+        for size in settings.POST_THUMBNAIL_SIZES:
+            self.assertFalse(default_storage.exists(
+                thumbnails.thumbnail_name(old, size)))
+        self.assertTrue(default_storage.exists(post.image.name))
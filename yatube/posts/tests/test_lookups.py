@@ -0,0 +1,155 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from posts import lookups
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class LookupCacheTests(TestCase):
+    def setUp(self):
+        lookups.groups.clear()
+        lookups.authors.clear()
+        self.group = Group.objects.create(title='Тестовая группа',
+                                          slug='test-slug',
+                                          description='Описание')
+        self.author = User.objects.create_user(username='auth')
+        Post.objects.create(text='Тестовый пост', author=self.author,
+                            group=self.group)
+
+    def test_repeated_lookup_skips_database(self):
+        """Повторная страница группы и профиля не ищет объект в базе"""
+        urls = {
+            reverse('posts:group_list', args=(self.group.slug,)): 2,
+            reverse('posts:profile', args=(self.author.username,)): 3,
+        }
+        for url, queries in urls.items():
+            with self.subTest(url=url):
+                self.client.get(url)
+                with self.assertNumQueries(queries):
+                    self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_unknown_username_cached(self):
+        """Несуществующий username после первого 404 не идёт в базу"""
+        url = reverse('posts:profile', args=('junk',))
+        self.assertEqual(self.client.get(url).status_code, 404)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_create_drops_negative_entry(self):
+        """Созданная группа доступна сразу после кэшированного 404"""
+        url = reverse('posts:group_list', args=('new-slug',))
+        self.assertEqual(self.client.get(url).status_code, 404)
+        Group.objects.create(title='Новая', slug='new-slug')
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_rename_and_delete_invalidate(self):
+        """Смена slug и удаление группы сбрасывают кэш"""
+        lookups.get_group_or_404('test-slug')
+        self.group.slug = 'renamed'
+        self.group.save()
+        self.assertIsNone(lookups.groups.get('test-slug'))
+        self.assertEqual(lookups.groups.get('renamed'), self.group)
+        self.group.delete()
+        self.assertIsNone(lookups.groups.get('renamed'))
+
+    @override_settings(LOOKUP_CACHE_SIZE=2)
+    def test_size_is_bounded(self):
+        """Кэш вытесняет давно не читанные записи сверх лимита"""
+        for username in ('a', 'b', 'c'):
+            User.objects.create_user(username=username)
+            lookups.authors.get(username)
+        self.assertEqual(list(lookups.authors.entries), ['b', 'c'])
+
+    @override_settings(LOOKUP_CACHE_NEGATIVE_SIZE=2)
+    def test_missing_keys_do_not_evict_hits(self):
+        """Обход несуществующих адресов не вытесняет настоящие записи"""
+        lookups.authors.get('auth')
+        for username in ('a', 'b', 'c'):
+            lookups.authors.get(username)
+        self.assertEqual(list(lookups.authors.entries), ['auth'])
+        self.assertEqual(list(lookups.authors.missing), ['b', 'c'])
+
+    def test_load_overlapping_invalidate_not_cached(self):
+        """Чтение, начатое до сброса, не кладёт устаревший объект"""
+        stale = User.objects.get(username='auth')
+        generation = lookups.authors.generation
+        lookups.authors.invalidate(stale)
+        lookups.authors.put('auth', stale, 0, generation)
+        self.assertNotIn('auth', lookups.authors.entries)
+
+    @override_settings(LOOKUP_CACHE_TTL=0)
+    def test_expired_entry_reloaded(self):
+        """Запись старше TTL читается из базы заново"""
+        lookups.authors.get('auth')
+        with self.assertNumQueries(1):
+            lookups.authors.get('auth')
+
+
+class PostDetailCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='auth')
+        self.post = Post.objects.create(text='Тестовый пост',
+                                        author=self.author)
+        self.url = reverse('posts:post_detail', args=(self.post.pk,))
+
+    def test_detail_served_from_cache(self):
+        """Повторный post_detail не выбирает пост из базы"""
+        self.client.get(self.url)
+        # Версия поста в кэше, свежее число просмотров и число постов
+        # автора.
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url)
+        self.assertEqual(response.context['post'], self.post)
+
+    def test_edit_invalidates(self):
+        """После post_edit страница показывает новый текст"""
+        self.client.get(self.url)
+        self.client.force_login(self.author)
+        self.client.post(reverse('posts:post_edit', args=(self.post.pk,)),
+                         {'text': 'Новый текст'})
+        self.assertEqual(self.client.get(self.url).context['post'].text,
+                         'Новый текст')
+
+    def test_deleted_post_not_found(self):
+        """Удалённый пост сразу отдаёт 404"""
+        self.client.get(self.url)
+        self.post.delete()
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+
+class RenameTests(TransactionTestCase):
+    def test_author_rename_invalidates(self):
+        """Переименование автора видно на закэшированном посте"""
+        cache.clear()
+        author = User.objects.create_user(username='auth')
+        post = Post.objects.create(text='Тестовый пост', author=author)
+        url = reverse('posts:post_detail', args=(post.pk,))
+        self.client.get(url)
+        author.username = 'renamed'
+        author.save()
+        post = self.client.get(url).context['post']
+        self.assertEqual(post.author.username, 'renamed')
+
+    def test_group_rename_invalidates(self):
+        """Новое название и slug группы видны на закэшированном посте"""
+        cache.clear()
+        author = User.objects.create_user(username='auth')
+        group = Group.objects.create(title='Группа', slug='group')
+        post = Post.objects.create(text='Тестовый пост', author=author,
+                                   group=group)
+        url = reverse('posts:post_detail', args=(post.pk,))
+        self.client.get(url)
+        group.title, group.slug = 'Переименована', 'renamed'
+        group.save()
+        response = self.client.get(url)
+        self.assertEqual(response.context['post'].group.title,
+                         'Переименована')
+        self.assertContains(response, reverse('posts:group_list',
+                                              args=('renamed',)))
+        group.delete()
+        self.assertIsNone(self.client.get(url).context['post'].group)
@@ -0,0 +1,136 @@
+import gzip
+import os
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts import sitemaps
+from posts.models import Group, Post, SitemapShard
+
+User = get_user_model()
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+# TransactionTestCase не сбрасывает id: посты теста должны попасть в
+# один файл раздела.
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, SITEMAP_SHARD_SIZE=1000,
+                   SITE_URL='https://yatube.test')
+class SitemapTests(TransactionTestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.author = User.objects.create_user(username='auth')
+        User.objects.create_user(username='reader')
+        self.group = Group.objects.create(title='Группа', slug='group',
+                                          description='Описание')
+        self.posts = [Post.objects.create(text=f'Пост {i}',
+                                          author=self.author,
+                                          group=self.group)
+                      for i in range(3)]
+
+    def tearDown(self):
+        shutil.rmtree(sitemaps.file_path(''), ignore_errors=True)
+
+    def read_shard(self, section, key):
+        name = sitemaps.shard_name(section,
+                                   key // settings.SITEMAP_SHARD_SIZE)
+        with gzip.open(sitemaps.file_path(name), 'rt') as shard:
+            return shard.read()
+
+    def test_shards_written(self):
+        """Файлы разделов содержат абсолютные адреса постов, групп и
+        профилей с постами"""
+        sitemaps.generate()
+        posts = self.read_shard('posts', self.posts[0].pk)
+        for post in self.posts:
+            self.assertIn('<loc>https://yatube.test'
+                          + reverse('posts:post_detail', args=(post.pk,)),
+                          posts)
+        self.assertIn('/group/group/', self.read_shard('groups',
+                                                       self.group.pk))
+        profiles = self.read_shard('profiles', self.author.pk)
+        self.assertIn('/profile/auth/', profiles)
+        self.assertNotIn('/profile/reader/', profiles)
+        with open(sitemaps.file_path('sitemap.xml')) as index:
+            self.assertEqual(index.read().count('<sitemap>'), 3)
+
+    def test_only_changed_shards(self):
+        """Пересобираются только файлы, которых коснулось изменение"""
+        sitemaps.generate()
+        self.assertEqual(sitemaps.generate(), [])
+        group = Group.objects.create(title='Вторая', slug='second',
+                                     description='Описание')
+        rebuilt = sitemaps.generate()
+        self.assertEqual(
+            [(shard.section, shard.number) for shard in rebuilt],
+            [('groups', group.pk // settings.SITEMAP_SHARD_SIZE)])
+        self.assertIn('/group/second/', self.read_shard('groups', group.pk))
+
+    def test_empty_shard_removed(self):
+        """Опустевший файл удаляется и пропадает из индекса"""
+        sitemaps.generate()
+        name = sitemaps.shard_name(
+            'posts', self.posts[0].pk // settings.SITEMAP_SHARD_SIZE)
+        Post.objects.all().delete()
+        sitemaps.generate()
+        self.assertFalse(os.path.exists(sitemaps.file_path(name)))
+        with open(sitemaps.file_path('sitemap.xml')) as index:
+            self.assertNotIn(name, index.read())
+
+    def test_marks_batched(self):
+        """Удаление постов в транзакции помечает каждый файл один раз"""
+        sitemaps.generate()
+        with CaptureQueriesContext(connection) as queries:
+            with transaction.atomic():
+                for post in self.posts:
+                    post.delete()
+        updates = [query for query in queries.captured_queries
+                   if query['sql'].startswith('UPDATE "posts_sitemapshard"')]
+        self.assertEqual(len(updates), 3)
+        self.assertEqual(SitemapShard.objects.filter(dirty=True).count(), 3)
+
+    def test_failed_write_stays_dirty(self):
+        """Упавшая сборка оставляет файл грязным и не мусорит"""
+        sitemaps.generate()
+        self.posts[0].save()
+
+        def broken(start, end):
+            yield '/posts/1/', None
+            raise OSError('Диск заполнен')
+
+        with mock.patch.dict(sitemaps.SECTIONS,
+                             {'posts': (Post, broken)}):
+            with self.assertRaises(OSError):
+                sitemaps.generate()
+        shard = SitemapShard.objects.get(section='posts')
+        self.assertTrue(shard.dirty)
+        self.assertFalse([name for name in os.listdir(sitemaps.file_path(''))
+                          if name.endswith('.tmp')])
+        self.assertIn(shard, sitemaps.generate())
+
+    def test_served(self):
+        """Индекс и файлы отдаются из корня сайта"""
+        call_command('generate_sitemaps', '--all', stdout=StringIO())
+        response = self.client.get('/sitemap.xml')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/xml')
+        self.assertIn('max-age=3600', response['Cache-Control'])
+        name = sitemaps.shard_name(
+            'posts', self.posts[0].pk // settings.SITEMAP_SHARD_SIZE)
+        response = self.client.get(reverse('posts:sitemap', args=(name,)))
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        body = gzip.decompress(b''.join(response.streaming_content))
+        self.assertIn(b'<urlset', body)
+        self.assertEqual(self.client.get('/sitemap-x.xml').status_code, 404)
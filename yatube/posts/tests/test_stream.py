@@ -0,0 +1,93 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from posts import stream
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class PostStreamTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(title='Тестовая группа',
+                                         slug='test-slug',
+                                         description='Описание')
+
+    def open(self, url, **extra):
+        response = self.client.get(url, **extra)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.addCleanup(response.close)
+        content = iter(response.streaming_content)
+        self.assertTrue(next(content).startswith(b'retry:'))
+        return content
+
+    def create_post(self, text, group=None):
+        post = Post.objects.create(text=text, author=self.author,
+                                   group=group)
+        stream.publish_post(post.pk, stream.post_topics(post))
+        return post
+
+    def test_new_post_reaches_matching_streams(self):
+        """Новый пост приходит в ленту, группу и профиль автора"""
+        urls = (
+            reverse('posts:index_stream'),
+            reverse('posts:group_stream', args=(self.group.slug,)),
+            reverse('posts:profile_stream', args=(self.author.username,)),
+        )
+        streams = [self.open(url) for url in urls]
+        post = self.create_post('Новый пост', self.group)
+        for content in streams:
+            event = next(content).decode()
+            self.assertIn(f'id: {post.pk}\n', event)
+            self.assertIn('Новый пост', event)
+
+    def test_stream_releases_db_connection(self):
+        """Начав отдавать тело, поток закрывает соединение с базой"""
+        response = self.client.get(reverse('posts:index_stream'))
+        self.addCleanup(response.close)
+        connection = mock.Mock(in_atomic_block=False)
+        with mock.patch.object(stream.connections, 'all',
+                               return_value=[connection]):
+            next(iter(response.streaming_content))
+        connection.close.assert_called_once_with()
+
+    @override_settings(SSE_HEARTBEAT=0.01)
+    def test_heartbeat_and_other_group(self):
+        """Пост другой группы не приходит, вместо него heartbeat"""
+        content = self.open(reverse('posts:group_stream',
+                                    args=(self.group.slug,)))
+        self.create_post('Без группы')
+        self.assertEqual(next(content), b': ping\n\n')
+
+    def test_last_event_id_backlog(self):
+        """Переподключение с Last-Event-ID дочитывает пропущенные посты"""
+        first = self.create_post('Первый')
+        self.create_post('Второй')
+        self.create_post('Третий')
+        content = self.open(reverse('posts:index_stream'),
+                            HTTP_LAST_EVENT_ID=str(first.pk))
+        self.assertIn('Второй', next(content).decode())
+        self.assertIn('Третий', next(content).decode())
+
+    @override_settings(SSE_BUFFER=1)
+    def test_lagging_client_reset(self):
+        """Отставший клиент получает reset и поток закрывается"""
+        content = self.open(reverse('posts:index_stream'))
+        for i in range(3):
+            self.create_post(f'Пост {i}')
+        next(content)
+        self.assertTrue(next(content).startswith(b'event: reset'))
+        self.assertEqual(list(content), [])
+        self.assertFalse(stream.hub.has_subscribers(('index',)))
+
+    @override_settings(SSE_MAX_SUBSCRIBERS=0)
+    def test_subscriber_limit(self):
+        """Сверх лимита подписчиков поток отвечает 503"""
+        response = self.client.get(reverse('posts:index_stream'))
+        self.assertEqual(response.status_code, 503)
@@ -0,0 +1,115 @@
+import math
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from posts import counters, trending
+from posts.groups import merge_groups
+from posts.models import Group, Post, TrendingEntry
+
+User = get_user_model()
+HOUR = 3600
+
+
+@override_settings(TRENDING_HALF_LIFE=HOUR, COUNTER_FLUSH_INTERVAL=3600)
+class TrendingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        counters.views.clear()
+        self.author = User.objects.create_user(username='auth')
+        self.group = Group.objects.create(title='Группа', slug='group',
+                                          description='Описание')
+        self.posts = [Post.objects.create(text=f'Пост {i}',
+                                          author=self.author)
+                      for i in range(3)]
+        self.in_group = Post.objects.create(text='В группе',
+                                            author=self.author,
+                                            group=self.group)
+
+    def test_increments_sum(self):
+        """Повторные события складываются, как одно с суммарным весом"""
+        post = self.posts[0]
+        trending.record({post.pk: 2}, 1.0, now=0)
+        trending.record({post.pk: 3}, 1.0, now=0)
+        score = TrendingEntry.objects.get(scope='index', post=post).score
+        self.assertAlmostEqual(score, math.log(5))
+
+    def test_old_views_decay(self):
+        """Через два периода полураспада 10 просмотров уступают 3 свежим"""
+        old, new = self.posts[:2]
+        trending.record({old.pk: 10}, 1.0, now=0)
+        trending.record({new.pk: 3}, 1.0, now=2 * HOUR)
+        self.assertEqual(trending.top('index', 2), [new.pk, old.pk])
+        trending.record({old.pk: 2}, 1.0, now=2 * HOUR)
+        self.assertEqual(trending.top('index', 2), [old.pk, new.pk])
+
+    def test_group_scope(self):
+        """Пост группы попадает и в общий топ, и в топ группы"""
+        trending.record({self.in_group.pk: 1, self.posts[0].pk: 1}, 1.0)
+        self.assertEqual(trending.top(f'group-{self.group.pk}', 10),
+                         [self.in_group.pk])
+        self.assertEqual(len(trending.top('index', 10)), 2)
+
+    @override_settings(TRENDING_KEEP=2)
+    def test_trimmed_to_keep(self):
+        """В топе остаются только TRENDING_KEEP лучших постов"""
+        trending.record({post.pk: i + 1 for i, post in
+                         enumerate(self.posts)}, 1.0, now=0)
+        self.assertEqual(trending.top('index', 10),
+                         [self.posts[2].pk, self.posts[1].pk])
+
+    def test_flushed_views_rank(self):
+        """Сброшенные просмотры поднимают пост в популярном"""
+        post = self.posts[1]
+        for _ in range(3):
+            self.client.post(reverse('posts:post_view', args=(post.pk,)))
+        counters.views.flush()
+        trending.record({self.posts[0].pk: 1}, 1.0)
+        response = self.client.get(reverse('posts:trending'))
+        self.assertEqual([card.pk for card in response.context['posts']],
+                         [post.pk, self.posts[0].pk])
+
+    def test_group_page(self):
+        """Страница группы показывает только посты группы"""
+        trending.record({self.in_group.pk: 1, self.posts[0].pk: 5}, 1.0)
+        url = reverse('posts:group_trending', args=(self.group.slug,))
+        with self.assertNumQueries(3):
+            response = self.client.get(url)
+        self.assertEqual(response.context['group'], self.group)
+        self.assertEqual([card.pk for card in response.context['posts']],
+                         [self.in_group.pk])
+
+    def test_group_change_moves_entry(self):
+        """Пост, сменивший группу, переезжает в топ новой группы"""
+        other = Group.objects.create(title='Другая', slug='other',
+                                     description='Описание')
+        trending.record({self.in_group.pk: 1}, 1.0)
+        self.in_group.group = other
+        self.in_group.save()
+        self.assertEqual(trending.top(f'group-{self.group.pk}', 10), [])
+        self.assertEqual(trending.top(f'group-{other.pk}', 10),
+                         [self.in_group.pk])
+        self.in_group.group = None
+        self.in_group.save()
+        self.assertEqual(trending.top(f'group-{other.pk}', 10), [])
+        self.assertEqual(trending.top('index', 10), [self.in_group.pk])
+
+    def test_reassigned_posts_move(self):
+        """Посты перенесённой группы уходят в топ целевой"""
+        target = Group.objects.create(title='Цель', slug='target',
+                                      description='Описание')
+        trending.record({self.in_group.pk: 1}, 1.0)
+        merge_groups(self.group, target)
+        self.assertEqual(trending.top(f'group-{target.pk}', 10),
+                         [self.in_group.pk])
+        self.assertFalse(TrendingEntry.objects.filter(
+            scope=f'group-{self.group.pk}').exists())
+
+    def test_deleted_post_leaves_top(self):
+        """Удалённый пост пропадает из топа"""
+        post = self.posts[0]
+        trending.record({post.pk: 1}, 1.0)
+        post.delete()
+        self.assertEqual(trending.top('index', 10), [])
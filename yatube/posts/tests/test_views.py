@@ -235,3 +235,53 @@ class PaginatorViewsTest(TestCase):
             response = self.client.get(url)
             self.assertEqual(len(response.context['page_obj']),
                              (settings.PGN_RANGE) - (settings.PGN_1_PAGE))
+
+
+class GroupLookupViewTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='test_name')
+        for i in range(settings.GROUP_LOOKUP_LIMIT + 5):
+            Group.objects.create(title=f'Коты {i:02}', slug=f'cats-{i}')
+        cls.dogs = Group.objects.create(title='Собаки', slug='dogs')
+
+    def setUp(self):
+        self.authorized_author = Client()
+        self.authorized_author.force_login(self.author)
+
+    def test_lookup_by_prefix_with_pages(self):
+        """Поиск групп по префиксу листается страницами"""
+        url = reverse('posts:group_lookup')
+        data = self.client.get(url, {'q': 'Коты'}).json()
+        self.assertEqual(len(data['results']), settings.GROUP_LOOKUP_LIMIT)
+        self.assertEqual(data['results'][0]['text'], 'Коты 00')
+        data = self.client.get(data['next']).json()
+        self.assertEqual([group['text'] for group in data['results']],
+                         [f'Коты {i}' for i in range(20, 25)])
+        self.assertIsNone(data['next'])
+
+    def test_bad_page_key_rejected(self):
+        """Ключ страницы вне диапазона id отдаёт 400, а не 500"""
+        url = reverse('posts:group_lookup')
+        for after_id in ('99999999999999999999999', 'x', ''):
+            with self.subTest(after_id=after_id):
+                response = self.client.get(url, {
+                    'q': 'Коты', 'after_title': 'Коты 00',
+                    'after_id': after_id})
+                self.assertEqual(response.status_code, 400)
+
+    def test_create_page_renders_no_group_list(self):
+        """Страница создания поста не выводит список всех групп"""
+        response = self.authorized_author.get(reverse('posts:post_create'))
+        self.assertNotContains(response, self.dogs.title)
+        self.assertContains(response, reverse('posts:group_lookup'))
+
+    def test_edit_page_renders_selected_group(self):
+        """Страница редактирования выводит только выбранную группу"""
+        post = Post.objects.create(author=self.author, text='Текст',
+                                   group=self.dogs)
+        response = self.authorized_author.get(
+            reverse('posts:post_edit', kwargs={'post_id': post.id}))
+        self.assertContains(response, self.dogs.title)
+        self.assertNotContains(response, 'Коты 00')
@@ -0,0 +1,67 @@
+"""Миниатюры картинок постов.
+
+Миниатюры нужных размеров (``settings.POST_THUMBNAIL_SIZES``) строит
+фоновая задача ``post_saved`` и кладёт в хранилище по предсказуемому
+пути ``thumbs/<размер>/<имя картинки с расширением>.jpg``: у
+``cat.png`` и ``cat.jpg`` миниатюры разные. После этого отмечает у поста
+``thumbnails_ready``. Шаблоны смотрят только на этот флаг, без обращения
+к хранилищу, и никогда не ресайзят картинку во время запроса: до
+готовности отдаётся оригинал. Тег ``{% thumbnail %}`` из sorl-thumbnail
+для этого не подходит — он строит недостающую миниатюру синхронно при
+первом показе.
+
+При замене картинки флаг сбрасывается, а прежний оригинал и его
+миниатюры удаляются после фиксации транзакции (см. ``posts.signals``).
+"""
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+
+def thumbnail_name(image_name, size):
+    return f'thumbs/{size}/{image_name}.jpg'
+
+
+def render(source, width, height):
+    image = ImageOps.exif_transpose(source).convert('RGB')
+    if height:
+        return ImageOps.fit(image, (width, height), Image.LANCZOS)
+    image.thumbnail((width, width * 10), Image.LANCZOS)
+    return image
+
+
+def generate(image_name, storage=default_storage):
+    """Строит недостающие миниатюры; возвращает созданные имена."""
+    created = []
+    missing = {size: thumbnail_name(image_name, size)
+               for size in settings.POST_THUMBNAIL_SIZES}
+    missing = {size: name for size, name in missing.items()
+               if not storage.exists(name)}
+    if not missing:
+        return created
+    largest = max(width for width, _ in settings.POST_THUMBNAIL_SIZES.values())
+    with storage.open(image_name) as image_file:
+        source = Image.open(image_file)
+        # JPEG декодируется сразу в уменьшенном масштабе.
+        source.draft('RGB', (largest, largest))
+        for size, name in missing.items():
+            width, height = settings.POST_THUMBNAIL_SIZES[size]
+            content = ContentFile(b'')
+            render(source, width, height).save(
+                content, 'JPEG', quality=settings.POST_THUMBNAIL_QUALITY,
+                optimize=True, progressive=True)
+            created.append(storage.save(name, content))
+    return created
+
+
+def delete(image_name, storage=default_storage):
+    for size in settings.POST_THUMBNAIL_SIZES:
+        storage.delete(thumbnail_name(image_name, size))
+
+
+def url(image_name, size, ready, storage=default_storage):
+    """Адрес миниатюры, если они готовы, иначе оригинала."""
+    if ready:
+        return storage.url(thumbnail_name(image_name, size))
+    return storage.url(image_name)
@@ -0,0 +1,114 @@
+"""Популярные посты ленты и каждой группы.
+
+Вес события (просмотр, публикация) затухает вдвое за
+``settings.TRENDING_HALF_LIFE`` секунд. Вместо того чтобы пересчитывать
+все веса с течением времени, событие в момент ``t`` сразу получает вес
+``w * 2 ** (t / half_life)`` (forward decay): поздние события весят
+больше ранних ровно настолько, насколько ранние успели бы затухнуть, и
+порядок постов не меняется, пока нет новых событий. Веса растут без
+предела, поэтому хранится их натуральный логарифм, а сумма считается
+как ``log(e^a + e^b)``.
+
+Просмотры приходят пачками при сбросе ``posts.counters``; каждая пачка
+обновляет только затронутые строки и обрезает свою ленту до
+``settings.TRENDING_KEEP`` лучших. Чтение — срез индекса
+``(scope, -score)``, без сканирования ``Post``. Пост, сменивший группу,
+переносится в топ новой группы с тем же весом, что в общей ленте.
+"""
+import math
+import time
+
+from django.conf import settings
+from django.db import transaction
+
+from . import surrogate
+from .models import Post, TrendingEntry
+
+
+def log_weight(weight, now):
+    return math.log(weight) + now * math.log(2) / settings.TRENDING_HALF_LIFE
+
+
+def log_add(a, b):
+    high, low = max(a, b), min(a, b)
+    return high + math.log1p(math.exp(low - high))
+
+
+def scopes(group_id):
+    if group_id is None:
+        return (surrogate.INDEX_KEY,)
+    return surrogate.INDEX_KEY, surrogate.group_key(group_id)
+
+
+def record(counts, weight, now=None):
+    """Добавляет ``count * weight`` событий постам; возвращает число строк.
+
+    Посты, удалённые до записи, пропускаются.
+    """
+    now = time.time() if now is None else now
+    increments = {}
+    for post_id, group_id in (Post.objects.filter(pk__in=counts)
+                              .values_list('pk', 'group_id')):
+        score = log_weight(counts[post_id] * weight, now)
+        for scope in scopes(group_id):
+            increments[scope, post_id] = score
+    if not increments:
+        return 0
+    touched = {scope for scope, _ in increments}
+    with transaction.atomic():
+        existing = TrendingEntry.objects.select_for_update().filter(
+            scope__in=touched, post_id__in={pk for _, pk in increments})
+        changed = []
+        for entry in existing:
+            score = increments.pop((entry.scope, entry.post_id), None)
+            if score is not None:
+                entry.score = log_add(entry.score, score)
+                changed.append(entry)
+        TrendingEntry.objects.bulk_update(changed, ('score',))
+        TrendingEntry.objects.bulk_create(
+            [TrendingEntry(scope=scope, post_id=post_id, score=score)
+             for (scope, post_id), score in increments.items()],
+            ignore_conflicts=True)
+        for scope in touched:
+            trim(scope)
+    return len(changed) + len(increments)
+
+
+def move(post_ids, source, target):
+    """Переносит посты из топа группы ``source`` в топ ``target``.
+
+    Все события поста пишутся и в общую ленту, поэтому его вес в новой
+    группе равен весу в ``index``.
+    """
+    with transaction.atomic():
+        if source is not None:
+            TrendingEntry.objects.filter(scope=source,
+                                         post_id__in=post_ids).delete()
+        if target is None:
+            return
+        scores = dict(TrendingEntry.objects.filter(
+            scope=surrogate.INDEX_KEY, post_id__in=post_ids)
+            .values_list('post_id', 'score'))
+        if not scores:
+            return
+        TrendingEntry.objects.filter(scope=target,
+                                     post_id__in=scores).delete()
+        TrendingEntry.objects.bulk_create(
+            TrendingEntry(scope=target, post_id=post_id, score=score)
+            for post_id, score in scores.items())
+        trim(target)
+
+
+def trim(scope):
+    extra = list(TrendingEntry.objects.filter(scope=scope)
+                 .order_by('-score')
+                 .values_list('pk', flat=True)[settings.TRENDING_KEEP:])
+    if extra:
+        TrendingEntry.objects.filter(pk__in=extra).delete()
+
+
+def top(scope, limit):
+    """id лучших постов ленты, от популярных к менее популярным."""
+    return list(TrendingEntry.objects.filter(scope=scope)
+                .order_by('-score')
+                .values_list('post_id', flat=True)[:limit])
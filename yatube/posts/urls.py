@@ -1,4 +1,4 @@
-from django.urls import path
+from django.urls import path, re_path
 
 from . import views
 
@@ -7,8 +7,51 @@ app_name = 'posts'
 urlpatterns = [
     path('', views.index, name='index'),
     path('group/<slug:slug>/', views.group_posts, name='group_list'),
+    path('group/<slug:slug>/trending/', views.trending_posts,
+         name='group_trending'),
+    path('trending/', views.trending_posts, name='trending'),
+    path('archive/', views.index_archive, name='archive'),
+    path('archive/<int:year>/', views.index_archive, name='archive'),
+    path('archive/<int:year>/<int:month>/', views.index_archive,
+         name='archive'),
+    path('group/<slug:slug>/archive/', views.group_archive,
+         name='group_archive'),
+    path('group/<slug:slug>/archive/<int:year>/', views.group_archive,
+         name='group_archive'),
+    path('group/<slug:slug>/archive/<int:year>/<int:month>/',
+         views.group_archive, name='group_archive'),
     path('profile/<str:username>/', views.profile, name='profile'),
+    path('profile/<str:username>/archive/', views.profile_archive,
+         name='profile_archive'),
+    path('profile/<str:username>/archive/<int:year>/',
+         views.profile_archive, name='profile_archive'),
+    path('profile/<str:username>/archive/<int:year>/<int:month>/',
+         views.profile_archive, name='profile_archive'),
+    path('profile/<str:username>/follow/', views.profile_follow,
+         name='profile_follow'),
+    path('profile/<str:username>/unfollow/', views.profile_unfollow,
+         name='profile_unfollow'),
+    path('follow/', views.follow_index, name='follow_index'),
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
+    path('posts/<int:post_id>/view/', views.post_view, name='post_view'),
     path('create/', views.post_create, name='post_create'),
     path('posts/<int:post_id>/edit/', views.post_edit, name='post_edit'),
+    path('groups/lookup/', views.group_lookup, name='group_lookup'),
+    path('feeds/<slug:fmt>/', views.index_feed, name='index_feed'),
+    path('group/<slug:slug>/feeds/<slug:fmt>/', views.group_feed,
+         name='group_feed'),
+    path('profile/<str:username>/feeds/<slug:fmt>/', views.profile_feed,
+         name='profile_feed'),
+    re_path(r'^(?P<name>sitemap(?:-[a-z]+-\d+)?\.xml(?:\.gz)?)$',
+            views.sitemap, name='sitemap'),
+    path('fragments/index/', views.index_fragment, name='index_fragment'),
+    path('fragments/group/<slug:slug>/', views.group_fragment,
+         name='group_fragment'),
+    path('fragments/profile/<str:username>/', views.profile_fragment,
+         name='profile_fragment'),
+    path('stream/index/', views.index_stream, name='index_stream'),
+    path('stream/group/<slug:slug>/', views.group_stream,
+         name='group_stream'),
+    path('stream/profile/<str:username>/', views.profile_stream,
+         name='profile_stream'),
 ]
@@ -1,42 +1,103 @@
+from datetime import MAXYEAR, MINYEAR, date
+
 from django.core.paginator import Paginator
 from django.shortcuts import render, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import redirect
 from django.conf import settings
+from django.db.models import Q
+from django.http import (Http404, HttpResponse, JsonResponse,
+                         StreamingHttpResponse)
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils.cache import patch_cache_control
+from django.utils.http import urlencode
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+
 
+from core import media
+from core.pubsub import TooManySubscribers
+from core.surrogate import tag
 
+from . import (archive, counters, feeds, follow, stream, surrogate,
+               trending)
+from .cards import (PostCard, after_cursor, card_cursor, make_cursor,
+                    to_cards)
 from .forms import PostForm
-from .models import Post, Group, User
+from .lookups import get_author_or_404, get_group_or_404, get_post_or_404
+from .models import Follow, Post, PostViews, Group
 
 
-def numeration(queryset, request):
-    paginator = Paginator(queryset, settings.CNT_POST)
+def numeration(queryset, request, count=None):
+    paginator = Paginator(to_cards(queryset), settings.CNT_POST)
+    if count is not None:
+        # Число постов уже известно, COUNT(*) не нужен.
+        paginator.count = count
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
+    page_obj.object_list = [PostCard.from_row(row)
+                            for row in page_obj.object_list]
     return page_obj
 
 
+def next_fragment(page_obj, url):
+    """Адрес фрагмента, продолжающего ленту после страницы."""
+    if not page_obj.has_next():
+        return None
+    return url + '?' + urlencode({'cursor': card_cursor(page_obj[-1])})
+
+
+def feed_fragment(request, queryset, show_posts):
+    """Только карточки следующих постов, без base.html и контекстных
+    процессоров; адрес продолжения в заголовке ``Link``."""
+    limit = settings.CNT_POST
+    rows = to_cards(after_cursor(queryset,
+                                 request.GET.get('cursor', '')))
+    cards = [PostCard.from_row(row) for row in rows[:limit + 1]]
+    posts = cards[:limit]
+    response = HttpResponse(render_to_string(
+        'posts/includes/post_list.html',
+        {'posts': posts, 'show_posts': show_posts}))
+    if len(cards) > limit:
+        next_url = request.path + '?' + urlencode(
+            {'cursor': card_cursor(posts[-1])})
+        response['Link'] = f'<{next_url}>; rel="next"'
+    tag(request, *surrogate.page_keys(posts))
+    return response
+
+
 def index(request):
-    post_list = Post.objects.all().select_related('author', 'group')
+    post_list = Post.objects.all()
+    page_obj = numeration(post_list, request)
     context = {
-        'page_obj': numeration(post_list, request)
+        'page_obj': page_obj,
+        'next_fragment': next_fragment(
+            page_obj, reverse('posts:index_fragment')),
     }
+    tag(request, surrogate.INDEX_KEY,
+        *surrogate.page_keys(context['page_obj']))
     return render(request, 'posts/index.html', context)
 
 
 def group_posts(request, slug):
-    group = get_object_or_404(Group, slug=slug)
-    post_list = group.posts.select_related('author')
+    group = get_group_or_404(slug)
+    post_list = group.posts.all()
+    page_obj = numeration(post_list, request)
     context = {
         'group': group,
-        'page_obj': numeration(post_list, request),
+        'page_obj': page_obj,
+        'next_fragment': next_fragment(
+            page_obj, reverse('posts:group_fragment', args=(slug,))),
     }
+    tag(request, surrogate.group_key(group.pk),
+        *surrogate.page_keys(context['page_obj']))
     return render(request, 'posts/group_list.html', context)
 
 
 @login_required
 def post_create(request):
-    form = PostForm(request.POST or None)
+    form = PostForm(request.POST or None, files=request.FILES or None)
     if form.is_valid():
         post = form.save(commit=False)
         post.author = request.user
@@ -49,36 +110,276 @@ def post_create(request):
 def post_edit(request, post_id):
     post = get_object_or_404(Post, id=post_id)
     if post.author == request.user:
-        form = PostForm(request.POST, instance=post)
+        form = PostForm(request.POST or None, files=request.FILES or None,
+                        instance=post)
         if form.is_valid():
             form.save()
             return redirect('posts:post_detail', post.pk)
-        else:
-            form = PostForm(instance=post)
-            context = {
-                'form': form,
-                'post': post,
-                'is_edit': True
-            }
+        context = {
+            'form': form,
+            'post': post,
+            'is_edit': True
+        }
         return render(request, 'posts/create_post.html', context)
     else:
         return redirect('posts:post_detail', post.pk)
 
 
 def profile(request, username):
-    author = get_object_or_404(User, username=username)
-    author_post = author.posts.select_related('group')
+    author = get_author_or_404(username)
+    author_post = author.posts.all()
+    page_obj = numeration(author_post, request)
+    following = (request.user.is_authenticated
+                 and Follow.objects.filter(user=request.user,
+                                           author=author).exists())
     context = {
         'author': author,
-        'page_obj': numeration(author_post, request),
+        'following': following,
+        'page_obj': page_obj,
+        'next_fragment': next_fragment(
+            page_obj, reverse('posts:profile_fragment', args=(username,))),
     }
+    tag(request, surrogate.author_key(author.pk),
+        *surrogate.page_keys(context['page_obj']))
     return render(request, 'posts/profile.html', context)
 
 
+def archive_nav(scope, url_name, url_args):
+    """Годы архива с месяцами и числом постов, из ``MonthCount``."""
+    years = []
+    for year, month, count in archive.months(scope):
+        if not years or years[-1]['year'] != year:
+            years.append({'year': year, 'months': [], 'url': reverse(
+                url_name, args=(*url_args, year))})
+        years[-1]['months'].append({
+            'date': date(year, month, 1),
+            'count': count,
+            'url': reverse(url_name, args=(*url_args, year, month)),
+        })
+    return years
+
+
+def archive_page(request, scope, post_list, year, month, context,
+                 url_name, url_args=()):
+    """Посты года или месяца диапазоном по ``pub_date``."""
+    if year is not None and not MINYEAR <= year < MAXYEAR:
+        raise Http404('Нет такого года')
+    if month is not None and not 1 <= month <= 12:
+        raise Http404('Нет такого месяца')
+    page_obj = None
+    if year is not None:
+        page_obj = numeration(archive.in_range(post_list, year, month),
+                              request, archive.count(scope, year, month))
+    context.update({
+        'archive': archive_nav(scope, url_name, url_args),
+        'year': year,
+        'month': date(year, month, 1) if month else None,
+        'page_obj': page_obj,
+    })
+    tag(request, scope, *surrogate.page_keys(page_obj or ()))
+    return render(request, 'posts/archive.html', context)
+
+
+def index_archive(request, year=None, month=None):
+    return archive_page(request, surrogate.INDEX_KEY, Post.objects.all(),
+                        year, month, {}, 'posts:archive')
+
+
+def group_archive(request, slug, year=None, month=None):
+    group = get_group_or_404(slug)
+    return archive_page(request, surrogate.group_key(group.pk),
+                        group.posts.all(), year, month, {'group': group},
+                        'posts:group_archive', (slug,))
+
+
+def profile_archive(request, username, year=None, month=None):
+    author = get_author_or_404(username)
+    return archive_page(request, surrogate.author_key(author.pk),
+                        author.posts.all(), year, month, {'author': author},
+                        'posts:profile_archive', (username,))
+
+
+def index_fragment(request):
+    tag(request, surrogate.INDEX_KEY)
+    return feed_fragment(request, Post.objects.all(), show_posts=True)
+
+
+def group_fragment(request, slug):
+    group = get_group_or_404(slug)
+    tag(request, surrogate.group_key(group.pk))
+    return feed_fragment(request, group.posts.all(), show_posts=True)
+
+
+def profile_fragment(request, username):
+    author = get_author_or_404(username)
+    tag(request, surrogate.author_key(author.pk))
+    return feed_fragment(request, author.posts.all(), show_posts=False)
+
+
+def event_stream(request, topic, queryset):
+    """Поток SSE с новыми постами темы ``topic``."""
+    try:
+        subscription = stream.hub.subscribe(
+            (topic,), settings.SSE_BUFFER, settings.SSE_MAX_SUBSCRIBERS)
+    except TooManySubscribers:
+        response = HttpResponse('Слишком много подписчиков', status=503,
+                                content_type='text/plain; charset=utf-8')
+        response['Retry-After'] = settings.SSE_RETRY_MS // 1000
+        return response
+    backlog = stream.backlog(queryset,
+                             request.META.get('HTTP_LAST_EVENT_ID', ''))
+    response = StreamingHttpResponse(
+        stream.EventStream(subscription, backlog),
+        content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def index_stream(request):
+    return event_stream(request, surrogate.INDEX_KEY, Post.objects.all())
+
+
+def group_stream(request, slug):
+    group = get_group_or_404(slug)
+    return event_stream(request, surrogate.group_key(group.pk),
+                        group.posts.all())
+
+
+def profile_stream(request, username):
+    author = get_author_or_404(username)
+    return event_stream(request, surrogate.author_key(author.pk),
+                        author.posts.all())
+
+
+def trending_posts(request, slug=None):
+    """Популярные посты ленты или группы из готового топа."""
+    group = None
+    post_list = Post.objects.all()
+    scope = surrogate.INDEX_KEY
+    if slug is not None:
+        group = get_group_or_404(slug)
+        post_list = group.posts.all()
+        scope = surrogate.group_key(group.pk)
+    ids = trending.top(scope, settings.TRENDING_SIZE)
+    # Пост мог уйти в другую группу после попадания в топ.
+    cards = {row[0]: PostCard.from_row(row)
+             for row in to_cards(post_list.filter(pk__in=ids))}
+    posts = [cards[post_id] for post_id in ids if post_id in cards]
+    tag(request, scope, *surrogate.page_keys(posts))
+    return render(request, 'posts/trending.html',
+                  {'group': group, 'posts': posts})
+
+
+def index_feed(request, fmt):
+    return feeds.serve(request, 'index', fmt, surrogate.INDEX_KEY)
+
+
+def group_feed(request, slug, fmt):
+    group = get_group_or_404(slug)
+    return feeds.serve(request, 'group', fmt, surrogate.group_key(group.pk),
+                       slug)
+
+
+def profile_feed(request, username, fmt):
+    author = get_author_or_404(username)
+    return feeds.serve(request, 'author', fmt,
+                       surrogate.author_key(author.pk), username)
+
+
+def sitemap(request, name):
+    """Файл карты сайта из ``MEDIA_ROOT``; адрес в корне, потому что
+    карта может перечислять только адреса ниже своего."""
+    response = media.serve(request, f'{settings.SITEMAP_DIR}/{name}',
+                           settings.MEDIA_ROOT)
+    patch_cache_control(response, max_age=settings.SITEMAP_MAX_AGE)
+    return response
+
+
+@login_required
+def follow_index(request):
+    """Лента подписок, листается курсором ``?cursor=`` без номеров."""
+    limit = settings.CNT_POST
+    rows = follow.feed(request.user, request.GET.get('cursor', ''),
+                       limit + 1)
+    ids = [post_id for post_id, _ in rows[:limit]]
+    cards = {row[0]: PostCard.from_row(row)
+             for row in to_cards(Post.objects.filter(pk__in=ids))}
+    next_page = None
+    if len(rows) > limit:
+        post_id, pub_date = rows[limit - 1]
+        next_page = '?' + urlencode(
+            {'cursor': make_cursor(pub_date, post_id)})
+    return render(request, 'posts/follow.html', {
+        'posts': [cards[post_id] for post_id in ids if post_id in cards],
+        'next_page': next_page,
+    })
+
+
+@require_POST
+@login_required
+def profile_follow(request, username):
+    author = get_author_or_404(username)
+    follow.follow(request.user, author)
+    return redirect('posts:profile', username)
+
+
+@require_POST
+@login_required
+def profile_unfollow(request, username):
+    author = get_author_or_404(username)
+    follow.unfollow(request.user, author)
+    return redirect('posts:profile', username)
+
+
 def post_detail(request, post_id):
-    post = get_object_or_404(Post.objects.select_related('author', 'group'),
-                             id=post_id)
+    post = get_post_or_404(post_id)
+    # Сам пост из кэша, число просмотров — свежее.
+    stored = (PostViews.objects.filter(post_id=post.pk).order_by()
+              .values_list('count', flat=True).first())
     context = {
         'post': post,
+        'view_count': (stored or 0) + counters.views.get(post.pk),
     }
+    tag(request, *surrogate.post_keys(post))
     return render(request, 'posts/post_detail.html', context)
+
+
+@csrf_exempt
+@require_POST
+def post_view(request, post_id):
+    """Маяк просмотра со страницы поста: её саму кэширует прокси."""
+    post = get_post_or_404(post_id)
+    counters.views.add(post.pk)
+    return HttpResponse(status=204)
+
+
+def group_lookup(request):
+    """Поиск групп по префиксу названия с постраничной выдачей.
+
+    Диапазон ``title >= q AND title < q + U+FFFF`` использует индекс по
+    ``title``, страницы листаются по ключу ``(title, id)`` без OFFSET.
+    Ключ страницы, который не влезает в id, отклоняется с 400.
+    """
+    query = request.GET.get('q', '')
+    groups = Group.objects.filter(title__gte=query,
+                                  title__lt=query + '\uffff')
+    after_title = request.GET.get('after_title')
+    after_id = request.GET.get('after_id', '')
+    if after_title is not None:
+        if not after_id.isdigit() or int(after_id) >= 2 ** 63:
+            return JsonResponse({'error': 'Неверный after_id'}, status=400)
+        groups = groups.filter(Q(title__gt=after_title)
+                               | Q(title=after_title, id__gt=after_id))
+    limit = settings.GROUP_LOOKUP_LIMIT
+    page = list(groups.order_by('title', 'id')
+                .values('id', 'title', 'slug')[:limit + 1])
+    results = [{'id': group['id'], 'text': group['title'],
+                'slug': group['slug']} for group in page[:limit]]
+    next_url = None
+    if len(page) > limit:
+        last = page[limit - 1]
+        next_url = request.path + '?' + urlencode({
+            'q': query, 'after_title': last['title'],
+            'after_id': last['id']})
+    return JsonResponse({'results': results, 'next': next_url})
@@ -0,0 +1,33 @@
+from django import forms
+from django.urls import reverse_lazy
+
+
+class GroupLookupSelect(forms.Select):
+    """Выбор группы через поиск по префиксу названия.
+
+    В разметку попадает только выбранная группа, остальные варианты
+    подгружает скрипт из ``posts:group_lookup``.
+    """
+    lookup_url = reverse_lazy('posts:group_lookup')
+
+    class Media:
+        js = ('js/group_lookup.js',)
+
+    def build_attrs(self, base_attrs, extra_attrs=None):
+        attrs = super().build_attrs(base_attrs, extra_attrs)
+        attrs['data-lookup-url'] = str(self.lookup_url)
+        return attrs
+
+    def optgroups(self, name, value, attrs=None):
+        field = self.choices.field
+        selected = [v for v in value if v not in field.empty_values]
+        options = [self.create_option(name, '', field.empty_label,
+                                      not selected, 0)]
+        try:
+            groups = list(field.queryset.filter(pk__in=selected)[:1])
+        except (ValueError, TypeError):
+            groups = []
+        for group in groups:
+            options.append(self.create_option(
+                name, group.pk, field.label_from_instance(group), True, 1))
+        return [(None, options, 0)]
@@ -0,0 +1,59 @@
+document.addEventListener('DOMContentLoaded', function () {
+  document.querySelectorAll('select[data-lookup-url]').forEach(function (select) {
+    var search = document.createElement('input');
+    search.type = 'search';
+    search.className = 'form-control mb-2';
+    search.placeholder = 'Начните вводить название группы';
+    select.parentNode.insertBefore(search, select);
+    var more = document.createElement('button');
+    more.type = 'button';
+    more.className = 'btn btn-link btn-sm px-0';
+    more.textContent = 'Показать ещё группы';
+    more.hidden = true;
+    select.parentNode.insertBefore(more, select.nextSibling);
+    var timer = null;
+    var next = null;
+    // Ответ на устаревший запрос не должен перезаписать свежий.
+    var request = 0;
+
+    function load(url, replace) {
+      var current = ++request;
+      more.disabled = true;
+      fetch(url).then(function (response) {
+        return response.json();
+      }).then(function (data) {
+        if (current !== request) {
+          return;
+        }
+        var selected = select.value;
+        if (replace) {
+          Array.from(select.options).forEach(function (option) {
+            if (option.value && option.value !== selected) {
+              option.remove();
+            }
+          });
+        }
+        data.results.forEach(function (group) {
+          if (String(group.id) !== selected) {
+            select.add(new Option(group.text, group.id));
+          }
+        });
+        next = data.next;
+        more.hidden = !next;
+        more.disabled = false;
+      });
+    }
+
+    search.addEventListener('input', function () {
+      clearTimeout(timer);
+      timer = setTimeout(function () {
+        load(select.dataset.lookupUrl + '?q=' + encodeURIComponent(search.value), true);
+      }, 250);
+    });
+    more.addEventListener('click', function () {
+      if (next) {
+        load(next, false);
+      }
+    });
+  });
+});
@@ -0,0 +1,33 @@
+document.addEventListener('DOMContentLoaded', function () {
+  var feed = document.querySelector('[data-feed][data-next]');
+  if (!feed || !('IntersectionObserver' in window)) {
+    return;
+  }
+  var pagination = document.querySelector('.pagination');
+  if (pagination) {
+    pagination.closest('nav').hidden = true;
+  }
+  var sentinel = document.createElement('div');
+  feed.after(sentinel);
+  var next = feed.dataset.next;
+  var loading = false;
+  var observer = new IntersectionObserver(function (entries) {
+    if (!entries[0].isIntersecting || loading || !next) {
+      return;
+    }
+    loading = true;
+    fetch(next, {credentials: 'same-origin'}).then(function (response) {
+      var link = response.headers.get('Link') || '';
+      var match = link.match(/<([^>]+)>;\s*rel="next"/);
+      next = match ? match[1] : null;
+      return response.text();
+    }).then(function (html) {
+      feed.insertAdjacentHTML('beforeend', '<hr>' + html);
+      loading = false;
+      if (!next) {
+        observer.disconnect();
+      }
+    });
+  }, {rootMargin: '600px'});
+  observer.observe(sentinel);
+});
@@ -0,0 +1,12 @@
+document.addEventListener('DOMContentLoaded', function () {
+  var post = document.querySelector('[data-view-beacon]');
+  if (!post) {
+    return;
+  }
+  var url = post.dataset.viewBeacon;
+  if (navigator.sendBeacon) {
+    navigator.sendBeacon(url);
+  } else {
+    fetch(url, {method: 'POST', credentials: 'same-origin', keepalive: true});
+  }
+});
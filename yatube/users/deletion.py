@@ -0,0 +1,78 @@
+"""Удаление аккаунта автора пачками.
+
+Каскадное удаление пользователя собирает все его посты в одной
+транзакции и надолго блокирует SQLite. Здесь посты удаляются пачками по
+``settings.ACCOUNT_DELETE_CHUNK_SIZE`` с паузой между транзакциями,
+чтобы другие запросы на запись успевали пройти, а сам пользователь
+удаляется последним. Повторный запуск продолжает с того же места.
+
+Так же пачками до постов удаляются строки ленты подписок: записи постов
+автора во входящих подписчиков, его собственные входящие и подписки в
+обе стороны. Иначе их собрал бы каскад одной транзакцией.
+"""
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+
+from posts.models import Follow, InboxEntry, Post
+
+
+def deactivate(user):
+    if user.is_active:
+        user.is_active = False
+        user.save(update_fields=('is_active',))
+
+
+def delete_in_batches(queryset, chunk_size=None, pause=None):
+    """Удаляет строки выборки, отдавая по каждой пачке
+    число удалённых строк и время транзакции в секундах."""
+    chunk_size = chunk_size or settings.ACCOUNT_DELETE_CHUNK_SIZE
+    if pause is None:
+        pause = settings.ACCOUNT_DELETE_PAUSE
+    while True:
+        started = time.perf_counter()
+        with transaction.atomic():
+            ids = list(queryset.order_by('pk')
+                       .values_list('pk', flat=True)[:chunk_size])
+            if not ids:
+                return
+            queryset.model.objects.filter(pk__in=ids).delete()
+        yield len(ids), time.perf_counter() - started
+        if pause:
+            time.sleep(pause)
+
+
+def delete_posts_in_batches(user, chunk_size=None, pause=None):
+    return delete_in_batches(Post.objects.filter(author=user), chunk_size,
+                             pause)
+
+
+def delete_follows_in_batches(user, chunk_size=None, pause=None):
+    """Удаляет строки ленты подписок пользователя пачками."""
+    for queryset in (InboxEntry.objects.filter(author=user),
+                     InboxEntry.objects.filter(user=user),
+                     Follow.objects.filter(Q(user=user) | Q(author=user))):
+        yield from delete_in_batches(queryset, chunk_size, pause)
+
+
+def delete_account(user, chunk_size=None, pause=None, progress=None):
+    """Удаляет аккаунт и возвращает метрики удаления."""
+    deactivate(user)
+    stats = {'posts': 0, 'follows': 0, 'batches': 0, 'max_lock': 0.0,
+             'total_lock': 0.0}
+    started = time.perf_counter()
+    for key, batches in (
+            ('follows', delete_follows_in_batches(user, chunk_size, pause)),
+            ('posts', delete_posts_in_batches(user, chunk_size, pause))):
+        for deleted, lock_time in batches:
+            stats[key] += deleted
+            stats['batches'] += 1
+            stats['total_lock'] += lock_time
+            stats['max_lock'] = max(stats['max_lock'], lock_time)
+            if progress is not None:
+                progress(stats)
+    user.delete()
+    stats['elapsed'] = time.perf_counter() - started
+    return stats
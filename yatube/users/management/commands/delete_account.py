@@ -0,0 +1,47 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from core.tasks import enqueue
+from users import tasks
+from users.deletion import delete_account
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = ('Удаляет пользователя и его посты пачками. '
+            'Прерванное удаление продолжается повторным запуском.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+        parser.add_argument('--chunk-size', type=int)
+        parser.add_argument('--pause', type=float,
+                            help='Пауза между пачками, с')
+        parser.add_argument('--background', action='store_true',
+                            help='Поставить удаление в очередь задач')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(
+                f"Пользователь {options['username']} не найден")
+        if options['background']:
+            enqueue(tasks.delete_account, user_id=user.pk)
+            self.stdout.write('Удаление поставлено в очередь')
+            return
+        stats = delete_account(user, options['chunk_size'],
+                               options['pause'], progress=self.progress)
+        rate = stats['posts'] / stats['elapsed'] if stats['elapsed'] else 0
+        avg_lock = (stats['total_lock'] / stats['batches']
+                    if stats['batches'] else 0)
+        self.stdout.write(
+            f"Удалено постов: {stats['posts']} за {stats['elapsed']:.2f} с "
+            f"({rate:.0f} постов/с), строк подписок: {stats['follows']}, "
+            f"пачек: {stats['batches']}, "
+            f'блокировка: ср. {avg_lock * 1000:.1f} мс, '
+            f"макс. {stats['max_lock'] * 1000:.1f} мс"
+        )
+
+    def progress(self, stats):
+        self.stdout.write(f"Удалено постов: {stats['posts']}")
@@ -0,0 +1,22 @@
+from django.contrib.auth import get_user_model
+
+from core.tasks import enqueue, task
+
+from .deletion import (deactivate, delete_follows_in_batches,
+                       delete_posts_in_batches)
+
+User = get_user_model()
+
+
+@task()
+def delete_account(user_id):
+    """Удаляет одну пачку подписок или постов и ставит себя в очередь снова."""
+    user = User.objects.filter(pk=user_id).first()
+    if user is None:
+        return
+    deactivate(user)
+    if (next(delete_follows_in_batches(user, pause=0), None) is None
+            and next(delete_posts_in_batches(user, pause=0), None) is None):
+        user.delete()
+    else:
+        enqueue(delete_account, user_id=user_id)
@@ -0,0 +1,68 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+
+from core import tasks
+from posts.models import Follow, InboxEntry, Post
+from users.deletion import delete_posts_in_batches
+
+User = get_user_model()
+
+
+class AccountDeletionTests(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user(username='author')
+        self.other = User.objects.create_user(username='other')
+        Post.objects.bulk_create(
+            [Post(text=f'Пост {i}', author=self.author) for i in range(7)]
+            + [Post(text='Чужой пост', author=self.other)]
+        )
+
+    def test_command_deletes_posts_in_batches(self):
+        """delete_account удаляет посты пачками, затем пользователя"""
+        out = StringIO()
+        call_command('delete_account', 'author', chunk_size=3, pause=0,
+                     stdout=out)
+        self.assertFalse(User.objects.filter(username='author').exists())
+        self.assertEqual(Post.objects.count(), 1)
+        self.assertIn('пачек: 3', out.getvalue())
+
+    def test_interrupted_deletion_resumes(self):
+        """Прерванное удаление продолжается при повторном запуске"""
+        batches = delete_posts_in_batches(self.author, chunk_size=5, pause=0)
+        self.assertEqual(next(batches)[0], 5)
+        self.assertEqual(self.author.posts.count(), 2)
+        call_command('delete_account', 'author', pause=0, stdout=StringIO())
+        self.assertFalse(User.objects.filter(username='author').exists())
+
+    def test_background_deletion(self):
+        """Фоновое удаление выполняется задачами по одной пачке"""
+        call_command('delete_account', 'author', background=True,
+                     stdout=StringIO())
+        self.author.refresh_from_db()
+        self.assertTrue(self.author.posts.exists())
+        while tasks.run_pending():
+            pass
+        self.assertFalse(User.objects.filter(username='author').exists())
+        self.assertTrue(User.objects.filter(username='other').exists())
+
+    def test_follow_rows_deleted_in_batches(self):
+        """Подписки и входящие удаляются пачками до пользователя"""
+        readers = [User.objects.create_user(username=f'reader{i}')
+                   for i in range(4)]
+        post = self.author.posts.first()
+        Follow.objects.bulk_create(
+            [Follow(user=reader, author=self.author) for reader in readers]
+            + [Follow(user=self.author, author=self.other)])
+        InboxEntry.objects.bulk_create(
+            [InboxEntry(user=reader, post=post, author=self.author,
+                        pub_date=post.pub_date) for reader in readers])
+        out = StringIO()
+        call_command('delete_account', 'author', chunk_size=3, pause=0,
+                     stdout=out)
+        self.assertFalse(Follow.objects.exists())
+        self.assertFalse(InboxEntry.objects.exists())
+        self.assertIn('строк подписок: 9', out.getvalue())
+        self.assertIn('пачек: 7', out.getvalue())
@@ -12,6 +12,25 @@ https://docs.djangoproject.com/en/2.2/ref/settings/
 
 import os
 
+
+def env_bool(name, default):
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def env_list(name, default):
+    value = os.environ.get(name)
+    if not value:
+        return default
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
+# Профиль окружения: development (по умолчанию) или production.
+PROFILE = os.environ.get('YATUBE_PROFILE', 'development')
+PRODUCTION = PROFILE == 'production'
+
 LOGIN_URL = 'users:login'
 LOGIN_REDIRECT_URL = 'posts:index'
 # LOGOUT_REDIRECT_URL = 'posts:index'
@@ -27,17 +46,26 @@ EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 # See https://docs.djangoproject.com/en/2.2/howto/deployment/checklist/
 
 # SECURITY WARNING: keep the secret key used in production secret!
-SECRET_KEY = 'cn5vj%tis8oopc(bjas=4%mlhl!0m$n+cef^ex84x!sm*nkcj+'
+if PRODUCTION:
+    SECRET_KEY = os.environ['SECRET_KEY']
+else:
+    SECRET_KEY = os.environ.get(
+        'SECRET_KEY', 'cn5vj%tis8oopc(bjas=4%mlhl!0m$n+cef^ex84x!sm*nkcj+')
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+# С DEBUG Django копит все SQL-запросы в connection.queries.
+DEBUG = env_bool('DEBUG', not PRODUCTION)
 
-ALLOWED_HOSTS = [
+ALLOWED_HOSTS = env_list('ALLOWED_HOSTS', [
     'localhost',
     '127.0.0.1',
     '[::1]',
     'testserver',
-]
+])
+
+if PRODUCTION:
+    SESSION_COOKIE_SECURE = env_bool('SECURE_COOKIES', True)
+    CSRF_COOKIE_SECURE = env_bool('SECURE_COOKIES', True)
 
 
 # Application definition
@@ -56,13 +84,18 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.MetricsMiddleware',
+    'core.middleware.SlowQueryMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.AdmissionControlMiddleware',
+    'core.middleware.HttpCacheMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.middleware.ProfilingMiddleware',
 ]
 
 ROOT_URLCONF = 'yatube.urls'
@@ -70,7 +103,7 @@ ROOT_URLCONF = 'yatube.urls'
 TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'core.backends.TimedDjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -86,6 +119,8 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'yatube.wsgi.application'
+# Прогрев процесса при загрузке WSGI-приложения, см. core.warmup.
+WARMUP_ON_START = env_bool('WARMUP', PRODUCTION)
 
 
 # Database
@@ -94,10 +129,45 @@ WSGI_APPLICATION = 'yatube.wsgi.application'
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'NAME': os.environ.get('SQLITE_PATH',
+                               os.path.join(BASE_DIR, 'db.sqlite3')),
+        'CONN_MAX_AGE': 600 if PRODUCTION else 0,
+        'OPTIONS': {'timeout': 20},
+    }
+}
+# PRAGMA для каждого нового соединения SQLite, см. core.apps.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'busy_timeout': 20000,
+} if PRODUCTION else {}
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'yatube',
+        'TIMEOUT': 300,
+        'OPTIONS': {'MAX_ENTRIES': 10000 if PRODUCTION else 1000},
     }
 }
 
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'WARNING' if PRODUCTION else 'INFO')
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'plain': {'format': '%(asctime)s %(levelname)s %(name)s %(message)s'},
+    },
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler', 'formatter': 'plain'},
+    },
+    'loggers': {
+        'django': {'handlers': ['console'], 'level': LOG_LEVEL},
+        'core': {'handlers': ['console'], 'level': LOG_LEVEL},
+        'posts': {'handlers': ['console'], 'level': LOG_LEVEL},
+    },
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
@@ -137,8 +207,129 @@ USE_TZ = True
 
 STATIC_URL = '/static/'
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
+MEDIA_URL = '/media/'
+MEDIA_ROOT = os.environ.get('MEDIA_ROOT', os.path.join(BASE_DIR, 'media'))
+
+# Загрузки пишутся на диск по частям и не копятся в памяти целиком.
+FILE_UPLOAD_HANDLERS = [
+    'django.core.files.uploadhandler.TemporaryFileUploadHandler',
+]
+FILE_UPLOAD_TEMP_DIR = os.environ.get('FILE_UPLOAD_TEMP_DIR')
+
+# 'x-accel-redirect' для nginx, 'x-sendfile' для Apache; пусто — отдаёт
+# Django через FileResponse.
+MEDIA_SENDFILE = os.environ.get('MEDIA_SENDFILE', '')
+MEDIA_ACCEL_PREFIX = os.environ.get('MEDIA_ACCEL_PREFIX', '/protected-media/')
+MEDIA_CHUNK_SIZE: int = 64 * 1024
+MEDIA_CACHE_MAX_AGE: int = 7 * 24 * 3600
+
+STATIC_ROOT = os.environ.get('STATIC_ROOT',
+                             os.path.join(BASE_DIR, 'static_collected'))
+
+# Адрес сайта для абсолютных ссылок в карте сайта.
+SITE_URL = os.environ.get('SITE_URL', 'http://localhost:8000')
+# Каталог карты сайта внутри MEDIA_ROOT: фронт-сервер отдаёт её как медиа.
+SITEMAP_DIR = 'sitemaps'
+SITEMAP_SHARD_SIZE: int = 50000
+SITEMAP_CHUNK_SIZE: int = 2000
+SITEMAP_MAX_AGE: int = 3600
 
 CNT_POST: int = 10
 POST_MOD: int = 15
 PGN_1_PAGE: int = 10
 PGN_RANGE: int = 13
+GROUP_LOOKUP_LIMIT: int = 20
+POST_IMAGE_MAX_SIZE: int = 5 * 1024 * 1024
+FOLLOW_FANOUT_LIMIT: int = 10000
+FOLLOW_FANOUT_CHUNK: int = 1000
+FOLLOW_BACKFILL: int = 50
+COUNTER_FLUSH_INTERVAL: float = 5.0
+COUNTER_MAX_PENDING: int = 1000
+# Вес события в популярном падает вдвое за TRENDING_HALF_LIFE секунд.
+TRENDING_HALF_LIFE: float = 6 * 3600
+TRENDING_VIEW_WEIGHT: float = 1.0
+TRENDING_POST_WEIGHT: float = 10.0
+TRENDING_KEEP: int = 200
+TRENDING_SIZE: int = 20
+FEED_ITEMS: int = 20
+FEED_CACHE_TTL: int = 24 * 3600
+# Ширина и высота миниатюр; высота 0 — сохранить пропорции.
+POST_THUMBNAIL_SIZES = {'card': (960, 339), 'detail': (960, 0)}
+POST_THUMBNAIL_QUALITY: int = 85
+GROUP_CHUNK_SIZE: int = 1000
+LOOKUP_CACHE_SIZE: int = 1024
+LOOKUP_CACHE_TTL: float = 60.0
+LOOKUP_CACHE_NEGATIVE_TTL: float = 10.0
+LOOKUP_CACHE_NEGATIVE_SIZE: int = 256
+OBJECT_CACHE_SOFT_TTL: float = 30.0
+OBJECT_CACHE_TTL: int = 600
+ACCOUNT_DELETE_CHUNK_SIZE: int = 500
+ACCOUNT_DELETE_PAUSE: float = 0.05
+
+TASKS_BATCH: int = 10
+TASKS_MAX_ATTEMPTS: int = 3
+TASKS_RETRY_DELAY: int = 10
+TASKS_VISIBILITY_TIMEOUT: int = 60
+TASKS_POLL_INTERVAL: float = 1.0
+TASKS_RETENTION_DAYS: int = 7
+TASKS_PURGE_INTERVAL: float = 3600.0
+TASKS_PURGE_BATCH: int = 1000
+
+ADMISSION_MAX_CONCURRENCY: int = 32
+ADMISSION_QUEUE_TIMEOUT: float = 2.0
+RATE_LIMIT_MAX_KEYS: int = 10000
+# Лимиты по имени URL: rate — токенов в секунду, burst — запас.
+RATE_LIMITS = {
+    'posts:post_create': {'rate': 10 / 60, 'burst': 5},
+    'posts:post_edit': {'rate': 20 / 60, 'burst': 10},
+    'posts:post_view': {'rate': 2, 'burst': 60},
+    'users:login': {'rate': 5 / 60, 'burst': 5},
+    'users:signup': {'rate': 2 / 60, 'burst': 3},
+    'users:password_change': {'rate': 2 / 60, 'burst': 3},
+}
+
+FEED_CACHE_POLICY = {'max_age': 0, 's_maxage': 60,
+                     'stale_while_revalidate': 30}
+HTTP_CACHE_POLICIES = {
+    'posts:index': FEED_CACHE_POLICY,
+    'posts:group_list': FEED_CACHE_POLICY,
+    'posts:profile': FEED_CACHE_POLICY,
+    'posts:index_fragment': FEED_CACHE_POLICY,
+    'posts:group_fragment': FEED_CACHE_POLICY,
+    'posts:profile_fragment': FEED_CACHE_POLICY,
+    'posts:trending': FEED_CACHE_POLICY,
+    'posts:group_trending': FEED_CACHE_POLICY,
+    'posts:archive': FEED_CACHE_POLICY,
+    'posts:group_archive': FEED_CACHE_POLICY,
+    'posts:profile_archive': FEED_CACHE_POLICY,
+    'posts:index_feed': FEED_CACHE_POLICY,
+    'posts:group_feed': FEED_CACHE_POLICY,
+    'posts:profile_feed': FEED_CACHE_POLICY,
+    'posts:post_detail': {'max_age': 0, 's_maxage': 300,
+                          'stale_while_revalidate': 60},
+}
+SURROGATE_KEY_HEADER = 'Surrogate-Key'
+SURROGATE_PURGE_URLS = env_list('SURROGATE_PURGE_URLS', [])
+SURROGATE_PURGE_METHOD = 'PURGE'
+SURROGATE_PURGE_TIMEOUT: float = 2.0
+
+SSE_HEARTBEAT: float = 15.0
+SSE_BUFFER: int = 100
+SSE_BACKLOG: int = 50
+SSE_MAX_SUBSCRIBERS: int = 5000
+SSE_RETRY_MS: int = 3000
+
+# Каталог для снимков метрик воркеров; None — только текущий процесс.
+METRICS_DIR = os.environ.get('METRICS_DIR')
+METRICS_FLUSH_INTERVAL: float = 5.0
+METRICS_ALLOWED_IPS = ('127.0.0.1', '::1')
+
+PROFILE_KEEP: int = 100
+PROFILE_REPORT_LINES: int = 60
+PROFILE_TOKEN_MAX_AGE: int = 3600
+
+SLOW_QUERY_THRESHOLD: float = 0.1
+SLOW_QUERY_LOG = os.environ.get('SLOW_QUERY_LOG',
+                                os.path.join(BASE_DIR, 'slow_queries.log'))
+
+SOAK_MAX_GROWTH: int = 1024 * 1024
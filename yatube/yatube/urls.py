@@ -1,11 +1,15 @@
 from django.contrib import admin
 from django.urls import include, path
 
+from core.views import media_view, metrics_view
+
 
 urlpatterns = [
     path('auth/', include('users.urls', namespace='users')),
     path('auth/', include('django.contrib.auth.urls')),
     path('admin/', admin.site.urls),
     path('about/', include('about.urls', namespace='about')),
+    path('metrics/', metrics_view, name='metrics'),
+    path('media/<path:path>', media_view, name='media'),
     path('', include('posts.urls', namespace='posts'))
 ]